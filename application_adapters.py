@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 招聘平台申请适配器
+按招聘网站（SITE）注册申请适配器，LinkedIn使用Easy Apply流程，Indeed、Glassdoor和其他ATS表单使用通用表单流程
+"""
+
+import os
+import time
+import pandas as pd
+from abc import ABC, abstractmethod
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from application_steps import ApplyStep, StepMachine, StepAbort, summarize_step_records
+from page_state import PageStateProbe
+
+# 站点名称到适配器类的映射
+ADAPTER_REGISTRY = {}
+
+# 没有专用适配器的站点使用的适配器名称
+GENERIC_ADAPTER = "generic"
+
+# 通用表单中各字段的定位方式，按优先级排列
+FORM_FIELD_SELECTORS = {
+    "first_name": ["input[name*='first' i]", "input[id*='first' i]", "input[autocomplete='given-name']"],
+    "last_name": ["input[name*='last' i]", "input[id*='last' i]", "input[autocomplete='family-name']"],
+    "email": ["input[type='email']", "input[name*='email' i]", "input[id*='email' i]"],
+    "phone": ["input[type='tel']", "input[name*='phone' i]", "input[id*='phone' i]"],
+    "location": ["input[name*='location' i]", "input[name*='city' i]", "input[id*='location' i]"]
+}
+
+def register_adapter(*sites):
+    """注册申请适配器的装饰器
+    
+    Args:
+        sites: 适配器处理的站点名称（与职位数据的SITE列一致）
+    
+    Returns:
+        function: 类装饰器
+    """
+    def decorator(cls):
+        for site in sites:
+            ADAPTER_REGISTRY[site.lower()] = cls
+        if "site" not in cls.__dict__:
+            cls.site = sites[0].lower()
+        return cls
+    return decorator
+
+def normalize_site(site):
+    """规范化站点名称
+    
+    Args:
+        site: 站点名称，可能为空或NaN
+    
+    Returns:
+        str: 小写站点名称，空值返回通用适配器名称
+    """
+    if site is None or (isinstance(site, float) and pd.isna(site)):
+        return GENERIC_ADAPTER
+    site = str(site).strip().lower()
+    return site or GENERIC_ADAPTER
+
+def get_adapter_class(site):
+    """获取站点对应的适配器类，未注册的站点使用通用ATS适配器
+    
+    Args:
+        site: 站点名称
+    
+    Returns:
+        type: 适配器类
+    """
+    return ADAPTER_REGISTRY.get(normalize_site(site), ADAPTER_REGISTRY[GENERIC_ADAPTER])
+
+def site_credentials(credentials, site):
+    """从凭据中取出某个站点的凭据
+    
+    Args:
+        credentials: 单个凭据字典，或以站点名称为键的凭据字典
+        site: 站点名称
+    
+    Returns:
+        dict: 该站点的凭据，没有时返回None
+    """
+    if not credentials:
+        return None
+    if site in credentials and isinstance(credentials[site], dict):
+        return credentials[site]
+    if "email" in credentials:
+        return credentials
+    return None
+
+class ApplicationAdapter(ABC):
+    """申请适配器基类，每个实例使用一个AutomatedApplicationSystem（及其浏览器），子类必须实现apply"""
+    
+    # 适配器对应的站点名称
+    site = None
+    # 结果中显示的平台名称
+    platform = ""
+    
+    def __init__(self, application_system):
+        """初始化申请适配器
+        
+        Args:
+            application_system: AutomatedApplicationSystem实例
+        """
+        self.application_system = application_system
+    
+    def ensure_browser(self):
+        """确保浏览器已使用本平台的配置启动
+        
+        Returns:
+            bool: 浏览器是否可用
+        """
+        if self.application_system.browser:
+            return True
+        return self.application_system.initialize_browser(platform=self.site)
+    
+    @abstractmethod
+    def apply(self, job_data, resume_file, cover_letter_file=None, credentials=None):
+        """申请工作
+        
+        Args:
+            job_data: 工作数据（字典或DataFrame行）
+            resume_file: 简历文件路径
+            cover_letter_file: 求职信文件路径
+            credentials: 登录凭据
+        
+        Returns:
+            dict: 申请结果
+        """
+
+@register_adapter("linkedin")
+class LinkedInAdapter(ApplicationAdapter):
+    """LinkedIn适配器，使用Easy Apply流程"""
+    
+    platform = "LinkedIn"
+    
+    def apply(self, job_data, resume_file, cover_letter_file=None, credentials=None):
+        """在LinkedIn上申请工作"""
+        if not self.ensure_browser():
+            return {"success": False, "message": "浏览器初始化失败", "job_url": job_data.get("JOB_URL", ""), "platform": self.platform}
+        return self.application_system.apply_linkedin(
+            job_data.get("JOB_URL", ""),
+            resume_file,
+            cover_letter_file=cover_letter_file,
+            credentials=site_credentials(credentials, self.site)
+        )
+
+@register_adapter(GENERIC_ADAPTER, "google", "zip_recruiter")
+class GenericATSAdapter(ApplicationAdapter):
+    """通用ATS表单适配器：点击申请按钮，按字段名称填写表单，上传简历并提交"""
+    
+    platform = "ATS"
+    # 申请按钮的定位方式，按优先级排列
+    apply_button_selectors = [
+        (By.XPATH, "//button[contains(translate(text(), 'APLYNOW', 'aplynow'), 'apply')]"),
+        (By.XPATH, "//a[contains(translate(text(), 'APLYNOW', 'aplynow'), 'apply')]"),
+        (By.XPATH, "//button[contains(text(), '申请')]")
+    ]
+    # 提交按钮的定位方式，按优先级排列
+    submit_selectors = [
+        (By.CSS_SELECTOR, "button[type='submit']"),
+        (By.CSS_SELECTOR, "input[type='submit']"),
+        (By.XPATH, "//button[contains(text(), 'Submit')]"),
+        (By.XPATH, "//button[contains(text(), '提交')]")
+    ]
+    # 页面标记
+    markers = {
+        "unavailable": {"texts": ["no longer available", "no longer accepting", "job has expired"], "case_insensitive": True},
+        "signed_out": [],
+        "submitted": {"texts": ["application submitted", "application has been received", "thank you for applying",
+                                "thanks for applying", "已提交申请"], "case_insensitive": True}
+    }
+    
+    def apply(self, job_data, resume_file, cover_letter_file=None, credentials=None):
+        """通过通用表单流程申请工作"""
+        job_url = job_data.get("JOB_URL", "")
+        result = {
+            "success": False,
+            "message": "",
+            "job_url": job_url,
+            "platform": self.platform,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        if not self.ensure_browser():
+            result["message"] = "浏览器初始化失败"
+            return result
+        
+        browser = self.application_system.browser
+        self.probe = PageStateProbe(browser, self.markers)
+        start_time = time.perf_counter()
+        context = {
+            "job_url": job_url,
+            "resume_file": resume_file,
+            "cover_letter_file": cover_letter_file,
+            "resume_data": self.application_system.extract_resume_data(resume_file),
+            "result": result
+        }
+        artifacts = self.application_system.artifacts.recorder(self.site)
+        machine = StepMachine(browser, self.build_steps(context), self.application_system.step_timeouts,
+                              on_step=artifacts.step_hook(browser) if self.application_system.capture_steps else None)
+        context["machine"] = machine
+        
+        try:
+            machine.run("open_job", context)
+            result["screenshot"] = artifacts.capture(browser, "final")
+        except StepAbort as e:
+            result["message"] = e.message
+            result["retryable"] = e.retryable
+            result["screenshot"] = artifacts.capture(browser, "aborted")
+        except Exception as e:
+            result["message"] = f"申请过程中出错: {str(e)}"
+            result["screenshot"] = artifacts.capture(browser, "error")
+        
+        result["artifacts_dir"] = artifacts.directory
+        result["steps"] = machine.records
+        result.update(summarize_step_records(machine.records))
+        result.update(self.probe.stats())
+        result["session"] = self.application_system.get_session_metrics()
+        result["duration"] = round(time.perf_counter() - start_time, 3)
+        return result
+    
+    def build_steps(self, context):
+        """构建通用表单流程的步骤列表
+        
+        Args:
+            context: 申请上下文
+        
+        Returns:
+            list: ApplyStep列表
+        """
+        return [
+            ApplyStep("open_job", self.open_job),
+            ApplyStep(f"{self.site}_job_page", self.check_job_page, ready=self.document_ready),
+            ApplyStep(f"{self.site}_apply_button", self.click_apply, ready=self.find_apply_button,
+                      timeout_message=f"找不到{self.platform}申请按钮"),
+            ApplyStep(f"{self.site}_form", self.fill_form, ready=self.find_form,
+                      timeout_message=f"{self.platform}申请表单未出现"),
+            ApplyStep(f"{self.site}_submit", self.click_submit, ready=self.find_submit_button,
+                      timeout_message=f"找不到{self.platform}提交按钮"),
+            ApplyStep(f"{self.site}_confirmation", self.check_submitted,
+                      ready=lambda driver: self.probe.state(refresh=True)["submitted"], optional=True)
+        ]
+    
+    def document_ready(self, driver):
+        """就绪条件：页面文档已解析完成"""
+        return self.probe.state(refresh=True).get("ready_state") in ("interactive", "complete")
+    
+    def find_first(self, driver, selectors):
+        """按顺序查找第一个可见且可用的元素
+        
+        Args:
+            driver: WebDriver实例
+            selectors: (By, 选择器)列表
+        
+        Returns:
+            WebElement: 找到的元素，没有时返回False
+        """
+        for by, selector in selectors:
+            for element in driver.find_elements(by, selector):
+                if element.is_displayed() and element.is_enabled():
+                    return element
+        return False
+    
+    def open_job(self, context, ready_value):
+        """步骤：访问工作页面"""
+        self.probe.navigate(context["job_url"])
+        return f"{self.site}_job_page"
+    
+    def check_job_page(self, context, ready_value):
+        """步骤：检查工作是否可用、是否需要登录，以及表单是否已直接显示"""
+        state = self.probe.state()
+        if state["unavailable"]:
+            raise StepAbort("此工作已不可用", retryable=False)
+        if state["signed_out"]:
+            raise StepAbort(f"{self.platform}需要登录才能申请工作", retryable=False)
+        if self.find_form(self.application_system.browser):
+            return f"{self.site}_form"
+        return f"{self.site}_apply_button"
+    
+    def find_apply_button(self, driver):
+        """就绪条件：申请按钮可点击"""
+        return self.find_first(driver, self.apply_button_selectors)
+    
+    def click_apply(self, context, apply_button):
+        """步骤：点击申请按钮，按钮在新窗口打开公司申请页面时切换到新窗口"""
+        browser = self.application_system.browser
+        handles = set(browser.window_handles)
+        apply_button.click()
+        self.probe.invalidate()
+        new_handles = [handle for handle in browser.window_handles if handle not in handles]
+        if new_handles:
+            browser.switch_to.window(new_handles[0])
+        return f"{self.site}_form"
+    
+    def find_form(self, driver):
+        """就绪条件：申请表单出现（有文件上传框或邮箱输入框）"""
+        return self.find_first(driver, [
+            (By.CSS_SELECTOR, "input[type='file']"),
+            (By.CSS_SELECTOR, "input[type='email']"),
+            (By.CSS_SELECTOR, "input[name*='email' i]")
+        ]) or bool(driver.find_elements(By.CSS_SELECTOR, "input[type='file']"))
+    
+    def fill_form(self, context, ready_value):
+        """步骤：填写表单字段并上传简历和求职信"""
+        browser = self.application_system.browser
+        resume_data = context["resume_data"]
+        for field, selectors in FORM_FIELD_SELECTORS.items():
+            value = resume_data.get(field)
+            if not value:
+                continue
+            element = self.find_first(browser, [(By.CSS_SELECTOR, selector) for selector in selectors])
+            if element:
+                element.clear()
+                element.send_keys(value)
+        
+        # 第一个文件上传框上传简历，第二个（如果有）上传求职信
+        file_inputs = browser.find_elements(By.CSS_SELECTOR, "input[type='file']")
+        if file_inputs:
+            file_inputs[0].send_keys(os.path.abspath(context["resume_file"]))
+        if len(file_inputs) > 1 and context["cover_letter_file"]:
+            file_inputs[1].send_keys(os.path.abspath(context["cover_letter_file"]))
+        self.probe.invalidate()
+        return f"{self.site}_submit"
+    
+    def find_submit_button(self, driver):
+        """就绪条件：提交按钮可点击"""
+        return self.find_first(driver, self.submit_selectors)
+    
+    def click_submit(self, context, submit_button):
+        """步骤：点击提交按钮"""
+        self.application_system.notify_submitting(context["job_url"])
+        submit_button.click()
+        self.probe.invalidate()
+        return f"{self.site}_confirmation"
+    
+    def check_submitted(self, context, ready_value):
+        """步骤：检查是否申请成功"""
+        result = context["result"]
+        if self.probe.state()["submitted"]:
+            result["success"] = True
+            result["message"] = "申请成功提交"
+        else:
+            result["message"] = "申请可能未成功提交，请手动检查"
+        return None
+
+@register_adapter("indeed")
+class IndeedAdapter(GenericATSAdapter):
+    """Indeed适配器，使用Indeed Apply按钮，外部申请时跳转到公司ATS表单"""
+    
+    platform = "Indeed"
+    apply_button_selectors = [
+        (By.CSS_SELECTOR, "#indeedApplyButton"),
+        (By.CSS_SELECTOR, "button[id*='indeedApply']"),
+        (By.CSS_SELECTOR, "button[aria-label*='Apply' i]")
+    ] + GenericATSAdapter.apply_button_selectors
+    markers = dict(GenericATSAdapter.markers, signed_out=["Sign in to apply"])
+
+@register_adapter("glassdoor")
+class GlassdoorAdapter(GenericATSAdapter):
+    """Glassdoor适配器，使用Easy Apply按钮，外部申请时跳转到公司ATS表单"""
+    
+    platform = "Glassdoor"
+    apply_button_selectors = [
+        (By.CSS_SELECTOR, "button[data-test='easyApply']"),
+        (By.CSS_SELECTOR, "button[data-test='applyButton']"),
+        (By.CSS_SELECTOR, "a[data-test='applyButton']")
+    ] + GenericATSAdapter.apply_button_selectors
+    markers = dict(GenericATSAdapter.markers, signed_out=["Sign in to apply"])
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 异步申请调度器
+按招聘网站把职位分派给对应的申请适配器，每个平台有独立的并发上限和速率限制，慢平台不会阻塞其他平台的申请
+"""
+
+import time
+import asyncio
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from application_adapters import ADAPTER_REGISTRY, GENERIC_ADAPTER, get_adapter_class
+from browser_pool import BrowserPool
+from application_queue import STATUS_DONE, default_owner
+from metrics import span, inc
+
+# 各平台默认的并发上限和每分钟最多开始的申请数量
+DEFAULT_PLATFORM_LIMITS = {
+    "linkedin": {"concurrency": 1, "per_minute": 6},
+    "indeed": {"concurrency": 2, "per_minute": 10},
+    "glassdoor": {"concurrency": 1, "per_minute": 6},
+    GENERIC_ADAPTER: {"concurrency": 2, "per_minute": 20}
+}
+
+def job_records(jobs, max_applications=None):
+    """把职位数据转换为字典列表
+    
+    Args:
+        jobs: 职位DataFrame或字典列表
+        max_applications: 最大数量，默认为None（不限制）
+    
+    Returns:
+        list: 职位字典列表
+    """
+    if isinstance(jobs, pd.DataFrame):
+        records = jobs.to_dict("records")
+    else:
+        records = [job.to_dict() if isinstance(job, pd.Series) else dict(job) for job in jobs]
+    if max_applications is not None:
+        records = records[:max_applications]
+    return records
+
+def platform_sites():
+    """各平台在队列中对应的站点条件，通用平台处理所有没有专用适配器的站点
+    
+    Returns:
+        dict: 平台名称到ApplicationQueue.lease站点参数（sites或exclude_sites）的映射
+    """
+    sites = {}
+    for site, adapter_class in ADAPTER_REGISTRY.items():
+        if adapter_class.site != GENERIC_ADAPTER:
+            sites.setdefault(adapter_class.site, []).append(site)
+    dedicated = sorted(site for platform_sites in sites.values() for site in platform_sites)
+    conditions = {platform: {"sites": sorted(platform_sites)} for platform, platform_sites in sites.items()}
+    conditions[GENERIC_ADAPTER] = {"exclude_sites": dedicated}
+    return conditions
+
+class RateLimiter:
+    """异步速率限制器，保证同一平台相邻两次申请的开始时间间隔不小于60/per_minute秒"""
+    
+    def __init__(self, per_minute):
+        """初始化速率限制器
+        
+        Args:
+            per_minute: 每分钟最多开始的次数，0或None表示不限制
+        """
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_time = 0.0
+        self.lock = asyncio.Lock()
+    
+    async def wait(self):
+        """等待直到允许开始下一次申请"""
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self.next_time > now:
+                await asyncio.sleep(self.next_time - now)
+                now = loop.time()
+            self.next_time = now + self.interval
+
+class ApplicationDispatcher:
+    """异步申请调度器类，每个平台使用独立的浏览器会话池、并发信号量和速率限制器"""
+    
+    def __init__(self, system_factory, platform_limits=None, thread_initializer=None):
+        """初始化申请调度器
+        
+        Args:
+            system_factory: 创建AutomatedApplicationSystem实例的函数，每个实例持有一个浏览器
+            platform_limits: 覆盖默认值的平台限制，格式同DEFAULT_PLATFORM_LIMITS
+            thread_initializer: 每个申请工作线程启动时调用的函数（如把线程加入性能分析）
+        """
+        self.system_factory = system_factory
+        self.thread_initializer = thread_initializer
+        self.platform_limits = {platform: dict(limits) for platform, limits in DEFAULT_PLATFORM_LIMITS.items()}
+        for platform, limits in (platform_limits or {}).items():
+            self.platform_limits.setdefault(platform, dict(DEFAULT_PLATFORM_LIMITS[GENERIC_ADAPTER])).update(limits)
+        self.pools = {}
+        self.pools_lock = threading.Lock()
+    
+    def limits(self, platform):
+        """获取平台的限制
+        
+        Args:
+            platform: 平台名称（适配器的site）
+        
+        Returns:
+            dict: 并发上限和每分钟申请数量
+        """
+        return self.platform_limits.get(platform, self.platform_limits[GENERIC_ADAPTER])
+    
+    def pool(self, platform):
+        """获取平台的浏览器会话池，多个工作线程同时首次使用时只创建一个
+        
+        Args:
+            platform: 平台名称
+        
+        Returns:
+            BrowserPool: 会话池
+        """
+        with self.pools_lock:
+            if platform not in self.pools:
+                self.pools[platform] = BrowserPool(self.system_factory, self.limits(platform)["concurrency"], platform)
+            return self.pools[platform]
+    
+    def apply_blocking(self, adapter_class, job, resume_file, cover_letter_file, credentials, submit_hook=None):
+        """在工作线程中使用会话池中的浏览器申请一个职位
+        
+        Args:
+            adapter_class: 适配器类
+            job: 职位字典
+            resume_file: 简历文件路径
+            cover_letter_file: 求职信文件路径
+            credentials: 登录凭据
+            submit_hook: 点击最终提交按钮之前调用的函数，参数为工作URL
+        
+        Returns:
+            dict: 申请结果
+        """
+        with span("apply", platform=adapter_class.site), self.pool(adapter_class.site).session() as system:
+            system.submit_hook = submit_hook
+            try:
+                result = adapter_class(system).apply(job, resume_file, cover_letter_file, credentials)
+            except Exception as e:
+                result = {
+                    "success": False,
+                    "message": f"申请过程中出错: {str(e)}",
+                    "job_url": job.get("JOB_URL", ""),
+                    "platform": adapter_class.platform,
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+            finally:
+                system.submit_hook = None
+        inc("job_assistant_applications_total", help="申请次数", platform=adapter_class.site,
+            outcome="success" if result.get("success") else "failure")
+        result.setdefault("job_title", job.get("TITLE", ""))
+        result.setdefault("company", job.get("COMPANY", ""))
+        result.setdefault("site", job.get("SITE", ""))
+        return result
+    
+    def start_run(self, platforms):
+        """为一次调度准备线程池以及各平台的信号量和速率限制器
+        
+        Args:
+            platforms: 本次调度可能用到的平台名称
+        """
+        self.semaphores = {}
+        self.limiters = {}
+        self.workers = max(1, sum(self.limits(platform)["concurrency"] for platform in platforms))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="apply",
+                                           initializer=self.thread_initializer)
+    
+    def finish_run(self):
+        """结束一次调度，等待工作线程退出"""
+        self.executor.shutdown(wait=True)
+        self.executor = None
+    
+    async def apply_job(self, job, resume_file, cover_letter_file=None, credentials=None, submit_hook=None):
+        """在平台的并发上限和速率限制之内申请一个职位（需在start_run之后调用）
+        
+        Args:
+            job: 职位字典
+            resume_file: 简历文件路径
+            cover_letter_file: 求职信文件路径
+            credentials: 登录凭据
+            submit_hook: 点击最终提交按钮之前调用的函数
+        
+        Returns:
+            dict: 申请结果
+        """
+        adapter_class = get_adapter_class(job.get("SITE"))
+        platform = adapter_class.site
+        if platform not in self.semaphores:
+            limits = self.limits(platform)
+            self.semaphores[platform] = asyncio.Semaphore(limits["concurrency"])
+            self.limiters[platform] = RateLimiter(limits["per_minute"])
+        
+        async with self.semaphores[platform]:
+            await self.limiters[platform].wait()
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.apply_blocking, adapter_class, job, resume_file, cover_letter_file, credentials, submit_hook
+            )
+    
+    async def dispatch(self, jobs, resume_file, cover_letter_file=None, credentials=None,
+                       max_applications=None, on_result=None):
+        """并发申请多个职位
+        
+        Args:
+            jobs: 职位DataFrame或字典列表
+            resume_file: 简历文件路径
+            cover_letter_file: 求职信文件路径
+            credentials: 登录凭据，可以是以站点名称为键的字典
+            max_applications: 最大申请数量
+            on_result: 每个申请完成时在事件循环线程中调用的函数，参数为申请结果
+        
+        Returns:
+            list: 与输入职位顺序一致的申请结果列表
+        """
+        records = job_records(jobs, max_applications)
+        if not records:
+            return []
+        
+        async def apply_one(job):
+            result = await self.apply_job(job, resume_file, cover_letter_file, credentials)
+            if on_result:
+                on_result(result)
+            return result
+        
+        self.start_run({get_adapter_class(job.get("SITE")).site for job in records})
+        try:
+            return await asyncio.gather(*[apply_one(job) for job in records])
+        finally:
+            self.finish_run()
+    
+    async def dispatch_queue(self, queue, resume_file=None, cover_letter_file=None, credentials=None,
+                             owner=None, on_result=None, max_wait=0, stop_event=None, batch_id=None, session_id=None):
+        """从持久化申请队列中租用职位并发申请，直到批次中没有可处理的项
+        
+        每个平台只租用该平台空闲并发数量的项，慢平台积压的职位不会占满其他平台的名额；
+        成功的项标记为完成，失败的项按退避重新排队或进入死信；
+        进程崩溃后重新调用即可继续，已完成的项不会再次申请
+        
+        Args:
+            queue: ApplicationQueue实例
+            resume_file: 队列项没有保存简历路径时（旧的队列项）使用的简历文件
+            cover_letter_file: 队列项没有保存简历路径时使用的求职信文件
+            credentials: 登录凭据
+            owner: 租约持有者标识，默认为当前进程
+            on_result: 每个申请完成时调用的函数，参数为申请结果
+            max_wait: 队列中只剩等待重试的项时，最多等待多少秒
+            stop_event: threading.Event，设置后不再租用新的项，正在申请的项完成后返回
+            batch_id: 只处理该批次的项，默认为None（不限批次）
+            session_id: 只处理该会话加入的项，默认为None（不限会话）
+        
+        Returns:
+            list: 本次处理的申请结果列表
+        """
+        owner = owner or default_owner()
+        released = queue.release_dead_owners()
+        if released:
+            print(f"已释放 {released} 个中断进程持有的申请租约")
+        
+        async def process(item):
+            key = item["key"]
+            if item["resume_file"]:
+                files = (item["resume_file"], item["cover_letter_file"])
+            else:
+                files = (resume_file, cover_letter_file)
+            result = await self.apply_job(
+                item["job"], *files, credentials,
+                submit_hook=lambda job_url: queue.mark_submitting(key, owner)
+            )
+            # 租约过期后被其他持有者接手时，队列项的状态由新的持有者决定
+            if result.get("success"):
+                result["queue_status"] = STATUS_DONE if queue.complete(key, owner, result) else None
+            else:
+                result["queue_status"] = queue.fail(key, owner, result.get("message", ""), result.get("retryable", True))
+            if on_result:
+                on_result(result)
+            return result
+        
+        conditions = platform_sites()
+        self.start_run(conditions.keys())
+        results = []
+        in_flight = set()
+        running = {platform: 0 for platform in conditions}
+        
+        def finished(platform):
+            running[platform] -= 1
+        
+        try:
+            while True:
+                stopping = stop_event is not None and stop_event.is_set()
+                if not stopping:
+                    # 每个平台按自己的空闲并发数租用，避免某个平台的积压占满全部工作线程
+                    for platform, condition in conditions.items():
+                        free = self.limits(platform)["concurrency"] - running[platform]
+                        if free <= 0:
+                            continue
+                        for item in queue.lease(owner, free, batch_id=batch_id, session_id=session_id, **condition):
+                            task = asyncio.ensure_future(process(item))
+                            running[platform] += 1
+                            task.add_done_callback(lambda _, platform=platform: finished(platform))
+                            in_flight.add(task)
+                
+                if not in_flight:
+                    if stopping:
+                        break
+                    next_time = queue.next_available_time(batch_id, session_id)
+                    if next_time is None or next_time - time.time() > max_wait:
+                        break
+                    await asyncio.sleep(min(1.0, max(0.0, next_time - time.time())))
+                    continue
+                
+                done, in_flight = await asyncio.wait(in_flight, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+                results.extend(task.result() for task in done)
+        finally:
+            if in_flight:
+                await asyncio.wait(in_flight)
+            self.finish_run()
+        return results
+    
+    def run(self, jobs, resume_file, cover_letter_file=None, credentials=None, max_applications=None, on_result=None):
+        """同步接口：在新的事件循环中并发申请多个职位
+        
+        Args:
+            参数同dispatch
+        
+        Returns:
+            list: 申请结果列表
+        """
+        return asyncio.run(self.dispatch(jobs, resume_file, cover_letter_file, credentials, max_applications, on_result))
+    
+    def run_queue(self, queue, resume_file=None, cover_letter_file=None, credentials=None, on_result=None, max_wait=0,
+                  stop_event=None, batch_id=None, session_id=None):
+        """同步接口：在新的事件循环中处理持久化申请队列
+        
+        Args:
+            参数同dispatch_queue
+        
+        Returns:
+            list: 本次处理的申请结果列表
+        """
+        return asyncio.run(self.dispatch_queue(queue, resume_file, cover_letter_file, credentials,
+                                               on_result=on_result, max_wait=max_wait, stop_event=stop_event,
+                                               batch_id=batch_id, session_id=session_id))
+    
+    def close(self):
+        """关闭所有会话池中的浏览器"""
+        with self.pools_lock:
+            pools, self.pools = self.pools, {}
+        for pool in pools.values():
+            pool.close()
+
+# 测试代码
+if __name__ == "__main__":
+    import os
+    import sys
+    from automated_application_system import AutomatedApplicationSystem
+    from fixture_site import FixtureJobSite
+    
+    # 启动本地测试网站，ATS页面模拟一个较慢的平台
+    site = FixtureJobSite(path_delays={"/ats/": 1.0})
+    base_url = site.start()
+    
+    def create_system():
+        system = AutomatedApplicationSystem()
+        system.linkedin_base_url = base_url
+        return system
+    
+    jobs = [{"SITE": "linkedin", "JOB_URL": site.url(f"/jobs/view/{i}"), "TITLE": f"LinkedIn Job {i}"} for i in range(3)]
+    jobs += [{"SITE": "zip_recruiter", "JOB_URL": site.url(f"/ats/jobs/{i}"), "TITLE": f"ATS Job {i}"} for i in range(3)]
+    resume_file = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else "resume_content.txt")
+    credentials = {"linkedin": {"email": "demo@example.com", "password": "demo"}}
+    
+    dispatcher = ApplicationDispatcher(create_system, platform_limits={
+        "linkedin": {"per_minute": 0},
+        GENERIC_ADAPTER: {"per_minute": 0}
+    })
+    start_time = time.perf_counter()
+    try:
+        results = dispatcher.run(jobs, resume_file, credentials=credentials,
+                                 on_result=lambda r: print(f"完成 {r['job_title']}: {r['message']}"))
+    finally:
+        dispatcher.close()
+        site.stop()
+    print(f"共申请 {len(results)} 个职位，成功 {sum(r['success'] for r in results)} 个，总耗时 {time.perf_counter() - start_time:.2f} 秒")
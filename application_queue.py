@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 持久化申请队列
+基于SQLite的申请工作队列，以JOB_URL作为幂等键，支持租约、退避重试和死信，批量申请中途崩溃后可以继续而不会重复申请
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 队列项状态
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_SUBMITTING = "submitting"
+STATUS_DONE = "done"
+STATUS_DEAD = "dead"
+
+# 生成幂等键时去掉的跟踪参数
+TRACKING_PARAMS = {"trk", "trackingid", "refid", "ref", "src", "from", "fbclid", "gclid", "currentjobid", "eborigin"}
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS application_queue (
+    idempotency_key TEXT PRIMARY KEY,
+    batch_id TEXT,
+    session_id TEXT,
+    job_url TEXT,
+    site TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_application_queue_ready ON application_queue (status, available_at);
+"""
+
+# 创建索引前需要先为旧的队列表补充列
+QUEUE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_application_queue_batch ON application_queue (batch_id, status);
+CREATE INDEX IF NOT EXISTS idx_application_queue_session ON application_queue (session_id, batch_id, status);
+"""
+
+def idempotency_key(job_url):
+    """根据JOB_URL生成幂等键：统一大小写、去掉片段、跟踪参数和末尾斜杠
+    
+    Args:
+        job_url: 工作URL
+    
+    Returns:
+        str: 幂等键
+    """
+    parts = urlsplit(str(job_url).strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+def load_payload(payload):
+    """解析队列项的内容，兼容只保存了职位字典的旧队列项
+    
+    Returns:
+        dict: job、resume_file和cover_letter_file
+    """
+    data = json.loads(payload)
+    if isinstance(data, dict) and isinstance(data.get("job"), dict) and "resume_file" in data:
+        return data
+    return {"job": data, "resume_file": None, "cover_letter_file": None}
+
+def default_owner():
+    """生成当前进程的租约持有者标识，格式为 主机名:进程ID:随机串"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def process_alive(pid):
+    """判断本机进程是否仍在运行"""
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+
+class ApplicationQueue:
+    """持久化申请队列类"""
+    
+    def __init__(self, db_file, max_attempts=3, lease_seconds=600, backoff_base=30.0, backoff_max=1800.0):
+        """初始化申请队列
+        
+        Args:
+            db_file: SQLite数据库文件路径
+            max_attempts: 最大尝试次数，超过后进入死信
+            lease_seconds: 租约时长（秒），持有者在此时间内未完成则其他进程可以接手
+            backoff_base: 重试退避的基础时间（秒），第n次失败后等待 base * 2^(n-1) 秒
+            backoff_max: 重试退避的上限（秒）
+        """
+        self.db_file = db_file
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(QUEUE_SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(application_queue)")}
+        if "session_id" not in columns:
+            self.conn.execute("ALTER TABLE application_queue ADD COLUMN session_id TEXT")
+        self.conn.executescript(QUEUE_INDEXES)
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+    
+    def _transaction(self, func):
+        """在写事务中执行函数
+        
+        Args:
+            func: 参数为连接的函数
+        
+        Returns:
+            函数的返回值
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = func(self.conn)
+                self.conn.execute("COMMIT")
+                return value
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+    
+    def _query(self, sql, params=()):
+        """在锁内执行只读查询，不会与其他线程的写事务交错
+        
+        Returns:
+            list: 结果行列表
+        """
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def enqueue(self, jobs, batch_id=None, session_id=None, resume_file=None, cover_letter_file=None):
+        """把职位加入队列，已存在的幂等键（包括已完成和死信）会被忽略
+        
+        简历和求职信路径与职位一起保存，处理队列项时使用加入队列时的文件；登录凭据不写入队列
+        
+        Args:
+            jobs: 职位字典列表
+            batch_id: 批次标识
+            session_id: 加入队列的会话
+            resume_file: 简历文件路径
+            cover_letter_file: 求职信文件路径
+        
+        Returns:
+            int: 新加入的数量
+        """
+        now = time.time()
+        rows = []
+        for job in jobs:
+            job_url = job.get("JOB_URL")
+            if not job_url or (isinstance(job_url, float) and job_url != job_url):
+                continue
+            payload = {"job": job, "resume_file": resume_file, "cover_letter_file": cover_letter_file}
+            rows.append((
+                idempotency_key(job_url), batch_id, session_id, str(job_url), str(job.get("SITE", "") or ""),
+                json.dumps(payload, ensure_ascii=False, default=str), STATUS_PENDING, now, now, now
+            ))
+        
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO application_queue "
+                "(idempotency_key, batch_id, session_id, job_url, site, payload, status, available_at, created_at, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+        return self._transaction(insert)
+    
+    def lease(self, owner, limit=1, batch_id=None, session_id=None, sites=None, exclude_sites=None):
+        """租用可处理的队列项：到期的待处理项，以及租约已过期的项
+        
+        租约过期时处于提交中的项可能已经提交过，不会再次处理，而是进入死信等待人工确认
+        
+        Args:
+            owner: 租约持有者标识
+            limit: 最多租用的数量
+            batch_id: 只租用该批次的项，默认为None（不限批次）
+            session_id: 只租用该会话加入的项，默认为None（不限会话）
+            sites: 只租用这些站点（小写）的项
+            exclude_sites: 不租用这些站点（小写）的项
+        
+        Returns:
+            list: 队列项字典列表，包含key、job、resume_file、cover_letter_file、batch_id、session_id和attempts
+        """
+        now = time.time()
+        scope, scope_params = self._scope(batch_id, session_id, sites, exclude_sites)
+        
+        def take(conn):
+            conn.execute(
+                "UPDATE application_queue SET status = ?, last_error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ?",
+                (STATUS_DEAD, "提交过程中断，申请可能已提交，请手动确认", now, STATUS_SUBMITTING, now)
+            )
+            rows = conn.execute(
+                "SELECT idempotency_key, batch_id, session_id, payload, attempts FROM application_queue "
+                "WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?))" + scope +
+                "ORDER BY available_at, created_at LIMIT ?",
+                (STATUS_PENDING, now, STATUS_LEASED, now, *scope_params, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE application_queue SET status = ?, lease_owner = ?, lease_expires_at = ?, updated_at = ? "
+                "WHERE idempotency_key = ?",
+                [(STATUS_LEASED, owner, now + self.lease_seconds, now, row["idempotency_key"]) for row in rows]
+            )
+            return [dict(load_payload(row["payload"]), key=row["idempotency_key"], batch_id=row["batch_id"],
+                         session_id=row["session_id"], attempts=row["attempts"]) for row in rows]
+        return self._transaction(take)
+    
+    @staticmethod
+    def _scope(batch_id=None, session_id=None, sites=None, exclude_sites=None):
+        """生成限定批次、会话和站点的查询条件
+        
+        Returns:
+            tuple: (以AND开头的条件, 参数列表)
+        """
+        conditions = []
+        params = []
+        if batch_id is not None:
+            conditions.append("batch_id = ?")
+            params.append(batch_id)
+        if session_id is not None:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        if sites is not None:
+            conditions.append(f"LOWER(TRIM(COALESCE(site, ''))) IN ({', '.join('?' * len(sites))})")
+            params.extend(sites)
+        if exclude_sites:
+            conditions.append(f"LOWER(TRIM(COALESCE(site, ''))) NOT IN ({', '.join('?' * len(exclude_sites))})")
+            params.extend(exclude_sites)
+        return "".join(f" AND {condition}" for condition in conditions), params
+    
+    def mark_submitting(self, key, owner):
+        """标记队列项即将提交申请，此后中断的项不会被自动重试
+        
+        Args:
+            key: 幂等键
+            owner: 租约持有者标识
+        """
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE application_queue SET status = ?, updated_at = ? WHERE idempotency_key = ? AND lease_owner = ?",
+            (STATUS_SUBMITTING, time.time(), key, owner)
+        ))
+    
+    def complete(self, key, owner, result):
+        """标记队列项已完成，租约已被其他持有者接手时不修改
+        
+        Args:
+            key: 幂等键
+            owner: 租约持有者标识
+            result: 申请结果
+        
+        Returns:
+            bool: 是否已标记
+        """
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE application_queue SET status = ?, result = ?, lease_owner = NULL, lease_expires_at = NULL, "
+            "updated_at = ? WHERE idempotency_key = ? AND lease_owner = ?",
+            (STATUS_DONE, json.dumps(result, ensure_ascii=False, default=str), time.time(), key, owner)
+        ).rowcount > 0)
+    
+    def fail(self, key, owner, error, retryable=True):
+        """记录一次失败：未超过最大尝试次数且可重试时按指数退避重新排队，否则进入死信
+        
+        Args:
+            key: 幂等键
+            owner: 租约持有者标识，租约已被其他持有者接手时不修改
+            error: 错误说明
+            retryable: 是否可以重试
+        
+        Returns:
+            str: 队列项的新状态，租约已不属于owner时返回None
+        """
+        now = time.time()
+        
+        def update(conn):
+            row = conn.execute(
+                "SELECT attempts, status FROM application_queue WHERE idempotency_key = ? AND lease_owner = ?",
+                (key, owner)
+            ).fetchone()
+            if row is None:
+                return None
+            attempts = row["attempts"] + 1
+            # 已经点击过提交的申请不自动重试，避免重复申请
+            if not retryable or attempts >= self.max_attempts or row["status"] == STATUS_SUBMITTING:
+                status = STATUS_DEAD
+                available_at = now
+            else:
+                status = STATUS_PENDING
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+                available_at = now + delay * random.uniform(0.8, 1.2)
+            conn.execute(
+                "UPDATE application_queue SET status = ?, attempts = ?, available_at = ?, last_error = ?, "
+                "lease_owner = NULL, lease_expires_at = NULL, updated_at = ? WHERE idempotency_key = ? AND lease_owner = ?",
+                (status, attempts, available_at, error, now, key, owner)
+            )
+            return status
+        return self._transaction(update)
+    
+    def release_dead_owners(self):
+        """立即释放本机已退出进程持有的租约，使崩溃后的重启无需等待租约过期
+        
+        Returns:
+            int: 释放的租约数量
+        """
+        hostname = socket.gethostname()
+        now = time.time()
+        
+        def release(conn):
+            # 查询和释放在同一个事务中，释放的只是查询时仍由已退出进程持有的租约
+            rows = conn.execute(
+                "SELECT idempotency_key, lease_owner FROM application_queue WHERE status IN (?, ?) AND lease_owner LIKE ?",
+                (STATUS_LEASED, STATUS_SUBMITTING, f"{hostname}:%")
+            ).fetchall()
+            stale = [(row["idempotency_key"], row["lease_owner"]) for row in rows
+                     if row["lease_owner"].split(":")[1].isdigit() and not process_alive(int(row["lease_owner"].split(":")[1]))]
+            conn.executemany(
+                "UPDATE application_queue SET lease_expires_at = ?, updated_at = ? WHERE idempotency_key = ? AND lease_owner = ?",
+                [(now - 1, now, key, owner) for key, owner in stale]
+            )
+            return len(stale)
+        return self._transaction(release)
+    
+    def next_available_time(self, batch_id=None, session_id=None):
+        """获取下一个待重试项的可处理时间
+        
+        Args:
+            batch_id: 只看该批次的项
+            session_id: 只看该会话加入的项
+        
+        Returns:
+            float: 时间戳，没有待处理项时返回None
+        """
+        scope, scope_params = self._scope(batch_id, session_id)
+        rows = self._query(
+            "SELECT MIN(available_at) AS next_time FROM application_queue WHERE status = ?" + scope,
+            (STATUS_PENDING, *scope_params)
+        )
+        return rows[0]["next_time"]
+    
+    def unfinished_batches(self, session_id=None):
+        """获取还有未完成项（待处理、已租用或提交中）的批次
+        
+        Args:
+            session_id: 只看该会话加入的批次，默认为None（所有会话）
+        
+        Returns:
+            list: 批次字典列表，包含batch_id、session_id和未完成数量，按批次标识排序
+        """
+        scope, scope_params = self._scope(session_id=session_id)
+        rows = self._query(
+            "SELECT batch_id, session_id, COUNT(*) AS count FROM application_queue WHERE status IN (?, ?, ?)" + scope +
+            " GROUP BY batch_id, session_id ORDER BY batch_id",
+            (STATUS_PENDING, STATUS_LEASED, STATUS_SUBMITTING, *scope_params)
+        )
+        return [{"batch_id": row["batch_id"], "session_id": row["session_id"], "unfinished": row["count"]} for row in rows]
+    
+    def stats(self, batch_id=None):
+        """统计各状态的队列项数量
+        
+        Args:
+            batch_id: 批次标识，默认为None（所有批次）
+        
+        Returns:
+            dict: 状态到数量的映射
+        """
+        if batch_id is None:
+            rows = self._query("SELECT status, COUNT(*) AS count FROM application_queue GROUP BY status")
+        else:
+            rows = self._query(
+                "SELECT status, COUNT(*) AS count FROM application_queue WHERE batch_id = ? GROUP BY status", (batch_id,)
+            )
+        return {row["status"]: row["count"] for row in rows}
+    
+    def dead_letters(self, limit=100):
+        """获取死信队列项
+        
+        Args:
+            limit: 返回的数量上限
+        
+        Returns:
+            list: 死信项字典列表
+        """
+        rows = self._query(
+            "SELECT idempotency_key, job_url, site, attempts, last_error, updated_at FROM application_queue "
+            "WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (STATUS_DEAD, limit)
+        )
+        return [{
+            "key": row["idempotency_key"],
+            "job_url": row["job_url"],
+            "site": row["site"],
+            "attempts": row["attempts"],
+            "last_error": row["last_error"],
+            "updated_at": datetime.fromtimestamp(row["updated_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        } for row in rows]
+    
+    def requeue(self, key):
+        """把死信项重新放回队列（人工确认后使用）
+        
+        Args:
+            key: 幂等键
+        """
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE application_queue SET status = ?, attempts = 0, available_at = ?, updated_at = ? "
+            "WHERE idempotency_key = ? AND status = ?",
+            (STATUS_PENDING, time.time(), time.time(), key, STATUS_DEAD)
+        ))
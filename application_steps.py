@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 申请步骤状态机
+将申请流程拆分为显式步骤，每一步等待明确的就绪条件，使用自适应超时并记录实际等待时间
+"""
+
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from metrics import span
+
+def wait_adaptive(driver, timeouts, key, condition, poll_frequency=0.1):
+    """使用自适应超时等待条件成立
+    
+    Args:
+        driver: WebDriver实例
+        timeouts: AdaptiveTimeout实例
+        key: 超时统计使用的名称
+        condition: 条件函数，参数为driver，返回真值表示条件成立
+        poll_frequency: 轮询间隔（秒）
+    
+    Returns:
+        tuple: (条件函数的返回值, 实际等待时间, 是否超时)
+    """
+    start_time = time.perf_counter()
+    try:
+        value = WebDriverWait(driver, timeouts.get(key), poll_frequency=poll_frequency).until(condition)
+        timed_out = False
+    except TimeoutException:
+        value = None
+        timed_out = True
+    waited = time.perf_counter() - start_time
+    timeouts.observe(key, waited, timed_out)
+    return value, waited, timed_out
+
+class StepAbort(Exception):
+    """步骤主动终止申请流程时抛出，message为返回给用户的说明，retryable表示稍后重试是否可能成功"""
+    
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.message = message
+        self.retryable = retryable
+
+class AdaptiveTimeout:
+    """自适应超时类，根据每个步骤历史等待时间的滑动平均计算下一次的超时时间"""
+    
+    def __init__(self, initial=10.0, minimum=2.0, maximum=30.0, factor=3.0, alpha=0.3):
+        """初始化自适应超时
+        
+        Args:
+            initial: 没有历史数据时使用的超时（秒）
+            minimum: 超时下限（秒）
+            maximum: 超时上限（秒）
+            factor: 超时相对平均等待时间的倍数
+            alpha: 指数滑动平均的平滑系数
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.alpha = alpha
+        self.averages = {}
+    
+    def get(self, key):
+        """获取指定步骤的超时时间
+        
+        Args:
+            key: 步骤名称
+        
+        Returns:
+            float: 超时时间（秒）
+        """
+        average = self.averages.get(key)
+        if average is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, average * self.factor))
+    
+    def observe(self, key, waited, timed_out=False):
+        """记录一次实际等待时间
+        
+        Args:
+            key: 步骤名称
+            waited: 实际等待时间（秒）
+            timed_out: 是否超时，超时时按上限计入，避免超时时间持续缩短
+        """
+        if timed_out:
+            waited = self.maximum / self.factor
+        average = self.averages.get(key)
+        if average is None:
+            self.averages[key] = waited
+        else:
+            self.averages[key] = self.alpha * waited + (1 - self.alpha) * average
+
+class ApplyStep:
+    """申请流程中的单个步骤：先等待就绪条件，再执行动作并返回下一步骤"""
+    
+    def __init__(self, name, action, ready=None, optional=False, timeout_message=None):
+        """初始化步骤
+        
+        Args:
+            name: 步骤名称
+            action: 动作函数，参数为(context, ready_value)，返回下一步骤名称，返回None表示流程结束
+            ready: 就绪条件函数，参数为driver，返回真值表示就绪，默认为None（无需等待）
+            optional: 就绪条件超时时是否继续执行动作（ready_value为None）
+            timeout_message: 非可选步骤超时时返回给用户的说明
+        """
+        self.name = name
+        self.action = action
+        self.ready = ready
+        self.optional = optional
+        self.timeout_message = timeout_message or f"等待步骤超时: {name}"
+
+class StepMachine:
+    """申请步骤状态机，按步骤名称依次执行并记录每一步的实际等待时间"""
+    
+    def __init__(self, driver, steps, timeouts=None, poll_frequency=0.1, max_transitions=50, on_step=None):
+        """初始化步骤状态机
+        
+        Args:
+            driver: WebDriver实例
+            steps: 步骤列表
+            timeouts: AdaptiveTimeout实例，默认为None（新建）
+            poll_frequency: 就绪条件的轮询间隔（秒）
+            max_transitions: 最大步骤切换次数，防止流程死循环
+            on_step: 每一步就绪之后、执行动作之前调用的函数，参数为(步骤名称, 就绪值, 是否超时)
+        """
+        self.driver = driver
+        self.steps = {step.name: step for step in steps}
+        self.timeouts = timeouts or AdaptiveTimeout()
+        self.poll_frequency = poll_frequency
+        self.max_transitions = max_transitions
+        self.on_step = on_step
+        self.records = []
+    
+    def wait_for(self, key, condition):
+        """使用自适应超时等待条件成立，并记录等待时间
+        
+        Args:
+            key: 等待记录和超时统计使用的名称
+            condition: 条件函数，参数为driver，返回真值表示条件成立
+        
+        Returns:
+            tuple: (条件函数的返回值, 是否超时)
+        """
+        timeout = self.timeouts.get(key)
+        value, waited, timed_out = wait_adaptive(self.driver, self.timeouts, key, condition, self.poll_frequency)
+        self.records.append({
+            "step": key,
+            "timeout": round(timeout, 3),
+            "waited": round(waited, 3),
+            "timed_out": timed_out
+        })
+        return value, timed_out
+    
+    def wait_ready(self, step):
+        """等待步骤的就绪条件
+        
+        Args:
+            step: 步骤
+        
+        Returns:
+            tuple: (就绪条件的返回值, 是否超时)
+        """
+        if step.ready is None:
+            return True, False
+        return self.wait_for(step.name, step.ready)
+    
+    def run(self, start, context):
+        """从指定步骤开始运行状态机
+        
+        Args:
+            start: 起始步骤名称
+            context: 在各步骤之间共享的上下文字典
+        
+        Returns:
+            list: 每一步的等待记录
+        
+        Raises:
+            StepAbort: 某一步骤终止了流程或必需步骤等待超时
+        """
+        self.records = []
+        name = start
+        transitions = 0
+        while name is not None:
+            transitions += 1
+            if transitions > self.max_transitions:
+                raise StepAbort("申请步骤过多，流程可能陷入循环")
+            
+            step = self.steps[name]
+            with span("browser_step", step=step.name):
+                value, timed_out = self.wait_ready(step)
+                if timed_out and not step.optional:
+                    raise StepAbort(step.timeout_message)
+                if self.on_step and step.ready is not None:
+                    self.on_step(step.name, value, timed_out)
+                name = step.action(context, value)
+        return self.records
+
+def summarize_step_records(records):
+    """汇总步骤等待记录
+    
+    Args:
+        records: StepMachine.run返回的记录列表
+    
+    Returns:
+        dict: 总等待时间和超时步骤
+    """
+    return {
+        "wait_time": round(sum(record["waited"] for record in records), 3),
+        "timed_out_steps": [record["step"] for record in records if record["timed_out"]]
+    }
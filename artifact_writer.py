@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 申请截图和页面存档
+在申请的每一步采集截图（最后一步和中止时同时保存DOM），由后台线程压缩（WebP或缩小后的PNG）并写入磁盘，
+同时限制存档目录的保留时间和总大小；没有安装Pillow时截图以浏览器返回的原始PNG保存，不缩小也不转换格式
+"""
+
+import os
+import io
+import gzip
+import time
+import uuid
+import queue
+import threading
+from datetime import datetime
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+    features = None
+
+# 读取完整DOM的脚本
+DOM_SCRIPT = "return document.documentElement ? document.documentElement.outerHTML : '';"
+
+def image_extension(image_format):
+    """根据图片格式和Pillow是否可用确定截图文件的扩展名
+    
+    Args:
+        image_format: 期望的图片格式，webp或png
+    
+    Returns:
+        str: 文件扩展名
+    """
+    if Image is not None and image_format == "webp" and features.check("webp"):
+        return ".webp"
+    return ".png"
+
+def compress_screenshot(png_bytes, image_format="webp", max_width=1280, quality=70):
+    """压缩截图
+    
+    没有安装Pillow时原样返回PNG数据
+    
+    Args:
+        png_bytes: 浏览器返回的PNG数据
+        image_format: 输出格式，webp或png
+        max_width: 最大宽度（像素），更宽的截图按比例缩小
+        quality: WebP质量（1-100）
+    
+    Returns:
+        bytes: 压缩后的图片数据
+    """
+    if Image is None:
+        return png_bytes
+    
+    image = Image.open(io.BytesIO(png_bytes))
+    if image.width > max_width:
+        height = max(1, int(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.LANCZOS)
+    
+    output = io.BytesIO()
+    if image_extension(image_format) == ".webp":
+        image.save(output, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+class ArtifactWriter:
+    """存档写入类，所有写盘操作在后台线程中完成，采集方不会等待磁盘I/O"""
+    
+    def __init__(self, root_dir, max_bytes=500 * 1024 * 1024, max_age_days=30, max_pending=64,
+                 image_format="webp", max_width=1280, quality=70, retention_interval=20):
+        """初始化存档写入
+        
+        Args:
+            root_dir: 存档根目录
+            max_bytes: 存档目录的总大小上限（字节），超过后删除最旧的文件
+            max_age_days: 存档保留天数，0表示不按时间清理
+            max_pending: 等待写入的最大存档数量，队列已满时丢弃新的存档而不是阻塞申请
+            image_format: 截图格式，webp或png
+            max_width: 截图最大宽度（像素）
+            quality: WebP质量
+            retention_interval: 每写入多少个文件检查一次保留策略
+        """
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.image_format = image_format
+        self.max_width = max_width
+        self.quality = quality
+        self.retention_interval = retention_interval
+        self.extension = image_extension(image_format)
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        self.writes_since_retention = 0
+        self.stats = {"written": 0, "dropped": 0, "failed": 0, "bytes_written": 0, "deleted": 0}
+        
+        if not os.path.exists(root_dir):
+            os.makedirs(root_dir)
+        
+        self.thread = threading.Thread(target=self.worker, name="artifact-writer", daemon=True)
+        self.thread.start()
+    
+    def recorder(self, prefix):
+        """为一次申请创建存档记录器，每次申请的存档放在单独的子目录中
+        
+        Args:
+            prefix: 子目录名称前缀，如linkedin
+        
+        Returns:
+            ArtifactRecorder: 存档记录器
+        """
+        name = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        return ArtifactRecorder(self, os.path.join(self.root_dir, name))
+    
+    def submit(self, path, data, kind):
+        """提交一个待写入的存档，不会阻塞
+        
+        Args:
+            path: 目标文件路径
+            data: 原始数据（截图为PNG字节，DOM为字符串）
+            kind: 存档类型，screenshot或dom
+        
+        Returns:
+            bool: 是否已加入写入队列
+        """
+        try:
+            self.queue.put_nowait((path, data, kind))
+            return True
+        except queue.Full:
+            with self.lock:
+                self.stats["dropped"] += 1
+            return False
+    
+    def worker(self):
+        """后台写入线程"""
+        self.enforce_retention()
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.write(*item)
+            finally:
+                self.queue.task_done()
+    
+    def write(self, path, data, kind):
+        """压缩并写入一个存档
+        
+        Args:
+            path: 目标文件路径
+            data: 原始数据
+            kind: 存档类型
+        """
+        try:
+            if kind == "screenshot":
+                try:
+                    payload = compress_screenshot(data, self.image_format, self.max_width, self.quality)
+                except Exception as e:
+                    print(f"压缩截图失败，保存原图: {e}")
+                    payload = data
+            else:
+                payload = gzip.compress(data.encode("utf-8"), compresslevel=6)
+            
+            directory = os.path.dirname(path)
+            if not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"写入存档失败: {e}")
+            with self.lock:
+                self.stats["failed"] += 1
+            return
+        
+        with self.lock:
+            self.stats["written"] += 1
+            self.stats["bytes_written"] += len(payload)
+        if self.total_bytes is not None:
+            self.total_bytes += len(payload)
+        self.writes_since_retention += 1
+        if self.writes_since_retention >= self.retention_interval or (
+                self.total_bytes is not None and self.total_bytes > self.max_bytes):
+            self.enforce_retention()
+    
+    def enforce_retention(self):
+        """执行保留策略：删除超过保留天数的文件，再从最旧的文件开始删除直到总大小低于上限
+        
+        Returns:
+            int: 删除的文件数量
+        """
+        self.writes_since_retention = 0
+        files = []
+        directories = []
+        for current, dirs, names in os.walk(self.root_dir):
+            if current != self.root_dir:
+                directories.append(current)
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(current, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else None
+        deleted = 0
+        for mtime, size, path in files:
+            if (cutoff is None or mtime >= cutoff) and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                deleted += 1
+            except OSError:
+                continue
+        
+        # 删除已清空的申请子目录，从最深的目录开始
+        for directory in sorted(directories, key=len, reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+        
+        self.total_bytes = total
+        with self.lock:
+            self.stats["deleted"] += deleted
+        return deleted
+    
+    def flush(self, timeout=None):
+        """等待队列中的存档全部写入
+        
+        Args:
+            timeout: 最长等待时间（秒），默认为None（一直等待）
+        
+        Returns:
+            bool: 是否已全部写入
+        """
+        if timeout is None:
+            self.queue.join()
+            return True
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
+    def close(self):
+        """写完剩余的存档并停止后台线程"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+    
+    def get_stats(self):
+        """获取写入统计
+        
+        Returns:
+            dict: 写入、丢弃、失败和删除的数量，以及待写入数量和目录总大小
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.queue.qsize()
+        stats["total_bytes"] = self.total_bytes
+        return stats
+
+class ArtifactRecorder:
+    """一次申请的存档记录器，按步骤顺序编号存档文件"""
+    
+    def __init__(self, writer, directory):
+        """初始化存档记录器
+        
+        Args:
+            writer: ArtifactWriter实例
+            directory: 本次申请的存档目录
+        """
+        self.writer = writer
+        self.directory = directory
+        self.count = 0
+        self.screenshots = []
+    
+    def capture(self, driver, label, dom=True):
+        """采集当前页面的截图和DOM并交给后台写入
+        
+        在当前线程中只读取浏览器数据，压缩和写盘都在后台线程中完成
+        
+        Args:
+            driver: WebDriver实例
+            label: 存档标签，通常为步骤名称
+            dom: 是否同时保存DOM
+        
+        Returns:
+            str: 截图文件路径，采集失败或写入队列已满时返回None
+        """
+        self.count += 1
+        base = os.path.join(self.directory, f"{self.count:02d}_{label}")
+        try:
+            png_bytes = driver.get_screenshot_as_png()
+            html = driver.execute_script(DOM_SCRIPT) if dom else None
+        except Exception as e:
+            print(f"采集页面存档失败: {e}")
+            return None
+        
+        path = base + self.writer.extension
+        if not self.writer.submit(path, png_bytes, "screenshot"):
+            return None
+        self.screenshots.append(path)
+        if html:
+            self.writer.submit(base + ".html.gz", html, "dom")
+        return path
+    
+    def step_hook(self, driver, dom=False):
+        """生成StepMachine的on_step回调，在每一步就绪后采集存档
+        
+        中间步骤默认只保存截图，完整DOM较大，只在最后一步或中止时（capture的默认值）保存
+        
+        Args:
+            driver: WebDriver实例
+            dom: 中间步骤是否也保存DOM
+        
+        Returns:
+            function: 回调函数
+        """
+        def on_step(step_name, value, timed_out):
+            self.capture(driver, step_name, dom=dom)
+        return on_step
+
+# 每个存档目录共用一个写入线程，使保留策略在多个浏览器会话之间保持一致
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_artifact_writer(root_dir, **options):
+    """获取存档目录对应的共享写入实例
+    
+    Args:
+        root_dir: 存档根目录
+        **options: 首次创建时传给ArtifactWriter的参数
+    
+    Returns:
+        ArtifactWriter: 写入实例
+    """
+    key = os.path.abspath(root_dir)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or not writer.thread.is_alive():
+            writer = ArtifactWriter(root_dir, **options)
+            _writers[key] = writer
+        return writer
+
+# 测试代码
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    
+    class FakeDriver:
+        """返回固定截图和DOM的测试驱动"""
+        
+        def __init__(self, png_bytes):
+            self.png_bytes = png_bytes
+        
+        def get_screenshot_as_png(self):
+            return self.png_bytes
+        
+        def execute_script(self, script):
+            return "<html><body>" + "<div>Contact info</div>" * 2000 + "</body></html>"
+    
+    if Image is not None:
+        buffer = io.BytesIO()
+        Image.new("RGB", (1920, 1080), (240, 240, 240)).save(buffer, format="PNG")
+        png_bytes = buffer.getvalue()
+    else:
+        print("未安装Pillow，截图将以原始PNG保存")
+        png_bytes = b"\x89PNG\r\n\x1a\n" + os.urandom(200 * 1024)
+    
+    root_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix="artifacts_")
+    writer = ArtifactWriter(root_dir, max_bytes=2 * 1024 * 1024)
+    driver = FakeDriver(png_bytes)
+    
+    start_time = time.perf_counter()
+    for i in range(20):
+        recorder = writer.recorder("demo")
+        on_step = recorder.step_hook(driver)
+        for step in ["job_page", "contact_info", "resume", "review"]:
+            on_step(step, None, False)
+        recorder.capture(driver, "final")
+    capture_time = time.perf_counter() - start_time
+    writer.flush()
+    writer.close()
+    
+    print(f"采集100个存档耗时 {capture_time:.3f} 秒，后台写入完成共 {time.perf_counter() - start_time:.3f} 秒")
+    print(f"存档目录: {root_dir}")
+    print(f"写入统计: {writer.get_stats()}")
@@ -7,18 +7,45 @@
 """
 
 import os
+import re
 import json
 import time
 import random
 import pandas as pd
 from datetime import datetime
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
+from application_steps import ApplyStep, StepMachine, StepAbort, AdaptiveTimeout, wait_adaptive, summarize_step_records
+from page_state import PageStateProbe
+from job_store import get_store
+from artifact_writer import get_artifact_writer
+from identity_pool import get_identity_pool
+from browser_profiles import PLATFORM_PROFILES, resolve_profile, build_chrome_options, apply_resource_blocking, process_tree_rss, page_load_timing
+
+# LinkedIn页面标记，每个标记对应页面中可能出现的文字
+LINKEDIN_PAGE_MARKERS = {
+    "signed_out": ["Sign in"],
+    "unavailable": ["This job is no longer available"],
+    "contact_info": ["Contact info"],
+    "resume": ["Resume", "CV"],
+    "cover_letter": ["Cover letter"],
+    "questions": {"texts": ["questions"], "case_insensitive": True},
+    "review": ["Review"],
+    "submitted": ["Application submitted", "已提交申请"]
+}
+
+# 申请表单中出现的标记，任意一个出现表示表单已就绪
+LINKEDIN_FORM_MARKERS = ["contact_info", "resume", "cover_letter", "questions", "review", "submitted"]
+
+# 申请按钮的定位方式，按优先级排列
+LINKEDIN_APPLY_BUTTONS = [
+    (By.CSS_SELECTOR, "button[data-control-name='jobdetails_topcard_inapply']"),
+    (By.XPATH, "//button[contains(text(), 'Easy Apply')]")
+]
 
 class AutomatedApplicationSystem:
     """自动申请系统类，用于自动填表和提交简历到招聘网站"""
@@ -31,10 +58,22 @@ class AutomatedApplicationSystem:
         """
         self.data_dir = data_dir
         self.applications_dir = os.path.join(data_dir, "applications")
-        self.history_file = os.path.join(data_dir, "application_history.json")
         self.ensure_directories()
+        self.store = get_store(data_dir)
         self.history = self.load_history()
         self.browser = None
+        self.page_probe = None
+        self.browser_profile = None
+        self.browser_identity = None
+        # 浏览器会话和抓取请求共用网络身份池，每次启动浏览器时按平台选择代理和UA
+        self.identity_pool = get_identity_pool(data_dir)
+        self.platform_profiles = dict(PLATFORM_PROFILES)
+        self.linkedin_base_url = "https://www.linkedin.com"
+        self.step_timeouts = AdaptiveTimeout()
+        self.submit_hook = None
+        # 申请截图和DOM由共享的后台线程压缩写入：每一步只保存截图，最后一步和中止时同时保存DOM；capture_steps为False时只保存最终存档
+        self.artifacts = get_artifact_writer(self.applications_dir)
+        self.capture_steps = True
         
     def ensure_directories(self):
         """确保必要的目录存在"""
@@ -44,46 +83,40 @@ class AutomatedApplicationSystem:
                 print(f"创建目录: {directory}")
     
     def load_history(self):
-        """加载申请历史"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载申请历史失败: {e}")
-                return []
-        return []
+        """加载申请历史（数据库中的历史记录表，读取时才查询）"""
+        return self.store.history("application")
     
     def save_history(self):
-        """保存申请历史"""
+        """保存申请历史：只把新追加和被修改的记录写入数据库"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            self.history.flush()
         except Exception as e:
             print(f"保存申请历史失败: {e}")
     
-    def initialize_browser(self, headless=True):
+    def initialize_browser(self, headless=True, profile=None, platform=None):
         """初始化浏览器
         
         Args:
             headless: 是否使用无头模式
+            profile: 浏览器配置名称（full或lean），默认为None（按平台选择）
+            platform: 招聘平台名称，用于从platform_profiles中选择配置
             
         Returns:
             bool: 初始化是否成功
         """
         try:
-            chrome_options = Options()
-            if headless:
-                chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
+            profile_name = resolve_profile(profile, platform, self.platform_profiles)
+            # 只借用身份池的代理、UA和请求节奏；浏览器启动不是对网站的请求，不计入身份的成功率
+            identity = self.identity_pool.acquire((platform or "linkedin").lower(), max_wait=60)
+            chrome_options = build_chrome_options(profile_name, headless, identity.user_agent, identity.proxy_server)
             
+            # 不使用隐式等待，各步骤通过显式就绪条件等待页面
             self.browser = webdriver.Chrome(options=chrome_options)
-            self.browser.implicitly_wait(10)
-            print("浏览器初始化成功")
+            apply_resource_blocking(self.browser, profile_name)
+            self.browser_profile = profile_name
+            self.browser_identity = identity
+            self.page_probe = PageStateProbe(self.browser, LINKEDIN_PAGE_MARKERS)
+            print(f"浏览器初始化成功，配置: {profile_name}，网络身份: {identity.identity_id}")
             return True
         except Exception as e:
             print(f"浏览器初始化失败: {e}")
@@ -99,6 +132,36 @@ class AutomatedApplicationSystem:
                 print(f"关闭浏览器失败: {e}")
             finally:
                 self.browser = None
+                self.page_probe = None
+                self.browser_profile = None
+                self.browser_identity = None
+    
+    def notify_submitting(self, job_url):
+        """在点击最终提交按钮之前调用提交钩子，持久化申请队列用它标记申请进入提交阶段
+        
+        Args:
+            job_url: 工作URL
+        """
+        if self.submit_hook:
+            self.submit_hook(job_url)
+    
+    def get_session_metrics(self):
+        """获取当前浏览器会话的资源统计，用于估算一台机器能容纳的会话数量
+        
+        Returns:
+            dict: 配置名称、浏览器进程树常驻内存（MB）和当前页面加载时间
+        """
+        if not self.browser:
+            return {}
+        
+        metrics = {"profile": self.browser_profile}
+        try:
+            rss = process_tree_rss(self.browser.service.process.pid)
+        except Exception:
+            rss = None
+        metrics["rss_mb"] = round(rss / (1024 * 1024), 1) if rss is not None else None
+        metrics.update(page_load_timing(self.browser))
+        return metrics
     
     def extract_resume_data(self, resume_file):
         """从简历文件中提取申请所需的数据
@@ -229,6 +292,9 @@ class AutomatedApplicationSystem:
     def apply_linkedin(self, job_url, resume_file, cover_letter_file=None, credentials=None):
         """在LinkedIn上申请工作
         
+        申请流程由步骤状态机驱动，每一步等待明确的就绪条件而不是固定休眠，
+        每一步的实际等待时间记录在结果的steps字段中
+        
         Args:
             job_url: 工作URL
             resume_file: 简历文件路径
@@ -238,7 +304,7 @@ class AutomatedApplicationSystem:
         Returns:
             dict: 申请结果
         """
-        if not self.browser and not self.initialize_browser():
+        if not self.browser and not self.initialize_browser(platform="linkedin"):
             return {"success": False, "message": "浏览器初始化失败"}
         
         result = {
@@ -249,121 +315,238 @@ class AutomatedApplicationSystem:
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
+        start_time = time.perf_counter()
+        context = {
+            "job_url": job_url,
+            "resume_file": resume_file,
+            "cover_letter_file": cover_letter_file,
+            "credentials": credentials,
+            "result": result
+        }
+        artifacts = self.artifacts.recorder("linkedin")
+        machine = StepMachine(self.browser, self.linkedin_apply_steps(context), self.step_timeouts,
+                              on_step=artifacts.step_hook(self.browser) if self.capture_steps else None)
+        self.page_probe.reset_stats()
+        context["machine"] = machine
+        
         try:
-            # 检查是否已登录
-            self.browser.get("https://www.linkedin.com")
-            time.sleep(2)
+            machine.run("open_home", context)
             
-            # 如果未登录且提供了凭据，则登录
-            if "Sign in" in self.browser.page_source and credentials:
-                self.linkedin_login(credentials)
+            # 截图保存申请状态（后台写入）
+            result["screenshot"] = artifacts.capture(self.browser, "final")
             
-            # 如果仍未登录，返回错误
-            if "Sign in" in self.browser.page_source:
-                result["message"] = "LinkedIn需要登录才能申请工作"
-                return result
-            
-            # 访问工作页面
-            self.browser.get(job_url)
-            time.sleep(3)
-            
-            # 检查是否是有效的工作页面
-            if "This job is no longer available" in self.browser.page_source:
-                result["message"] = "此工作已不可用"
-                return result
-            
-            # 查找申请按钮
-            try:
-                apply_button = WebDriverWait(self.browser, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-control-name='jobdetails_topcard_inapply']"))
-                )
-                apply_button.click()
-                time.sleep(2)
-            except TimeoutException:
-                # 尝试其他可能的申请按钮
-                try:
-                    apply_button = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Easy Apply')]")
-                    apply_button.click()
-                    time.sleep(2)
-                except NoSuchElementException:
-                    result["message"] = "找不到申请按钮，可能需要在LinkedIn网站上申请"
-                    return result
-            
-            # 提取简历数据
-            resume_data = self.extract_resume_data(resume_file)
-            
-            # 填写申请表单
-            # 注意：LinkedIn的申请表单可能有多个步骤，且字段可能因工作而异
-            # 这里提供一个基本框架，实际应用中可能需要更复杂的逻辑
-            
-            # 检查是否有联系信息步骤
-            if "Contact info" in self.browser.page_source:
-                # 填写联系信息
-                self.fill_linkedin_contact_info(resume_data)
-                
-                # 点击下一步
-                next_button = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Next')]")
-                next_button.click()
-                time.sleep(2)
-            
-            # 检查是否有简历上传步骤
-            if "Resume" in self.browser.page_source or "CV" in self.browser.page_source:
-                # 上传简历
-                resume_upload = self.browser.find_element(By.XPATH, "//input[@type='file']")
-                resume_upload.send_keys(os.path.abspath(resume_file))
-                time.sleep(3)
-                
-                # 点击下一步
-                next_button = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Next')]")
-                next_button.click()
-                time.sleep(2)
-            
-            # 检查是否有求职信上传步骤
-            if "Cover letter" in self.browser.page_source and cover_letter_file:
-                # 上传求职信
-                cover_letter_upload = self.browser.find_element(By.XPATH, "//input[@type='file']")
-                cover_letter_upload.send_keys(os.path.abspath(cover_letter_file))
-                time.sleep(3)
-                
-                # 点击下一步
-                next_button = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Next')]")
-                next_button.click()
-                time.sleep(2)
-            
-            # 检查是否有附加问题
-            if "questions" in self.browser.page_source.lower():
-                # 回答附加问题
-                self.answer_linkedin_questions(resume_data)
-                
-                # 点击下一步
-                next_button = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Next')]")
-                next_button.click()
-                time.sleep(2)
+        except StepAbort as e:
+            result["message"] = e.message
+            result["retryable"] = e.retryable
+            result["screenshot"] = artifacts.capture(self.browser, "aborted")
+        except Exception as e:
+            result["message"] = f"申请过程中出错: {str(e)}"
+            result["screenshot"] = artifacts.capture(self.browser, "error")
+        
+        result["artifacts_dir"] = artifacts.directory
+        result["steps"] = machine.records
+        result.update(summarize_step_records(machine.records))
+        result.update(self.page_probe.stats())
+        result["session"] = self.get_session_metrics()
+        result["duration"] = round(time.perf_counter() - start_time, 3)
+        return result
+    
+    def linkedin_apply_steps(self, context):
+        """构建LinkedIn申请流程的步骤列表
+        
+        Args:
+            context: 申请上下文
             
-            # 检查是否有审核步骤
-            if "Review" in self.browser.page_source:
-                # 点击提交按钮
-                submit_button = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Submit application')]")
-                submit_button.click()
-                time.sleep(5)
+        Returns:
+            list: ApplyStep列表
+        """
+        return [
+            ApplyStep("open_home", self._linkedin_open_home),
+            ApplyStep("home", self._linkedin_check_login, ready=self._document_ready),
+            ApplyStep("login", self._linkedin_login_step),
+            ApplyStep("open_job", self._linkedin_open_job),
+            ApplyStep("job_page", self._linkedin_check_job_page, ready=self._document_ready),
+            ApplyStep("apply_button", self._linkedin_click_apply, ready=self._find_linkedin_apply_button,
+                      timeout_message="找不到申请按钮，可能需要在LinkedIn网站上申请"),
+            ApplyStep("contact_info", self._linkedin_form_action("contact_info", "resume", self._linkedin_fill_contact_info),
+                      ready=self._linkedin_form_ready(context), optional=True),
+            ApplyStep("resume", self._linkedin_form_action("resume", "cover_letter", self._linkedin_upload_resume),
+                      ready=self._linkedin_form_ready(context), optional=True),
+            ApplyStep("cover_letter", self._linkedin_form_action("cover_letter", "questions", self._linkedin_upload_cover_letter),
+                      ready=self._linkedin_form_ready(context), optional=True),
+            ApplyStep("questions", self._linkedin_form_action("questions", "review", self._linkedin_answer_questions),
+                      ready=self._linkedin_form_ready(context), optional=True),
+            ApplyStep("review", self._linkedin_form_action("review", "confirmation", self._linkedin_mark_submit,
+                                                          button_text="Submit application"),
+                      ready=self._linkedin_form_ready(context), optional=True),
+            ApplyStep("confirmation", self._linkedin_check_submitted,
+                      ready=lambda driver: self._linkedin_page_state(refresh=True)["submitted"] or not context.get("submit_clicked"),
+                      optional=True)
+        ]
+    
+    def _document_ready(self, driver):
+        """就绪条件：页面文档已解析完成（精简配置不等待图片等子资源）"""
+        return self._linkedin_page_state(refresh=True).get("ready_state") in ("interactive", "complete")
+    
+    def _linkedin_page_state(self, refresh=False):
+        """获取LinkedIn页面标记
+        
+        所有标记由浏览器内的一次脚本调用判断，结果在页面发生导航或点击之前一直缓存
+        
+        Args:
+            refresh: 是否忽略缓存重新探测
             
-            # 检查是否申请成功
-            if "Application submitted" in self.browser.page_source or "已提交申请" in self.browser.page_source:
-                result["success"] = True
-                result["message"] = "申请成功提交"
-            else:
-                result["message"] = "申请可能未成功提交，请手动检查"
+        Returns:
+            dict: 标记名称到是否出现的映射
+        """
+        return self.page_probe.state(refresh=refresh)
+    
+    def _linkedin_open_home(self, context, ready_value):
+        """步骤：打开LinkedIn首页"""
+        self.page_probe.navigate(self.linkedin_base_url)
+        return "home"
+    
+    def _linkedin_check_login(self, context, ready_value):
+        """步骤：检查是否已登录"""
+        if not self._linkedin_page_state()["signed_out"]:
+            return "open_job"
+        
+        # 如果未登录且提供了凭据，则登录
+        if context["credentials"]:
+            return "login"
+        raise StepAbort("LinkedIn需要登录才能申请工作", retryable=False)
+    
+    def _linkedin_login_step(self, context, ready_value):
+        """步骤：使用凭据登录"""
+        self.linkedin_login(context["credentials"])
+        
+        # 如果仍未登录，返回错误
+        if self._linkedin_page_state()["signed_out"]:
+            raise StepAbort("LinkedIn需要登录才能申请工作", retryable=False)
+        return "open_job"
+    
+    def _linkedin_open_job(self, context, ready_value):
+        """步骤：访问工作页面"""
+        self.page_probe.navigate(context["job_url"])
+        return "job_page"
+    
+    def _linkedin_check_job_page(self, context, ready_value):
+        """步骤：检查是否是有效的工作页面，并提取简历数据"""
+        if self._linkedin_page_state()["unavailable"]:
+            raise StepAbort("此工作已不可用", retryable=False)
+        
+        context["resume_data"] = self.extract_resume_data(context["resume_file"])
+        return "apply_button"
+    
+    def _find_linkedin_apply_button(self, driver):
+        """就绪条件：申请按钮可点击，返回按钮元素"""
+        for by, selector in LINKEDIN_APPLY_BUTTONS:
+            for button in driver.find_elements(by, selector):
+                if button.is_displayed() and button.is_enabled():
+                    return button
+        return False
+    
+    def _linkedin_click_apply(self, context, apply_button):
+        """步骤：点击申请按钮"""
+        apply_button.click()
+        self.page_probe.invalidate()
+        context["previous_state"] = None
+        context["clicked"] = None
+        return "contact_info"
+    
+    def _linkedin_form_ready(self, context):
+        """构建表单步骤的就绪条件
+        
+        上一步点击了按钮时，等待页面标记发生变化或被点击的按钮失效；
+        否则等待申请表单的任意标记出现
+        
+        Args:
+            context: 申请上下文
             
-            # 截图保存申请状态
-            screenshot_path = os.path.join(self.applications_dir, f"linkedin_application_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            self.browser.save_screenshot(screenshot_path)
-            result["screenshot"] = screenshot_path
+        Returns:
+            function: 就绪条件函数
+        """
+        def ready(driver):
+            state = self._linkedin_page_state(refresh=True)
+            previous_state = context.get("previous_state")
+            if previous_state is not None and state == previous_state:
+                clicked = context.get("clicked")
+                if clicked is None or not EC.staleness_of(clicked)(driver):
+                    return False
+            if any(state[marker] for marker in LINKEDIN_FORM_MARKERS):
+                return state
+            return False
+        return ready
+    
+    def _linkedin_form_action(self, marker, next_step, fill, button_text="Next"):
+        """构建表单步骤的动作
+        
+        页面包含指定标记时执行填写函数并点击按钮，否则直接进入下一步骤
+        
+        Args:
+            marker: 页面标记名称
+            next_step: 下一步骤名称
+            fill: 填写函数，参数为context，返回False表示跳过该步骤
+            button_text: 要点击的按钮文字
             
-            return result
+        Returns:
+            function: 步骤动作函数
+        """
+        def action(context, state):
+            state = state or self._linkedin_page_state()
+            context["previous_state"] = None
+            context["clicked"] = None
+            if not state[marker] or fill(context) is False:
+                return next_step
+            self.page_probe.invalidate()
             
-        except Exception as e:
-            result["message"] = f"申请过程中出错: {str(e)}"
-            return result
+            button, timed_out = context["machine"].wait_for(
+                f"{marker}_button",
+                EC.element_to_be_clickable((By.XPATH, f"//button[contains(text(), '{button_text}')]"))
+            )
+            if timed_out:
+                raise StepAbort(f"申请过程中出错: 找不到按钮 {button_text}")
+            button.click()
+            self.page_probe.invalidate()
+            context["previous_state"] = state
+            context["clicked"] = button
+            return next_step
+        return action
+    
+    def _linkedin_fill_contact_info(self, context):
+        """填写联系信息"""
+        self.fill_linkedin_contact_info(context["resume_data"])
+    
+    def _linkedin_upload_resume(self, context):
+        """上传简历，上传完成由下一步按钮变为可点击来判断"""
+        resume_upload = self.browser.find_element(By.XPATH, "//input[@type='file']")
+        resume_upload.send_keys(os.path.abspath(context["resume_file"]))
+    
+    def _linkedin_upload_cover_letter(self, context):
+        """上传求职信，未提供求职信时跳过"""
+        if not context["cover_letter_file"]:
+            return False
+        cover_letter_upload = self.browser.find_element(By.XPATH, "//input[@type='file']")
+        cover_letter_upload.send_keys(os.path.abspath(context["cover_letter_file"]))
+    
+    def _linkedin_answer_questions(self, context):
+        """回答附加问题"""
+        self.answer_linkedin_questions(context["resume_data"])
+    
+    def _linkedin_mark_submit(self, context):
+        """标记即将提交申请"""
+        self.notify_submitting(context["job_url"])
+        context["submit_clicked"] = True
+    
+    def _linkedin_check_submitted(self, context, ready_value):
+        """步骤：检查是否申请成功"""
+        result = context["result"]
+        if self._linkedin_page_state()["submitted"]:
+            result["success"] = True
+            result["message"] = "申请成功提交"
+        else:
+            result["message"] = "申请可能未成功提交，请手动检查"
+        return None
     
     def linkedin_login(self, credentials):
         """登录LinkedIn
@@ -375,12 +558,17 @@ class AutomatedApplicationSystem:
             bool: 登录是否成功
         """
         try:
-            # 访问登录页面
-            self.browser.get("https://www.linkedin.com/login")
-            time.sleep(2)
+            # 访问登录页面，等待登录表单出现
+            self.page_probe.navigate(f"{self.linkedin_base_url}/login")
+            email_input, _, timed_out = wait_adaptive(
+                self.browser, self.step_timeouts, "login_form",
+                EC.presence_of_element_located((By.ID, "username"))
+            )
+            if timed_out:
+                print("LinkedIn登录页面加载超时")
+                return False
             
             # 填写邮箱
-            email_input = self.browser.find_element(By.ID, "username")
             email_input.clear()
             email_input.send_keys(credentials["email"])
             
@@ -392,13 +580,18 @@ class AutomatedApplicationSystem:
             # 点击登录按钮
             login_button = self.browser.find_element(By.XPATH, "//button[@type='submit']")
             login_button.click()
+            self.page_probe.invalidate()
             
-            # 等待登录完成
-            time.sleep(5)
+            # 等待跳转到登录后的页面
+            _, waited, timed_out = wait_adaptive(
+                self.browser, self.step_timeouts, "login_redirect",
+                lambda driver: "feed" in driver.current_url or "mynetwork" in driver.current_url,
+                poll_frequency=0.2
+            )
             
             # 检查是否登录成功
-            if "feed" in self.browser.current_url or "mynetwork" in self.browser.current_url:
-                print("LinkedIn登录成功")
+            if not timed_out:
+                print(f"LinkedIn登录成功，等待 {waited:.2f} 秒")
                 return True
             else:
                 print("LinkedIn登录失败")
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 性能基准测试
+用合成的职位数据（默认1千、1万、10万条）测量搜索→过滤→匹配→自荐信→申请流程中各步骤的耗时，
+搜索使用替身scrape_jobs，申请使用本地测试招聘网站，不访问任何真实网站；
+结果保存为JSON，并与保存的基准结果比较，耗时明显变长的步骤标记为性能退化
+
+用法:
+    python benchmark_suite.py                       运行全部测试并与benchmark_baseline.json比较
+    python benchmark_suite.py --sizes 1000,10000    只测试指定的数据规模
+    python benchmark_suite.py --cases filter_jobs   只运行指定的测试
+    python benchmark_suite.py --update-baseline     把本次结果保存为新的基准
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import statistics
+import subprocess
+import importlib
+from datetime import datetime
+
+import pandas as pd
+
+# 默认的数据规模
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# 测试用例，按流程顺序执行
+CASES = [
+    "search_jobs",
+    "filter_jobs",
+    "extract_skills_from_jobs",
+    "generate_job_search_report",
+    "extract_job_features",
+    "match_jobs",
+    "extract_job_details",
+    "generate_cover_letter",
+    "batch_apply"
+]
+
+# 逐条处理职位的测试最多使用的行数，避免10万条数据时单次测试耗时过长；结果按每秒处理行数比较
+ROW_LIMITS = {
+    "extract_job_features": 2000,
+    "match_jobs": 5000,
+    "extract_job_details": 2000,
+    "generate_cover_letter": 200
+}
+
+# 与数据规模无关的测试，只按固定数量运行一次
+FIXED_SIZE_CASES = {"batch_apply": 6}
+
+# 比较基准时忽略的绝对差值（毫秒），避免很快的步骤因为计时抖动被误判
+NOISE_FLOOR_MS = 5.0
+
+TITLES = ["Python Engineer", "Data Scientist", "Machine Learning Engineer", "Backend Developer",
+          "Frontend Developer", "DevOps Engineer", "Product Manager", "Data Analyst",
+          "Speech Recognition Engineer", "NLP Researcher", "Full Stack Developer", "SRE"]
+LEVELS = ["", "Senior ", "Junior ", "Lead ", "Staff ", "Principal "]
+COMPANIES = [f"{prefix} {suffix}" for prefix in ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne",
+                                                 "Hooli", "Pied Piper", "Vandelay", "Soylent"]
+             for suffix in ["Labs", "Technologies", "AI", "Systems", "Group"]]
+LOCATIONS = [("Shanghai", "SH"), ("Beijing", "BJ"), ("Shenzhen", "GD"), ("Hangzhou", "ZJ"),
+             ("San Francisco", "CA"), ("New York", "NY"), ("Seattle", "WA"), ("Austin", "TX"),
+             ("London", ""), ("Singapore", ""), ("Remote", "")]
+SITES = ["linkedin", "indeed", "glassdoor", "zip_recruiter", "google"]
+JOB_TYPES = ["fulltime", "parttime", "contract", "internship"]
+SKILLS = ["python", "java", "javascript", "typescript", "golang", "rust", "sql", "postgresql", "mongodb",
+          "aws", "azure", "gcp", "docker", "kubernetes", "react", "vue", "django", "flask", "spring",
+          "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "spark", "kafka", "redis",
+          "machine learning", "deep learning", "nlp", "computer vision", "data analysis", "tableau",
+          "microservices", "rest api", "graphql", "linux", "ci/cd", "agile", "scrum"]
+INTROS = [
+    "{company} is a fast-growing company building products used by millions of people every day.",
+    "At {company}, we believe technology should make work more human.",
+    "{company} is hiring a {title} to join our {team} team in {city}.",
+    "Join {company} and help us shape the future of {domain}."
+]
+RESPONSIBILITIES = [
+    "Design, build and maintain scalable services using {skill_a} and {skill_b}.",
+    "Collaborate with product managers and designers to deliver features end to end.",
+    "Own the reliability of production systems and participate in the on-call rotation.",
+    "Analyze large datasets with {skill_a} to answer business questions.",
+    "Mentor junior engineers and contribute to code reviews.",
+    "Improve our {skill_a} infrastructure and automate deployment with {skill_b}.",
+    "Work closely with research teams to bring {domain} models into production."
+]
+REQUIREMENTS = [
+    "{years}+ years of experience in software development.",
+    "Strong proficiency in {skill_a}; experience with {skill_b} is a plus.",
+    "Bachelor's degree in Computer Science or a related field; Master's degree preferred.",
+    "Excellent communication skills in English; Mandarin is a plus.",
+    "Experience with {skill_a}, {skill_b} and {skill_c}.",
+    "Familiarity with agile development practices and ci/cd pipelines."
+]
+BENEFITS = [
+    "We offer competitive salary, equity, flexible working hours and a generous learning budget.",
+    "Benefits include health insurance, paid time off, and a remote-friendly culture.",
+    "You will work with a diverse team of talented people who care deeply about quality."
+]
+DOMAINS = ["speech technology", "e-commerce", "fintech", "healthcare", "online education", "logistics"]
+TEAMS = ["platform", "data", "machine learning", "growth", "infrastructure"]
+
+def synthetic_description(rng, title, company, city):
+    """生成一段结构和长度接近真实招聘信息的职位描述"""
+    skills = rng.sample(SKILLS, 3)
+    values = {
+        "company": company, "title": title, "city": city,
+        "domain": rng.choice(DOMAINS), "team": rng.choice(TEAMS),
+        "skill_a": skills[0], "skill_b": skills[1], "skill_c": skills[2],
+        "years": rng.randint(1, 8)
+    }
+    parts = [rng.choice(INTROS).format(**values), "", "Responsibilities:"]
+    parts += ["- " + sentence.format(**values) for sentence in rng.sample(RESPONSIBILITIES, rng.randint(3, 6))]
+    parts += ["", "Requirements:"]
+    parts += ["- " + sentence.format(**values) for sentence in rng.sample(REQUIREMENTS, rng.randint(3, 6))]
+    parts += ["", rng.choice(BENEFITS)]
+    return "\n".join(parts)
+
+def synthetic_jobs(count, seed=0, description_pool=5000):
+    """生成合成的职位数据，列与jobspy的结果相同
+    
+    Args:
+        count: 行数
+        seed: 随机种子，同样的种子生成同样的数据
+        description_pool: 不同职位描述的数量，较大的数据集重复使用这些描述以控制内存占用
+    
+    Returns:
+        DataFrame: 职位数据
+    """
+    rng = random.Random(seed)
+    descriptions = []
+    rows = []
+    for i in range(count):
+        title = rng.choice(LEVELS) + rng.choice(TITLES)
+        company = rng.choice(COMPANIES)
+        city, state = rng.choice(LOCATIONS)
+        if len(descriptions) < description_pool:
+            descriptions.append(synthetic_description(rng, title, company, city))
+            description = descriptions[-1]
+        else:
+            description = descriptions[rng.randrange(len(descriptions))]
+        min_amount = rng.randrange(60, 200) * 1000
+        site = rng.choice(SITES)
+        rows.append({
+            "SITE": site,
+            "TITLE": title,
+            "COMPANY": company,
+            "CITY": city,
+            "STATE": state,
+            "JOB_TYPE": rng.choice(JOB_TYPES),
+            "INTERVAL": "yearly",
+            "MIN_AMOUNT": min_amount,
+            "MAX_AMOUNT": min_amount + rng.randrange(10, 80) * 1000,
+            "JOB_URL": f"https://{site}.example.com/jobs/{seed}-{i}",
+            "DATE_POSTED": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "DESCRIPTION": description
+        })
+    return pd.DataFrame(rows)
+
+def stub_scrape_jobs(corpus):
+    """创建与jobspy.scrape_jobs参数相同的替身函数，从合成数据中返回结果
+    
+    Args:
+        corpus: 合成的职位数据
+    
+    Returns:
+        function: 替身函数
+    """
+    def scrape_jobs(site_name=None, search_term=None, results_wanted=20, **kwargs):
+        frame = corpus
+        sites = [site_name] if isinstance(site_name, str) else list(site_name or [])
+        if sites:
+            frame = frame[frame["SITE"].isin(sites)]
+        return frame.head(results_wanted * max(1, len(sites))).reset_index(drop=True)
+    return scrape_jobs
+
+def git_revision():
+    """当前代码的git版本，不在git仓库中时返回空字符串"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+class CaseUnavailable(Exception):
+    """测试依赖的模块或方法在当前环境中不可用"""
+    pass
+
+class BenchmarkSuite:
+    """性能基准测试类"""
+    
+    def __init__(self, sizes=None, repeat=3, cases=None, resume_file=None, work_dir=None):
+        """初始化基准测试
+        
+        Args:
+            sizes: 数据规模列表，默认为DEFAULT_SIZES
+            repeat: 每个测试重复的次数，结果取中位数
+            cases: 运行的测试列表，默认为CASES
+            resume_file: 匹配和自荐信使用的简历文件，默认为仓库中的resume_content.txt
+            work_dir: 测试数据目录，默认为临时目录，测试结束后删除
+        """
+        self.sizes = list(sizes or DEFAULT_SIZES)
+        self.repeat = max(1, repeat)
+        self.cases = list(cases or CASES)
+        self.resume_file = os.path.abspath(resume_file or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                      "resume_content.txt"))
+        self.keep_work_dir = work_dir is not None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="job_benchmark_")
+        self.data_dir = os.path.join(self.work_dir, "job_data")
+        self.components = {}
+        self.corpora = {}
+    
+    def component(self, module_name, class_name, *args):
+        """导入并创建被测试的组件，数据保存在测试目录中
+        
+        Raises:
+            CaseUnavailable: 模块无法导入（缺少依赖）
+        """
+        key = (module_name, class_name)
+        if key not in self.components:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                raise CaseUnavailable(f"无法导入 {module_name}: {e}")
+            self.components[key] = getattr(module, class_name)(self.data_dir, *args)
+        return self.components[key]
+    
+    def method(self, component, name):
+        """获取组件的方法，不存在时抛出CaseUnavailable"""
+        method = getattr(component, name, None)
+        if method is None:
+            raise CaseUnavailable(f"{type(component).__name__} 没有 {name} 方法")
+        return method
+    
+    def corpus(self, size):
+        """获取指定规模的合成数据（缓存）"""
+        if size not in self.corpora:
+            self.corpora[size] = synthetic_jobs(size, seed=size)
+        return self.corpora[size]
+    
+    def case_search_jobs(self, jobs_df):
+        """搜索工作（替身scrape_jobs）"""
+        search = self.component("job_search_system", "JobSearchSystem")
+        module = sys.modules["job_search_system"]
+        original = module.scrape_jobs
+        module.scrape_jobs = stub_scrape_jobs(jobs_df)
+        try:
+            results = search.search_jobs("engineer", location="Shanghai", site_names=SITES,
+                                         results_wanted=len(jobs_df) // len(SITES))
+        finally:
+            module.scrape_jobs = original
+        return len(results)
+    
+    def case_filter_jobs(self, jobs_df):
+        """按关键词、薪资、位置和类型过滤工作"""
+        search = self.component("job_search_system", "JobSearchSystem")
+        search.filter_jobs(jobs_df, keywords=["python"], exclude_keywords=["intern"], min_salary=80000,
+                           locations=["Shanghai", "CA", "Remote"], job_types=["fulltime", "contract"])
+        return len(jobs_df)
+    
+    def case_extract_skills_from_jobs(self, jobs_df):
+        """统计职位描述中的常见技能"""
+        search = self.component("job_search_system", "JobSearchSystem")
+        search.extract_skills_from_jobs(jobs_df)
+        return len(jobs_df)
+    
+    def case_generate_job_search_report(self, jobs_df):
+        """生成搜索报告（每次使用新的报告生成实例，不命中缓存）"""
+        report_engine = importlib.import_module("report_engine")
+        report_engine.ReportEngine().search_report(jobs_df)
+        return len(jobs_df)
+    
+    def case_extract_job_features(self, jobs_df):
+        """逐条提取职位特征（匹配的主要步骤）"""
+        matcher = self.component("job_matching_system", "JobMatchingSystem")
+        for _, row in jobs_df.iterrows():
+            matcher.extract_job_features(row)
+        return len(jobs_df)
+    
+    def case_match_jobs(self, jobs_df):
+        """匹配工作"""
+        matcher = self.component("job_matching_system", "JobMatchingSystem")
+        self.method(matcher, "match_jobs")(self.resume_file, jobs_df)
+        return len(jobs_df)
+    
+    def case_extract_job_details(self, jobs_df):
+        """逐条提取自荐信需要的职位详情"""
+        generator = self.component("cover_letter_generator", "CoverLetterGenerator",
+                                   os.path.join(self.work_dir, "templates"))
+        for _, row in jobs_df.iterrows():
+            generator.extract_job_details(row)
+        return len(jobs_df)
+    
+    def case_generate_cover_letter(self, jobs_df):
+        """逐条生成自荐信"""
+        generator = self.component("cover_letter_generator", "CoverLetterGenerator",
+                                   os.path.join(self.work_dir, "templates"))
+        generate = self.method(generator, "generate_cover_letter")
+        for _, row in jobs_df.iterrows():
+            generate(template_name="standard", job_data=row, resume_file=self.resume_file)
+        return len(jobs_df)
+    
+    def case_batch_apply(self, jobs_df):
+        """通过本地测试招聘网站批量申请（需要Chrome和ChromeDriver）"""
+        try:
+            from fixture_site import FixtureJobSite
+            assistant_module = importlib.import_module("smart_job_assistant")
+        except ImportError as e:
+            raise CaseUnavailable(f"无法导入申请模块: {e}")
+        
+        site = FixtureJobSite(render_delay=0.05)
+        base_url = site.start()
+        assistant = assistant_module.SmartJobAssistant(os.path.join(self.work_dir, f"apply_{time.time_ns()}"))
+        system_class = assistant.component_class("application_system")
+        
+        def create_system():
+            system = system_class(assistant.data_dir)
+            system.linkedin_base_url = base_url
+            return system
+        assistant.create_application_session = create_system
+        assistant.config["platform_limits"] = {"linkedin": {"per_minute": 0}, "generic": {"per_minute": 0}}
+        
+        half = len(jobs_df) // 2
+        apply_df = pd.DataFrame(
+            [{"SITE": "linkedin", "JOB_URL": site.url(f"/jobs/view/{i}"), "TITLE": f"Fixture Job {i}",
+              "COMPANY": "Fixture"} for i in range(half)] +
+            [{"SITE": "zip_recruiter", "JOB_URL": site.url(f"/ats/jobs/{i}"), "TITLE": f"Fixture ATS Job {i}",
+              "COMPANY": "Fixture"} for i in range(len(jobs_df) - half)]
+        )
+        try:
+            results = assistant.batch_apply(apply_df, self.resume_file, max_applications=len(apply_df),
+                                            credentials={"linkedin": {"email": "bench@example.com", "password": "bench"}})
+        finally:
+            assistant.shutdown()
+            site.stop()
+        if not any(result.get("success") for result in results):
+            raise RuntimeError(f"所有申请都失败: {results[0].get('message') if results else '没有结果'}")
+        return len(results)
+    
+    def run_case(self, name, size):
+        """运行一个测试
+        
+        Args:
+            name: 测试名称
+            size: 数据规模
+        
+        Returns:
+            dict: 测试结果
+        """
+        rows = FIXED_SIZE_CASES.get(name, min(size, ROW_LIMITS.get(name, size)))
+        jobs_df = self.corpus(size).head(rows)
+        func = getattr(self, f"case_{name}")
+        timings = []
+        try:
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                processed = func(jobs_df)
+                timings.append(time.perf_counter() - start)
+        except CaseUnavailable as e:
+            return {"status": "unavailable", "reason": str(e)}
+        except Exception as e:
+            return {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+        
+        median = statistics.median(timings)
+        return {
+            "status": "ok",
+            "rows": processed,
+            "median_ms": round(median * 1000, 3),
+            "min_ms": round(min(timings) * 1000, 3),
+            "rows_per_s": round(processed / median, 1) if median > 0 else None
+        }
+    
+    def run(self, progress=print):
+        """运行所有测试
+        
+        Args:
+            progress: 输出进度的函数，为None时不输出
+        
+        Returns:
+            dict: 包含环境信息和各测试结果的报告
+        """
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "repeat": self.repeat,
+                "sizes": self.sizes
+            },
+            "results": {}
+        }
+        try:
+            for name in self.cases:
+                sizes = [FIXED_SIZE_CASES[name]] if name in FIXED_SIZE_CASES else self.sizes
+                for size in sizes:
+                    result = self.run_case(name, size)
+                    report["results"][f"{name}@{size}"] = result
+                    if progress:
+                        progress(format_result(f"{name}@{size}", result))
+        finally:
+            if not self.keep_work_dir:
+                shutil.rmtree(self.work_dir, ignore_errors=True)
+        return report
+
+def format_result(key, result):
+    """格式化一条测试结果"""
+    if result["status"] != "ok":
+        return f"{key:<36} {result['status']}: {result['reason']}"
+    return f"{key:<36} {result['median_ms']:>12.1f} ms  {result['rows_per_s'] or 0:>12.0f} 行/秒"
+
+def compare(report, baseline, tolerance=0.2, noise_floor_ms=NOISE_FLOOR_MS):
+    """与基准结果比较
+    
+    Args:
+        report: 本次测试报告
+        baseline: 基准测试报告
+        tolerance: 允许的耗时增加比例，超过时标记为退化
+        noise_floor_ms: 忽略的绝对差值（毫秒）
+    
+    Returns:
+        list: 比较结果，每项包含key、baseline_ms、current_ms、change和regressed
+    """
+    comparisons = []
+    for key, result in report["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if result["status"] != "ok" or not previous or previous.get("status") != "ok":
+            continue
+        # 逐条处理的测试在行数不同时按每条耗时比较
+        current_ms = result["median_ms"] / result["rows"]
+        baseline_ms = previous["median_ms"] / previous["rows"]
+        change = current_ms / baseline_ms - 1 if baseline_ms > 0 else 0.0
+        regressed = change > tolerance and (current_ms - baseline_ms) * result["rows"] > noise_floor_ms
+        comparisons.append({
+            "key": key,
+            "baseline_ms": previous["median_ms"],
+            "current_ms": result["median_ms"],
+            "change": round(change, 3),
+            "regressed": regressed
+        })
+    return comparisons
+
+def option(name, default=None):
+    """读取命令行参数的值"""
+    if name in sys.argv:
+        position = sys.argv.index(name)
+        if position + 1 < len(sys.argv):
+            return sys.argv[position + 1]
+    return default
+
+def main():
+    """运行基准测试，有性能退化时返回非零退出码"""
+    sizes = [int(size) for size in option("--sizes", ",".join(map(str, DEFAULT_SIZES))).split(",")]
+    cases = option("--cases")
+    cases = [case.strip() for case in cases.split(",")] if cases else None
+    unknown = [case for case in cases or [] if case not in CASES]
+    if unknown:
+        print(f"未知的测试: {', '.join(unknown)}，可选: {', '.join(CASES)}")
+        return 2
+    output_file = option("--output", f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    baseline_file = option("--baseline", "benchmark_baseline.json")
+    tolerance = float(option("--tolerance", "0.2"))
+    
+    suite = BenchmarkSuite(sizes=sizes, repeat=int(option("--repeat", "3")), cases=cases,
+                           resume_file=option("--resume"))
+    report = suite.run()
+    
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n测试结果已保存到: {output_file}")
+    
+    if "--update-baseline" in sys.argv:
+        with open(baseline_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"已更新基准: {baseline_file}")
+        return 0
+    
+    if not os.path.exists(baseline_file):
+        print(f"没有基准结果 {baseline_file}，使用 --update-baseline 保存本次结果作为基准")
+        return 0
+    
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    comparisons = compare(report, baseline, tolerance)
+    print(f"\n与基准比较（{baseline['meta'].get('revision') or '未知版本'}，{baseline['meta'].get('timestamp')}）:")
+    for item in comparisons:
+        flag = "退化" if item["regressed"] else ""
+        print(f"{item['key']:<36} {item['baseline_ms']:>10.1f} → {item['current_ms']:>10.1f} ms "
+              f"({item['change'] * 100:+.0f}%) {flag}")
+    regressions = [item for item in comparisons if item["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} 个测试的耗时超过基准 {tolerance * 100:.0f}%")
+        return 1
+    print("\n没有发现性能退化")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 浏览器会话池
+复用已启动的AutomatedApplicationSystem实例（每个实例持有一个浏览器），供并发申请和状态跟踪使用
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+
+class BrowserPool:
+    """浏览器会话池类，按需创建会话，最多同时存在size个"""
+    
+    def __init__(self, factory, size=2, name="default"):
+        """初始化浏览器会话池
+        
+        Args:
+            factory: 创建会话的函数，返回AutomatedApplicationSystem实例
+            size: 会话数量上限
+            name: 会话池名称
+        """
+        self.factory = factory
+        self.size = size
+        self.name = name
+        self.idle = queue.LifoQueue()
+        self.sessions = []
+        self.lock = threading.Lock()
+    
+    @contextmanager
+    def session(self, timeout=None):
+        """借出一个会话，使用结束后自动归还
+        
+        Args:
+            timeout: 等待空闲会话的最长时间（秒），默认为None（一直等待）
+        
+        Yields:
+            AutomatedApplicationSystem: 会话
+        """
+        session = self.acquire(timeout)
+        try:
+            yield session
+        finally:
+            self.release(session)
+    
+    def acquire(self, timeout=None):
+        """借出一个会话，没有空闲会话且未达上限时新建
+        
+        Args:
+            timeout: 等待空闲会话的最长时间（秒）
+        
+        Returns:
+            AutomatedApplicationSystem: 会话
+        """
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self.lock:
+            if len(self.sessions) < self.size:
+                session = self.factory()
+                self.sessions.append(session)
+                return session
+        return self.idle.get(timeout=timeout)
+    
+    def release(self, session):
+        """归还会话
+        
+        Args:
+            session: 会话
+        """
+        self.idle.put(session)
+    
+    def close(self):
+        """关闭所有会话的浏览器"""
+        with self.lock:
+            for session in self.sessions:
+                session.close_browser()
+            self.sessions = []
+            self.idle = queue.LifoQueue()
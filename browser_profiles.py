@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 浏览器配置档案
+提供完整和精简两种Chrome配置，精简配置屏蔽图片、字体、媒体和第三方跟踪脚本，并统计每个会话的内存和页面加载时间
+"""
+
+import os
+from selenium.webdriver.chrome.options import Options
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36"
+
+# 精简配置屏蔽的资源，格式为Chrome Network.setBlockedURLs支持的通配符
+BLOCKED_URL_PATTERNS = [
+    # 字体
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # 媒体
+    "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m3u8",
+    # 图片
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    # 第三方跟踪和广告
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*connect.facebook.com*",
+    "*hotjar.com*", "*segment.io*", "*segment.com/analytics*", "*scorecardresearch.com*",
+    "*bat.bing.com*", "*ads.linkedin.com*", "*px.ads.linkedin.com*", "*snap.licdn.com*",
+    "*quantserve.com*", "*newrelic.com*", "*nr-data.net*", "*optimizely.com*"
+]
+
+BROWSER_PROFILES = {
+    # 与原有设置一致的完整浏览器
+    "full": {
+        "window_size": "1920,1080",
+        "page_load_strategy": "normal",
+        "arguments": [],
+        "prefs": {},
+        "blocked_urls": []
+    },
+    # 自动化专用的精简浏览器
+    "lean": {
+        "window_size": "1280,800",
+        "page_load_strategy": "eager",
+        "arguments": [
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--disable-notifications",
+            "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+            "--metrics-recording-only",
+            "--no-first-run",
+            "--mute-audio",
+            "--blink-settings=imagesEnabled=false"
+        ],
+        "prefs": {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.media_stream": 2,
+            "profile.default_content_setting_values.geolocation": 2
+        },
+        "blocked_urls": BLOCKED_URL_PATTERNS
+    }
+}
+
+# 各招聘平台默认使用的配置，未列出的平台（如第三方ATS表单）使用完整配置
+PLATFORM_PROFILES = {
+    "linkedin": "lean",
+    "indeed": "lean",
+    "glassdoor": "lean"
+}
+
+DEFAULT_PROFILE = "full"
+
+def resolve_profile(profile=None, platform=None, platform_profiles=None):
+    """确定要使用的配置名称
+    
+    Args:
+        profile: 显式指定的配置名称，优先级最高
+        platform: 招聘平台名称
+        platform_profiles: 平台到配置名称的映射，默认为PLATFORM_PROFILES
+    
+    Returns:
+        str: 配置名称
+    """
+    if profile:
+        if profile not in BROWSER_PROFILES:
+            raise ValueError(f"未知的浏览器配置: {profile}")
+        return profile
+    if platform_profiles is None:
+        platform_profiles = PLATFORM_PROFILES
+    if platform:
+        return platform_profiles.get(platform.lower(), DEFAULT_PROFILE)
+    return DEFAULT_PROFILE
+
+def build_chrome_options(profile_name, headless=True, user_agent=DEFAULT_USER_AGENT, proxy_server=None):
+    """根据配置生成Chrome选项
+    
+    Args:
+        profile_name: 配置名称
+        headless: 是否使用无头模式
+        user_agent: 浏览器UA
+        proxy_server: 代理地址（不带用户名和密码），为None时直接连接
+    
+    Returns:
+        Options: Chrome选项
+    """
+    profile = BROWSER_PROFILES[profile_name]
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument(f"--window-size={profile['window_size']}")
+    chrome_options.add_argument(f"--user-agent={user_agent}")
+    if proxy_server:
+        chrome_options.add_argument(f"--proxy-server={proxy_server}")
+    for argument in profile["arguments"]:
+        chrome_options.add_argument(argument)
+    if profile["prefs"]:
+        chrome_options.add_experimental_option("prefs", profile["prefs"])
+    chrome_options.page_load_strategy = profile["page_load_strategy"]
+    return chrome_options
+
+def apply_resource_blocking(driver, profile_name):
+    """通过Chrome DevTools协议屏蔽配置中列出的资源
+    
+    Args:
+        driver: WebDriver实例
+        profile_name: 配置名称
+    
+    Returns:
+        bool: 是否启用了资源屏蔽
+    """
+    blocked_urls = BROWSER_PROFILES[profile_name]["blocked_urls"]
+    if not blocked_urls:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        return True
+    except Exception as e:
+        print(f"启用资源屏蔽失败: {e}")
+        return False
+
+def process_tree_rss(pid):
+    """统计进程及其所有子进程的常驻内存（仅支持Linux的/proc）
+    
+    Args:
+        pid: 根进程ID
+    
+    Returns:
+        int: 常驻内存字节数，无法统计时返回None
+    """
+    if not pid or not os.path.isdir("/proc"):
+        return None
+    
+    # 建立父进程到子进程的映射
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+            # 进程名可能包含空格，从最后一个右括号之后解析
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+        pending.extend(children.get(current, []))
+    return total
+
+def page_load_timing(driver):
+    """读取当前页面的加载时间
+    
+    Args:
+        driver: WebDriver实例
+    
+    Returns:
+        dict: DOM就绪和加载完成的毫秒数，无法读取时为空字典
+    """
+    try:
+        timing = driver.execute_script(
+            "var entry = performance.getEntriesByType('navigation')[0];"
+            "if (!entry) { return null; }"
+            "return {dom_content_loaded_ms: entry.domContentLoadedEventEnd, load_ms: entry.loadEventEnd,"
+            " transfer_bytes: entry.transferSize};"
+        )
+        return timing or {}
+    except Exception as e:
+        print(f"读取页面加载时间失败: {e}")
+        return {}
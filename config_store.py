@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 延迟写入的配置存储
+配置保存在内存中，修改只标记为待写入，由后台线程合并一段时间内的修改后在一个数据库事务中写入，退出时写入剩余的修改
+"""
+
+import time
+import atexit
+import threading
+
+class ConfigStore:
+    """延迟写入的配置存储类，读写接口与字典相同，读写都不会等待磁盘I/O"""
+    
+    def __init__(self, store, delay=1.0):
+        """初始化配置存储
+        
+        Args:
+            store: JobStore实例，配置写入其中的config表
+            delay: 第一次修改后等待多久再写入（秒），这段时间内的修改合并为一次写入
+        """
+        self.store = store
+        self.delay = delay
+        self.values = store.load_config()
+        self.dirty = set()
+        self.removed = set()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.closed = False
+        self.writes = 0
+        self.thread = threading.Thread(target=self.worker, name="config-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+    
+    def get(self, key, default=None):
+        """读取配置项"""
+        with self.lock:
+            return self.values.get(key, default)
+    
+    def set(self, key, value):
+        """修改配置项并安排后台写入
+        
+        Args:
+            key: 配置键
+            value: 配置值
+        """
+        with self.lock:
+            self.values[key] = value
+            self.dirty.add(key)
+            self.removed.discard(key)
+            self.wakeup.notify()
+    
+    def delete(self, key):
+        """删除配置项并安排后台写入"""
+        with self.lock:
+            if key in self.values:
+                del self.values[key]
+                self.dirty.discard(key)
+                self.removed.add(key)
+                self.wakeup.notify()
+    
+    def update(self, values):
+        """批量修改配置项"""
+        with self.lock:
+            self.values.update(values)
+            self.dirty.update(values)
+            self.removed.difference_update(values)
+            self.wakeup.notify()
+    
+    def __getitem__(self, key):
+        with self.lock:
+            return self.values[key]
+    
+    def __setitem__(self, key, value):
+        self.set(key, value)
+    
+    def __delitem__(self, key):
+        self.delete(key)
+    
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.values
+    
+    def __len__(self):
+        with self.lock:
+            return len(self.values)
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def keys(self):
+        with self.lock:
+            return list(self.values.keys())
+    
+    def items(self):
+        with self.lock:
+            return list(self.values.items())
+    
+    def to_dict(self):
+        """获取所有配置项的副本"""
+        with self.lock:
+            return dict(self.values)
+    
+    def pending(self):
+        """是否有尚未写入的修改"""
+        with self.lock:
+            return bool(self.dirty or self.removed)
+    
+    def worker(self):
+        """后台写入线程：有修改时等待delay秒合并后续修改，再一次性写入"""
+        while True:
+            with self.lock:
+                while not (self.dirty or self.removed) and not self.closed:
+                    self.wakeup.wait()
+                if self.closed:
+                    return
+            time.sleep(self.delay)
+            self.flush()
+    
+    def flush(self):
+        """立即写入所有待写入的修改
+        
+        修改在一个数据库事务中写入，写入过程中崩溃不会留下不完整的配置；
+        写入失败时修改重新标记为待写入，下次再试
+        """
+        with self.flush_lock:
+            with self.lock:
+                if not self.dirty and not self.removed:
+                    return
+                changes = {key: self.values[key] for key in self.dirty}
+                removed = set(self.removed)
+                self.dirty.clear()
+                self.removed.clear()
+            try:
+                self.store.save_config(changes, removed)
+                self.writes += 1
+            except Exception as e:
+                print(f"保存配置失败: {e}")
+                with self.lock:
+                    self.dirty.update(key for key in changes if key in self.values)
+                    self.removed.update(key for key in removed if key not in self.values)
+    
+    def close(self):
+        """写入剩余的修改并停止后台线程（程序退出时自动调用）"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.wakeup.notify()
+        self.thread.join()
+        self.flush()
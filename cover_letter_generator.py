@@ -11,6 +11,9 @@ import json
 import re
 import pandas as pd
 from datetime import datetime
+from job_store import get_store
+from metrics import traced
+from job_schema import job_description
 
 class CoverLetterGenerator:
     """自荐信生成器类，用于基于简历和职位描述生成定制化的求职信"""
@@ -25,8 +28,8 @@ class CoverLetterGenerator:
         self.data_dir = data_dir
         self.templates_dir = templates_dir
         self.cover_letters_dir = os.path.join(data_dir, "cover_letters")
-        self.history_file = os.path.join(data_dir, "cover_letter_history.json")
         self.ensure_directories()
+        self.store = get_store(data_dir)
         self.history = self.load_history()
         self.create_default_templates()
         
@@ -38,21 +41,13 @@ class CoverLetterGenerator:
                 print(f"创建目录: {directory}")
     
     def load_history(self):
-        """加载生成历史"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载生成历史失败: {e}")
-                return []
-        return []
+        """加载生成历史（数据库中的历史记录表，读取时才查询）"""
+        return self.store.history("cover_letter")
     
     def save_history(self):
-        """保存生成历史"""
+        """保存生成历史：只把新追加和被修改的记录写入数据库"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            self.history.flush()
         except Exception as e:
             print(f"保存生成历史失败: {e}")
     
@@ -236,6 +231,7 @@ P.S. 我特别喜欢贵公司的{company_product_or_initiative}，这正是吸
                 })
         return templates
     
+    @traced("load_template")
     def load_template(self, template_name):
         """加载指定的模板
         
@@ -257,6 +253,7 @@ P.S. 我特别喜欢贵公司的{company_product_or_initiative}，这正是吸
             print(f"加载模板失败: {e}")
             return None
     
+    @traced("extract_job_details")
     def extract_job_details(self, job_data):
         """从职位数据中提取关键信息
         
@@ -275,7 +272,7 @@ P.S. 我特别喜欢贵公司的{company_product_or_initiative}，这正是吸
             "job_title": job_data.get("TITLE", ""),
             "company_name": job_data.get("COMPANY", ""),
             "company_address": f"{job_data.get('CITY', '')}, {job_data.get('STATE', '')}",
-            "job_description": job_data.get("DESCRIPTION", ""),
+            "job_description": job_description(job_data),
             "job_url": job_data.get("JOB_URL", ""),
             "job_type": job_data.get("JOB_TYPE", ""),
             "salary_min": job_data.get("MIN_AMOUNT", ""),
@@ -427,6 +424,7 @@ P.S. 我特别喜欢贵公司的{company_product_or_initiative}，这正是吸
         
         return company_info
     
+    @traced("extract_resume_details")
     def extract_resume_details(self, resume_file):
         """从简历文件中提取关键信息
         
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 本地测试招聘网站
+在本机启动一个模拟LinkedIn申请流程的网站，用于在不访问真实招聘网站的情况下测量自动申请的耗时
+"""
+
+import os
+import sys
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+HOME_SIGNED_OUT = """<!DOCTYPE html>
+<html><head><title>Fixture Jobs</title></head>
+<body><a href="/login">Sign in</a><h1>Fixture Jobs</h1></body></html>
+"""
+
+HOME_SIGNED_IN = """<!DOCTYPE html>
+<html><head><title>Fixture Jobs</title></head>
+<body><h1>Fixture Jobs</h1><p>Welcome back</p></body></html>
+"""
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Login</title></head>
+<body>
+<form method="post" action="/login">
+<input id="username" name="username" type="text">
+<input id="password" name="password" type="password">
+<button type="submit">Log in</button>
+</form>
+</body></html>
+"""
+
+JOB_PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title><script src="/static/apply.js"></script></head>
+<body>
+<h1>{title}</h1>
+<button data-control-name="jobdetails_topcard_inapply" onclick="startApply()">Easy Apply</button>
+<div id="modal"></div>
+</body></html>
+"""
+
+CLOSED_JOB_PAGE = """<!DOCTYPE html>
+<html><head><title>Closed</title></head>
+<body><p>This job is no longer available</p></body></html>
+"""
+
+ATS_JOB_PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body>
+<h1>{title}</h1>
+<a href="/ats/apply/{job_id}">Apply now</a>
+</body></html>
+"""
+
+ATS_FORM_PAGE = """<!DOCTYPE html>
+<html><head><title>Apply</title></head>
+<body>
+<form method="post" action="/ats/apply/{job_id}" enctype="multipart/form-data">
+<input name="first_name" type="text">
+<input name="last_name" type="text">
+<input name="email" type="email">
+<input name="phone" type="tel">
+<input name="resume" type="file">
+<button type="submit">Submit</button>
+</form>
+</body></html>
+"""
+
+ATS_THANKS_PAGE = """<!DOCTYPE html>
+<html><head><title>Thanks</title></head>
+<body><p>Thank you for applying</p></body></html>
+"""
+
+# 申请表单的脚本单独提供，避免脚本中的文字出现在页面源码里干扰页面标记判断
+APPLY_SCRIPT = """
+var RENDER_DELAY = %(render_delay)d;
+var STEPS = %(steps)s;
+var current = 0;
+function render() {
+  var modal = document.getElementById('modal');
+  modal.innerHTML = '';
+  setTimeout(function () {
+    var step = STEPS[current];
+    if (step === 'contact') {
+      modal.innerHTML = '<h2>Contact info</h2>' +
+        '<input name="firstName"><input name="lastName"><input name="email"><input name="phone">' +
+        '<button onclick="nextStep()">Next</button>';
+    } else if (step === 'resume') {
+      modal.innerHTML = '<h2>Resume</h2><input type="file" id="upload" onchange="uploaded()">' +
+        '<button id="next" disabled onclick="nextStep()">Next</button>';
+    } else if (step === 'questions') {
+      modal.innerHTML = '<h2>Additional questions</h2><button onclick="nextStep()">Next</button>';
+    } else if (step === 'review') {
+      modal.innerHTML = '<h2>Review your application</h2>' +
+        '<button onclick="nextStep()">Submit application</button>';
+    } else {
+      modal.innerHTML = '<h2>Application submitted</h2>';
+    }
+  }, RENDER_DELAY);
+}
+function uploaded() {
+  setTimeout(function () { document.getElementById('next').disabled = false; }, RENDER_DELAY);
+}
+function startApply() { current = 0; render(); }
+function nextStep() { current += 1; render(); }
+"""
+
+class FixtureJobSite:
+    """本地测试招聘网站类，模拟LinkedIn的登录和Easy Apply流程"""
+    
+    def __init__(self, host="127.0.0.1", port=0, page_delay=0.0, render_delay=0.2,
+                 steps=("contact", "resume", "review"), path_delays=None):
+        """初始化本地测试网站
+        
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            page_delay: 每个页面请求的服务端延迟（秒）
+            render_delay: 申请表单每一步在浏览器中渲染的延迟（秒）
+            steps: 申请表单包含的步骤，可选contact、resume、questions、review
+            path_delays: 按路径前缀设置的额外服务端延迟，格式为{"/ats/": 1.0}，用于模拟较慢的平台
+        """
+        self.host = host
+        self.port = port
+        self.page_delay = page_delay
+        self.render_delay = render_delay
+        self.steps = list(steps)
+        self.path_delays = dict(path_delays or {})
+        self.server = None
+        self.thread = None
+        self.requests_served = 0
+        self.applications_received = 0
+    
+    def start(self):
+        """在后台线程中启动网站
+        
+        Returns:
+            str: 网站根URL
+        """
+        self.server = ThreadingHTTPServer((self.host, self.port), FixtureRequestHandler)
+        self.server.site = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url()
+    
+    def stop(self):
+        """停止网站"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    
+    def url(self, path=""):
+        """获取网站中某个路径的完整URL
+        
+        Args:
+            path: 路径
+        
+        Returns:
+            str: 完整URL
+        """
+        return f"http://{self.host}:{self.port}{path}"
+    
+    def apply_script(self):
+        """生成申请表单脚本"""
+        steps = "[" + ", ".join(f"'{step}'" for step in self.steps) + "]"
+        return APPLY_SCRIPT % {"render_delay": int(self.render_delay * 1000), "steps": steps}
+    
+    def delay_for(self, path):
+        """计算某个路径的服务端延迟
+        
+        Args:
+            path: 请求路径
+        
+        Returns:
+            float: 延迟（秒）
+        """
+        delay = self.page_delay
+        for prefix, extra in self.path_delays.items():
+            if path.startswith(prefix):
+                delay += extra
+        return delay
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """本地测试网站的请求处理类"""
+    
+    def log_message(self, format, *args):
+        """不输出访问日志"""
+        pass
+    
+    def send_page(self, body, status=200, content_type="text/html; charset=utf-8", headers=None):
+        """发送页面
+        
+        Args:
+            body: 页面内容
+            status: HTTP状态码
+            content_type: 内容类型
+            headers: 额外的响应头
+        """
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def signed_in(self):
+        """判断请求是否带有登录Cookie"""
+        return "fixture_session=1" in self.headers.get("Cookie", "")
+    
+    def do_GET(self):
+        """处理GET请求"""
+        site = self.server.site
+        site.requests_served += 1
+        path = urlparse(self.path).path
+        delay = site.delay_for(path)
+        if delay:
+            time.sleep(delay)
+        
+        if path == "/":
+            self.send_page(HOME_SIGNED_IN if self.signed_in() else HOME_SIGNED_OUT)
+        elif path == "/login":
+            self.send_page(LOGIN_PAGE)
+        elif path == "/feed/":
+            self.send_page(HOME_SIGNED_IN)
+        elif path == "/static/apply.js":
+            self.send_page(site.apply_script(), content_type="application/javascript")
+        elif path.startswith("/jobs/view/closed"):
+            self.send_page(CLOSED_JOB_PAGE)
+        elif path.startswith("/jobs/view/"):
+            job_id = path.rstrip("/").split("/")[-1]
+            self.send_page(JOB_PAGE.format(title=f"Fixture Job {job_id}"))
+        elif path.startswith("/ats/jobs/closed"):
+            self.send_page(CLOSED_JOB_PAGE)
+        elif path.startswith("/ats/jobs/"):
+            job_id = path.rstrip("/").split("/")[-1]
+            self.send_page(ATS_JOB_PAGE.format(title=f"Fixture ATS Job {job_id}", job_id=job_id))
+        elif path.startswith("/ats/apply/"):
+            job_id = path.rstrip("/").split("/")[-1]
+            self.send_page(ATS_FORM_PAGE.format(job_id=job_id))
+        else:
+            self.send_page("<html><body>Not found</body></html>", status=404)
+    
+    def do_POST(self):
+        """处理POST请求（登录和ATS表单提交）"""
+        site = self.server.site
+        site.requests_served += 1
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        path = urlparse(self.path).path
+        delay = site.delay_for(path)
+        if delay:
+            time.sleep(delay)
+        
+        if path.startswith("/ats/apply/"):
+            site.applications_received += 1
+            self.send_page(ATS_THANKS_PAGE)
+        elif path == "/login":
+            self.send_page("", status=302, headers={
+                "Location": "/feed/",
+                "Set-Cookie": "fixture_session=1; Path=/"
+            })
+        else:
+            self.send_page("<html><body>Not found</body></html>", status=404)
+
+# 测试代码
+if __name__ == "__main__":
+    from automated_application_system import AutomatedApplicationSystem
+    
+    # 启动本地测试网站
+    site = FixtureJobSite()
+    base_url = site.start()
+    print(f"本地测试网站已启动: {base_url}")
+    
+    resume_file = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else "resume_content.txt")
+    application_system = AutomatedApplicationSystem()
+    application_system.linkedin_base_url = base_url
+    credentials = {"email": "demo@example.com", "password": "demo"}
+    
+    # 连续申请多个职位，后续申请会使用自适应超时
+    try:
+        for i in range(5):
+            start_time = time.perf_counter()
+            result = application_system.apply_linkedin(site.url(f"/jobs/view/{i}"), resume_file, credentials=credentials)
+            wall_time = time.perf_counter() - start_time
+            print(f"申请 {i}: {result['message']}，总耗时 {wall_time:.2f} 秒，等待 {result.get('wait_time', 0):.2f} 秒")
+            session = result.get("session", {})
+            print(f"  浏览器配置 {session.get('profile')}，内存 {session.get('rss_mb')} MB，页面加载 {session.get('load_ms')} 毫秒")
+            for record in result.get("steps", []):
+                print(f"  - {record['step']}: 等待 {record['waited']:.2f} 秒 (超时 {record['timeout']:.1f} 秒)")
+    finally:
+        application_system.close_browser()
+        site.stop()
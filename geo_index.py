@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 位置解析和地理索引
+读取职位数据时根据随程序提供的地名表（gazetteer.csv，不需要联网）把CITY、STATE、COUNTRY解析为统一的地点ID和经纬度；
+地点按经纬度网格建立索引，"上海50公里以内"这样的范围查询先用二分查找定位网格，再按地点取出对应的行，远程职位单独标记
+"""
+
+import os
+import csv
+import math
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# 随程序提供的地名表
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv")
+
+# 解析后的位置列
+PLACE_ID = "PLACE_ID"
+LATITUDE = "LATITUDE"
+LONGITUDE = "LONGITUDE"
+
+# 远程职位的地点ID和识别关键词
+REMOTE_PLACE = "remote"
+REMOTE_WORDS = ["remote", "anywhere", "work from home", "wfh", "远程", "居家办公"]
+
+# 地名中可以忽略的后缀（"上海市"、"Guangdong Sheng"等）
+NAME_SUFFIXES = ["市", "省", " shi", " sheng", " city"]
+
+# 国家名称的别名（地名表中的国家名称和代码之外）
+COUNTRY_ALIASES = {
+    "中国": "CN", "prc": "CN", "usa": "US", "u.s.": "US", "u.s.a.": "US", "america": "US", "美国": "US",
+    "uk": "GB", "england": "GB", "britain": "GB", "great britain": "GB", "英国": "GB",
+    "日本": "JP", "韩国": "KR", "korea": "KR", "新加坡": "SG", "德国": "DE", "法国": "FR", "加拿大": "CA",
+    "澳大利亚": "AU", "印度": "IN", "香港": "HK", "台湾": "TW", "澳门": "MO"
+}
+
+EARTH_RADIUS_KM = 6371.0
+
+def normalize_name(value):
+    """统一地名的大小写和空白，空值返回空字符串"""
+    if not isinstance(value, str):
+        return ""
+    return " ".join(value.replace(",", " ").split()).lower()
+
+def is_remote(*values):
+    """位置文本是否表示远程工作"""
+    for value in values:
+        text = normalize_name(value)
+        if text and any(word in text for word in REMOTE_WORDS):
+            return True
+    return False
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """计算两点（或数组）之间的球面距离（公里）"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+class PlaceGrid:
+    """按经纬度网格排序的地点索引，范围查询时每一行网格用二分查找取出候选地点"""
+    
+    def __init__(self, latitudes, longitudes, cell_degrees=1.0):
+        """建立网格索引
+        
+        Args:
+            latitudes: 地点纬度数组
+            longitudes: 地点经度数组
+            cell_degrees: 网格大小（度）
+        """
+        self.latitudes = np.asarray(latitudes, dtype=float)
+        self.longitudes = np.asarray(longitudes, dtype=float)
+        self.cell_degrees = cell_degrees
+        self.columns = int(math.ceil(360 / cell_degrees))
+        keys = self.cell_key(self.latitudes, self.longitudes)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+    
+    def cell_row(self, latitude):
+        """纬度所在的网格行"""
+        return np.floor((np.asarray(latitude) + 90) / self.cell_degrees).astype(np.int64)
+    
+    def cell_column(self, longitude):
+        """经度所在的网格列（经度超出-180到180时折回）"""
+        return np.floor(((np.asarray(longitude) + 180) % 360) / self.cell_degrees).astype(np.int64)
+    
+    def cell_key(self, latitude, longitude):
+        """网格编号（按行、列排序）"""
+        return self.cell_row(latitude) * self.columns + self.cell_column(longitude)
+    
+    def within(self, latitude, longitude, radius_km):
+        """获取距离(latitude, longitude)不超过radius_km的地点
+        
+        Returns:
+            ndarray: 地点序号数组
+        """
+        delta_lat = radius_km / (EARTH_RADIUS_KM * math.pi / 180)
+        low_lat = max(-90.0, latitude - delta_lat)
+        high_lat = min(90.0, latitude + delta_lat)
+        # 经度方向的范围按范围内离赤道最远的纬度计算，靠近极点时取整行
+        widest = math.cos(math.radians(max(abs(low_lat), abs(high_lat))))
+        delta_lon = 180.0 if widest < 1e-6 else min(180.0, delta_lat / widest)
+        if delta_lon >= 180.0:
+            column_ranges = [(0, self.columns - 1)]
+        else:
+            first = int(self.cell_column(longitude - delta_lon))
+            last = int(self.cell_column(longitude + delta_lon))
+            column_ranges = [(first, last)] if first <= last else [(first, self.columns - 1), (0, last)]
+        
+        candidates = []
+        for row in range(int(self.cell_row(low_lat)), int(self.cell_row(high_lat)) + 1):
+            for first, last in column_ranges:
+                start = np.searchsorted(self.keys, row * self.columns + first, side="left")
+                end = np.searchsorted(self.keys, row * self.columns + last, side="right")
+                candidates.append(self.order[start:end])
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(candidates)
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+        return candidates[distances <= radius_km]
+
+class Gazetteer:
+    """地名表，把城市、省州和国家名称解析为地点"""
+    
+    def __init__(self, gazetteer_file=GAZETTEER_FILE):
+        """读取地名表
+        
+        Args:
+            gazetteer_file: CSV文件路径，列为place_id、name、aliases（|分隔）、state、state_code、
+                country、country_code、latitude、longitude、population（千人，用于同名地点的取舍）
+        """
+        with open(gazetteer_file, 'r', encoding='utf-8') as f:
+            self.places = list(csv.DictReader(f))
+        self.ids = {}
+        self.names = {}
+        for position, place in enumerate(self.places):
+            place["latitude"] = float(place["latitude"])
+            place["longitude"] = float(place["longitude"])
+            place["population"] = float(place["population"] or 0)
+            place["regions"] = {normalize_name(place[key]) for key in ["state", "state_code", "country", "country_code"]}
+            self.ids[place["place_id"]] = position
+            for name in [place["name"]] + place["aliases"].split("|"):
+                if name.strip():
+                    self.names.setdefault(normalize_name(name), []).append(position)
+        for positions in self.names.values():
+            positions.sort(key=lambda position: -self.places[position]["population"])
+        self.grid = PlaceGrid([place["latitude"] for place in self.places],
+                              [place["longitude"] for place in self.places])
+    
+    def candidates(self, name):
+        """按名称查找地点（忽略"市"等后缀）
+        
+        Returns:
+            list: 地点序号列表，人口多的在前
+        """
+        text = normalize_name(name)
+        if not text:
+            return []
+        if text in self.names:
+            return self.names[text]
+        for suffix in NAME_SUFFIXES:
+            if text.endswith(suffix) and text[:-len(suffix)].strip() in self.names:
+                return self.names[text[:-len(suffix)].strip()]
+        return []
+    
+    def region_matches(self, position, region):
+        """地点是否属于某个省州或国家（名称或代码）"""
+        text = normalize_name(region)
+        if not text:
+            return True
+        place = self.places[position]
+        for suffix in NAME_SUFFIXES:
+            if text.endswith(suffix):
+                text = text[:-len(suffix)].strip()
+        return text in place["regions"] or COUNTRY_ALIASES.get(text) == place["country_code"] or \
+            position in self.candidates(text)
+    
+    def resolve(self, city=None, state=None, country=None):
+        """解析一个位置
+        
+        城市名有多个同名地点时按省州和国家筛选，再取人口最多的；给出的省州或国家与所有同名地点都不符时不解析，
+        避免把地名表中没有的同名小城市归到其他国家
+        
+        Returns:
+            int: 地点序号，远程工作返回-2，无法解析返回-1
+        """
+        if is_remote(city, state, country):
+            return -2
+        # 没有城市时把省州当作城市名解析（直辖市、新加坡等只有一级地名的数据）
+        name, regions = (city, [state, country]) if normalize_name(city) else (state, [country])
+        matched = [position for position in self.candidates(name)
+                   if all(self.region_matches(position, region) for region in regions)]
+        return matched[0] if matched else -1
+    
+    def resolve_query(self, text):
+        """解析过滤条件中的位置（如"Shanghai"、"上海"、"Cambridge, MA"），同名地点都返回
+        
+        Returns:
+            list: 地点序号列表，无法解析时为空
+        """
+        parts = [part.strip() for part in str(text).split(",")]
+        positions = self.candidates(parts[0])
+        if len(parts) > 1:
+            positions = [position for position in positions
+                         if all(self.region_matches(position, region) for region in parts[1:])]
+        return positions
+    
+    def within(self, positions, radius_km):
+        """获取距离任一地点不超过radius_km的所有地点
+        
+        Returns:
+            ndarray: 地点序号数组
+        """
+        found = [self.grid.within(self.places[position]["latitude"], self.places[position]["longitude"], radius_km)
+                 for position in positions]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+# 程序中共用一个地名表
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """获取共享的地名表"""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer()
+        return _gazetteer
+
+def place_codes(frame, gazetteer=None):
+    """解析每行的位置，相同的(城市, 省州, 国家)组合只解析一次
+    
+    Returns:
+        ndarray: 地点序号数组（-1无法解析，-2远程）
+    """
+    gazetteer = gazetteer or get_gazetteer()
+    if PLACE_ID in frame.columns:
+        codes = frame[PLACE_ID].astype(object).map({**gazetteer.ids, REMOTE_PLACE: -2})
+        return codes.fillna(-1).to_numpy(dtype=np.int64)
+    
+    empty = pd.Series(None, index=frame.index, dtype=object)
+    parts = pd.DataFrame({column: frame[column].astype(object) if column in frame.columns else empty
+                          for column in ["CITY", "STATE", "COUNTRY"]})
+    if "LOCATION" in frame.columns:
+        # 只有完整位置文本（"City, State, Country"）的数据拆分后解析
+        location = frame["LOCATION"].astype(object).str.split(",", n=2, expand=True).reindex(columns=range(3))
+        for position, column in enumerate(["CITY", "STATE", "COUNTRY"]):
+            parts[column] = parts[column].where(parts[column].notna(), location[position].str.strip())
+    parts = parts.fillna("")
+    groups = parts.groupby(["CITY", "STATE", "COUNTRY"], sort=False).ngroup().to_numpy()
+    first = ~parts.duplicated().to_numpy()
+    resolved = np.array([gazetteer.resolve(*key) for key in parts[first].itertuples(index=False)], dtype=np.int64)
+    codes = resolved[groups]
+    if "IS_REMOTE" in frame.columns:
+        remote = frame["IS_REMOTE"].astype(object).isin([True, "True", "true", 1])
+        codes[(codes == -1) & remote.to_numpy()] = -2
+    return codes
+
+def resolve_locations(frame, gazetteer=None):
+    """添加地点ID和经纬度列（PLACE_ID、LATITUDE、LONGITUDE），读取职位数据时调用
+    
+    Returns:
+        DataFrame: 添加了位置列的副本，没有位置列时返回原DataFrame
+    """
+    if not any(column in frame.columns for column in ["CITY", "STATE", "COUNTRY", "LOCATION"]):
+        return frame
+    gazetteer = gazetteer or get_gazetteer()
+    codes = place_codes(frame.drop(columns=[PLACE_ID], errors="ignore"), gazetteer)
+    place_ids = np.array([place["place_id"] for place in gazetteer.places] + [REMOTE_PLACE, None], dtype=object)
+    latitudes = np.array([place["latitude"] for place in gazetteer.places] + [np.nan, np.nan], dtype="float32")
+    longitudes = np.array([place["longitude"] for place in gazetteer.places] + [np.nan, np.nan], dtype="float32")
+    frame = frame.copy()
+    # -1（无法解析）和-2（远程）分别取数组末尾的空值和远程
+    frame[PLACE_ID] = place_ids[codes]
+    frame[LATITUDE] = latitudes[codes]
+    frame[LONGITUDE] = longitudes[codes]
+    return frame
+
+class GeoIndex:
+    """职位的地理索引，行按地点排序，查询时按地点二分查找取出行位置"""
+    
+    def __init__(self, codes, gazetteer=None):
+        """建立索引
+        
+        Args:
+            codes: place_codes得到的每行地点序号
+            gazetteer: 地名表
+        """
+        self.gazetteer = gazetteer or get_gazetteer()
+        self.size = len(codes)
+        self.order = np.argsort(codes, kind="stable")
+        self.sorted_codes = codes[self.order]
+    
+    @classmethod
+    def from_frame(cls, frame, gazetteer=None):
+        """根据职位DataFrame建立索引"""
+        return cls(place_codes(frame, gazetteer), gazetteer)
+    
+    def rows(self, positions):
+        """获取位于这些地点的行
+        
+        Returns:
+            ndarray: 布尔数组
+        """
+        selected = np.zeros(self.size, dtype=bool)
+        for position in positions:
+            start = np.searchsorted(self.sorted_codes, position, side="left")
+            end = np.searchsorted(self.sorted_codes, position, side="right")
+            selected[self.order[start:end]] = True
+        return selected
+    
+    def remote(self):
+        """获取远程职位"""
+        return self.rows([-2])
+    
+    def unresolved(self):
+        """获取位置无法解析的行"""
+        return self.rows([-1])
+    
+    def near(self, location, radius_km=None):
+        """获取位于某个位置（或其radius_km范围内）的行
+        
+        Args:
+            location: 位置文本，如"Shanghai"、"上海"、"Cambridge, MA"、"Remote"
+            radius_km: 范围（公里），为None时只匹配该地点
+        
+        Returns:
+            ndarray: 布尔数组，位置无法解析时返回None
+        """
+        if is_remote(location):
+            return self.remote()
+        positions = self.gazetteer.resolve_query(location)
+        if not positions:
+            return None
+        if radius_km:
+            positions = self.gazetteer.within(positions, radius_km)
+        return self.rows(positions)
+
+# 每个DataFrame对象的索引只建立一次（形状或列变化时重新建立）
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def geo_index(frame):
+    """获取DataFrame的地理索引
+    
+    Args:
+        frame: 职位DataFrame
+    
+    Returns:
+        GeoIndex: 地理索引
+    """
+    key = id(frame)
+    shape = (frame.shape, tuple(frame.columns))
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry and entry[0]() is frame and entry[1] == shape:
+            return entry[2]
+    index = GeoIndex.from_frame(frame)
+    with _indexes_lock:
+        _indexes[key] = (weakref.ref(frame, lambda _: _indexes.pop(key, None)), shape, index)
+    return index
+
+def text_mask(frame, location):
+    """CITY或STATE中包含位置文本的行"""
+    rows = np.zeros(len(frame), dtype=bool)
+    for column in ["CITY", "STATE"]:
+        if column in frame.columns:
+            rows |= frame[column].astype(object).str.contains(location, case=False, regex=False, na=False).to_numpy()
+    return rows
+
+def region_mask(frame, positions, radius_km=None, gazetteer=None):
+    """STATE（和COUNTRY）与查询地点所在省州相同的行，用于城市不在地名表中的职位
+    
+    按范围查询时同一省州的职位都算在范围内；不按范围查询时只有查询地点本身就是省级地名
+    （上海、北京等直辖市）才匹配，例如"Minhang District, Shanghai"属于上海
+    
+    Returns:
+        ndarray: 布尔数组
+    """
+    gazetteer = gazetteer or get_gazetteer()
+    places = [gazetteer.places[position] for position in positions]
+    if not radius_km:
+        places = [place for place in places if normalize_name(place["name"]) == normalize_name(place["state"])]
+    if not places or "STATE" not in frame.columns:
+        return np.zeros(len(frame), dtype=bool)
+    
+    states = frame["STATE"].astype(object).map(normalize_name)
+    countries = frame["COUNTRY"].astype(object).map(normalize_name) if "COUNTRY" in frame.columns else \
+        pd.Series("", index=frame.index)
+    pairs = pd.DataFrame({"STATE": states, "COUNTRY": countries})
+    first = ~pairs.duplicated().to_numpy()
+    matched = {(state, country) for state, country in pairs[first].itertuples(index=False)
+               if state and any(state in place["regions"] and
+                                (not country or country in place["regions"] or
+                                 COUNTRY_ALIASES.get(country) == place["country_code"]) for place in places)}
+    return np.array([pair in matched for pair in zip(states, countries)], dtype=bool)
+
+def location_mask(frame, locations=None, radius_km=None, remote_only=False):
+    """按位置过滤职位
+    
+    能在地名表中解析的位置使用地理索引（可以按范围查询）；城市不在地名表中的行仍按CITY和STATE中是否包含
+    该文本，以及STATE是否为查询地点所在的省州来匹配。无法解析的位置（如州代码"CA"）只在CITY和STATE中查找
+    
+    Args:
+        frame: 职位DataFrame
+        locations: 位置列表，满足任一位置即可
+        radius_km: 范围（公里），为None时只匹配位置本身
+        remote_only: 只保留远程职位
+    
+    Returns:
+        ndarray: 布尔数组，与frame行顺序一致
+    """
+    index = geo_index(frame)
+    selected = np.ones(len(frame), dtype=bool)
+    if locations:
+        matched = np.zeros(len(frame), dtype=bool)
+        unresolved = index.unresolved()
+        for location in locations:
+            rows = index.near(location, radius_km)
+            if rows is None:
+                rows = text_mask(frame, location)
+            elif unresolved.any():
+                # 只检查无法解析的行，解析出的行已经由地理索引判断
+                others = frame[unresolved]
+                extra = text_mask(others, location)
+                if not is_remote(location):
+                    extra |= region_mask(others, index.gazetteer.resolve_query(location), radius_km, index.gazetteer)
+                rows[np.flatnonzero(unresolved)[extra]] = True
+            matched |= rows
+        selected &= matched
+    if remote_only:
+        selected &= index.remote()
+    return selected
+
+# 测试代码
+if __name__ == "__main__":
+    import time
+    from benchmark_suite import synthetic_jobs
+    
+    gazetteer = get_gazetteer()
+    for city, state in [("Shanghai", "SH"), ("上海市", None), ("Cambridge", "MA"), ("Cambridge", None),
+                        ("Vancouver", "WA"), ("Remote", None), ("Beijing Shi", "China")]:
+        position = gazetteer.resolve(city, state)
+        print(f"{city}, {state}: {gazetteer.places[position]['place_id'] if position >= 0 else position}")
+    shanghai = gazetteer.resolve_query("Shanghai")
+    print(f"上海100公里以内: {[gazetteer.places[p]['name'] for p in gazetteer.within(shanghai, 100)]}")
+    
+    jobs = synthetic_jobs(100000)
+    start_time = time.perf_counter()
+    jobs = resolve_locations(jobs)
+    print(f"解析 {len(jobs)} 条职位的位置: {(time.perf_counter() - start_time) * 1000:.0f} 毫秒")
+    start_time = time.perf_counter()
+    geo_index(jobs)
+    print(f"建立索引: {(time.perf_counter() - start_time) * 1000:.1f} 毫秒")
+    start_time = time.perf_counter()
+    mask = location_mask(jobs, ["上海"], radius_km=200)
+    print(f"上海200公里以内: {(time.perf_counter() - start_time) * 1000:.2f} 毫秒，{mask.sum()} 条，"
+          f"城市 {sorted(jobs[mask]['CITY'].unique())}")
+    print(f"远程职位: {location_mask(jobs, remote_only=True).sum()} 条")
+    print(f"州代码CA: {location_mask(jobs, ['CA']).sum()} 条")
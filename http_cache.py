@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 抓取的HTTP缓存
+招聘网站的列表页和详情页缓存在本地SQLite数据库中，按规范化后的请求（忽略参数顺序和跟踪参数）查找；
+每个网站的列表页和详情页有各自的有效期，过期后带ETag/Last-Modified重新验证，未修改时只更新有效期；
+缓存总大小超过上限时删除最久未使用的页面。安装后对requests的所有会话生效（包括jobspy内部创建的会话），
+只缓存TTL表中网站不带Cookie和Authorization的GET请求，其他请求不受影响
+"""
+
+import sys
+import time
+import zlib
+import json
+import sqlite3
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from metrics import inc
+
+# 各网站页面的有效期（秒）：(域名后缀, 路径前缀, 有效期)，按顺序取第一个匹配项，路径前缀为None时匹配该网站的其他页面；
+# 详情页内容很少变化，有效期较长，列表页需要看到新发布的职位，有效期较短
+DEFAULT_TTLS = [
+    ("linkedin.com", "/jobs/view", 7 * 24 * 3600),
+    ("linkedin.com", "/jobs-guest/jobs/api/jobPosting", 7 * 24 * 3600),
+    ("linkedin.com", None, 30 * 60),
+    ("indeed.com", "/viewjob", 7 * 24 * 3600),
+    ("indeed.com", None, 30 * 60),
+    ("glassdoor.com", "/job-listing", 7 * 24 * 3600),
+    ("glassdoor.com", None, 30 * 60),
+    ("ziprecruiter.com", "/jobs/", 7 * 24 * 3600),
+    ("ziprecruiter.com", None, 30 * 60),
+    ("google.com", "/search", 30 * 60)
+]
+
+# 带有这些请求头的请求属于某个用户或网络身份，不读取也不写入缓存
+PRIVATE_HEADERS = ("Cookie", "Authorization")
+
+# 当前调用（如一次搜索）的查找结果计数，由HttpCache.counting设置
+CALL_COUNTS = contextvars.ContextVar("http_cache_call_counts", default=None)
+
+# 规范化请求时去掉的跟踪参数
+TRACKING_PARAMS = {"trk", "trackingid", "refid", "position", "pagenum", "from", "vjk_source", "gclid", "fbclid"}
+TRACKING_PREFIXES = ("utm_",)
+
+# 缓存时不保存的响应头（内容已经解压，长度和编码不再适用）
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+def normalize_url(url):
+    """规范化URL：协议和域名小写，去掉默认端口、片段和跟踪参数，查询参数按名称排序"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme == "http" and parts.port == 80) and not (scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(sorted(query)), ""))
+
+def request_key(method, url):
+    """缓存键：请求方法和规范化URL的哈希"""
+    return hashlib.blake2b(f"{method.upper()} {normalize_url(url)}".encode("utf-8"), digest_size=16).hexdigest()
+
+def is_private(request):
+    """请求是否带有用户或网络身份的Cookie或认证信息"""
+    return any(request.headers.get(name) for name in PRIVATE_HEADERS)
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """提交任务时复制当前上下文的线程池，使任务中的请求计入提交者的调用计数"""
+    
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def propagate_context(package):
+    """让第三方包（如jobspy）内部的线程池在提交任务时复制上下文
+    
+    Args:
+        package: 包名，已导入的该包及其子模块中的ThreadPoolExecutor被替换
+    """
+    for name, module in list(sys.modules.items()):
+        if (name == package or name.startswith(package + ".")) and getattr(module, "ThreadPoolExecutor", None) is ThreadPoolExecutor:
+            module.ThreadPoolExecutor = ContextThreadPoolExecutor
+
+def site_of(url):
+    """URL所属的网站（域名去掉www.）"""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class HttpCache:
+    """基于SQLite的HTTP响应缓存类"""
+    
+    def __init__(self, db_file, max_mb=512, ttls=None):
+        """初始化缓存
+        
+        Args:
+            db_file: SQLite数据库文件路径
+            max_mb: 缓存的最大大小（MB，按压缩后的内容计算）
+            ttls: 有效期表，格式同DEFAULT_TTLS
+        """
+        self.db_file = db_file
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttls = list(ttls or DEFAULT_TTLS)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(CACHE_SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.counts = {"hit": 0, "revalidated": 0, "miss": 0}
+    
+    def ttl(self, url):
+        """获取URL的有效期
+        
+        Returns:
+            int: 有效期（秒），不缓存的URL返回None
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        for suffix, path_prefix, seconds in self.ttls:
+            if (host == suffix or host.endswith("." + suffix)) and (path_prefix is None or parts.path.startswith(path_prefix)):
+                return seconds
+        return None
+    
+    def get(self, key):
+        """读取缓存的响应
+        
+        Returns:
+            dict: status、headers、body、expires_at、etag、last_modified，不存在时返回None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, expires_at, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        status, headers, body, expires_at, etag, last_modified = row
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": zlib.decompress(body),
+            "expires_at": expires_at,
+            "etag": etag,
+            "last_modified": last_modified
+        }
+    
+    def put(self, key, url, status, headers, body, ttl):
+        """保存响应
+        
+        Args:
+            key: 缓存键
+            url: 请求URL
+            status: 状态码
+            headers: 响应头字典
+            body: 响应内容（已解压的字节）
+            ttl: 有效期（秒）
+        """
+        headers = {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS}
+        lowered = {name.lower(): value for name, value in headers.items()}
+        data = zlib.compress(body, 1)
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, stored_at, expires_at, "
+                "accessed_at, etag, last_modified) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), data, len(data), now, now + ttl, now,
+                 lowered.get("etag"), lowered.get("last-modified"))
+            )
+            self.total_bytes += len(data) - (previous[0] if previous else 0)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+    
+    def refresh(self, key, ttl, headers=None):
+        """重新验证未修改时延长有效期，并更新新的ETag/Last-Modified"""
+        lowered = {name.lower(): value for name, value in (headers or {}).items()}
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now + ttl, now, lowered.get("etag"), lowered.get("last-modified"), key)
+            )
+    
+    def evict(self, target_ratio=0.9):
+        """删除最久未使用的响应，直到总大小不超过上限的target_ratio"""
+        target = self.max_bytes * target_ratio
+        with self.lock:
+            removed = []
+            for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                if self.total_bytes <= target:
+                    break
+                removed.append((key,))
+                self.total_bytes -= size
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", removed)
+        return len(removed)
+    
+    def record(self, result, url):
+        """记录一次查找结果（hit、revalidated、miss），同时计入当前调用的计数"""
+        call_counts = CALL_COUNTS.get()
+        with self.lock:
+            self.counts[result] += 1
+            if call_counts is not None:
+                call_counts[result] += 1
+        inc("job_assistant_http_cache_total", help="抓取请求的HTTP缓存查找结果", result=result, site=site_of(url))
+    
+    @contextmanager
+    def counting(self):
+        """统计with块内（包括复制了上下文的线程中）的查找结果，并发的其他调用不计入
+        
+        Yields:
+            dict: hit、revalidated和miss的次数
+        """
+        counts = {"hit": 0, "revalidated": 0, "miss": 0}
+        token = CALL_COUNTS.set(counts)
+        try:
+            yield counts
+        finally:
+            CALL_COUNTS.reset(token)
+    
+    def stats(self):
+        """获取缓存统计
+        
+        Returns:
+            dict: 页面数量、大小（MB）、各查找结果次数和命中率（包括重新验证未修改的请求）
+        """
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            counts = dict(self.counts)
+        lookups = sum(counts.values())
+        return {
+            "entries": entries,
+            "size_mb": round(self.total_bytes / 1024 / 1024, 2),
+            **counts,
+            "hit_rate": round((counts["hit"] + counts["revalidated"]) / lookups, 3) if lookups else 0.0
+        }
+    
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.total_bytes = 0
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+    
+    def send(self, send, adapter, request, **kwargs):
+        """通过缓存发送requests请求，供install替换HTTPAdapter.send时调用
+        
+        Args:
+            send: 原始的HTTPAdapter.send
+            adapter: HTTPAdapter实例
+            request: PreparedRequest
+            **kwargs: HTTPAdapter.send的其他参数
+        
+        Returns:
+            Response: 响应（来自缓存时from_cache为True）
+        """
+        ttl = self.ttl(request.url) if request.method == "GET" else None
+        no_cache = "no-cache" in request.headers.get("Cache-Control", "").lower()
+        # 带Cookie或认证信息的页面可能只属于这个用户，不能提供给其他调用方
+        if ttl is None or kwargs.get("stream") or no_cache or is_private(request):
+            return send(adapter, request, **kwargs)
+        
+        key = request_key(request.method, request.url)
+        cached = self.get(key)
+        if cached is not None and cached["expires_at"] > time.time():
+            self.record("hit", request.url)
+            return cached_response(cached, request, adapter)
+        
+        # 过期的响应带上验证头重新请求
+        if cached is not None:
+            if cached["etag"]:
+                request.headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                request.headers["If-Modified-Since"] = cached["last_modified"]
+        response = send(adapter, request, **kwargs)
+        if cached is not None and response.status_code == 304:
+            self.refresh(key, ttl, response.headers)
+            self.record("revalidated", request.url)
+            response.close()
+            return cached_response(cached, request, adapter)
+        
+        self.record("miss", request.url)
+        # 内层的身份池可能给请求加上了身份的Cookie，这样得到的页面同样不写入缓存
+        if response.status_code == 200 and not is_private(request) and \
+                "no-store" not in response.headers.get("Cache-Control", "").lower():
+            self.put(key, request.url, response.status_code, dict(response.headers), response.content, ttl)
+        return response
+
+def cached_response(cached, request, adapter):
+    """用缓存的内容构造requests的Response"""
+    from requests.models import Response
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+    
+    response = Response()
+    response.status_code = cached["status"]
+    response.reason = "OK"
+    response.headers = CaseInsensitiveDict(cached["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = cached["body"]
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    response.from_cache = True
+    return response
+
+# 已安装的缓存和原始的HTTPAdapter.send
+_installed = {}
+_install_lock = threading.Lock()
+
+def install(cache):
+    """让requests的所有请求经过缓存（重复安装时替换为新的缓存）
+    
+    Args:
+        cache: HttpCache实例
+    """
+    from requests.adapters import HTTPAdapter
+    
+    with _install_lock:
+        if "send" not in _installed:
+            original = HTTPAdapter.send
+            
+            def send(adapter, request, **kwargs):
+                return _installed["cache"].send(original, adapter, request, **kwargs)
+            _installed["send"] = original
+            HTTPAdapter.send = send
+        _installed["cache"] = cache
+
+def uninstall():
+    """恢复requests原来的请求方式"""
+    from requests.adapters import HTTPAdapter
+    
+    with _install_lock:
+        if "send" in _installed:
+            HTTPAdapter.send = _installed.pop("send")
+            _installed.pop("cache", None)
+
+# 每个数据库文件共用一个缓存
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_http_cache(db_file, max_mb=512):
+    """获取数据库文件对应的共享缓存"""
+    with _caches_lock:
+        if db_file not in _caches:
+            _caches[db_file] = HttpCache(db_file, max_mb)
+        return _caches[db_file]
+
+# 测试代码
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import requests
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class SlowBoard(BaseHTTPRequestHandler):
+        """模拟较慢的招聘网站，详情页支持ETag"""
+        
+        def do_GET(self):
+            time.sleep(0.05)
+            body = f"<html>{self.path}</html>".encode("utf-8") * 200
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowBoard)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    
+    cache = HttpCache(os.path.join(tempfile.mkdtemp(), "http_cache.db"),
+                      ttls=[("127.0.0.1", "/jobs/view", 3600), ("127.0.0.1", None, 1)])
+    install(cache)
+    session = requests.Session()
+    urls = [f"{base}/jobs/search?q=python&start=0&utm_source=x"] + [f"{base}/jobs/view/{i}?trk=abc" for i in range(20)]
+    
+    for attempt in ["第一次搜索", "再次搜索"]:
+        start_time = time.perf_counter()
+        for url in urls:
+            session.get(url).raise_for_status()
+        print(f"{attempt}: {time.perf_counter() - start_time:.2f} 秒")
+    time.sleep(1.1)
+    session.get(urls[0])
+    session.get(urls[1], headers={"Cookie": "li_at=secret"})
+    with cache.counting() as counts:
+        with ContextThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda url: session.get(url), urls))
+    print(f"本次调用: {counts}")
+    print(cache.stats())
+    uninstall()
+    server.shutdown()
@@ -18,6 +18,9 @@ import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
+from job_store import get_store
+from metrics import traced
+from job_schema import job_description
 
 class JobMatchingSystem:
     """工作匹配系统类，用于基于简历内容和职位要求进行匹配评分"""
@@ -30,8 +33,8 @@ class JobMatchingSystem:
         """
         self.data_dir = data_dir
         self.matches_dir = os.path.join(data_dir, "matches")
-        self.history_file = os.path.join(data_dir, "matching_history.json")
         self.ensure_directories()
+        self.store = get_store(data_dir)
         self.history = self.load_history()
         self.initialize_nltk()
         
@@ -43,30 +46,26 @@ class JobMatchingSystem:
                 print(f"创建目录: {directory}")
     
     def load_history(self):
-        """加载匹配历史"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载匹配历史失败: {e}")
-                return []
-        return []
+        """加载匹配历史（数据库中的历史记录表，读取时才查询）"""
+        return self.store.history("matching")
     
     def save_history(self):
-        """保存匹配历史"""
+        """保存匹配历史：只把新追加和被修改的记录写入数据库"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            self.history.flush()
         except Exception as e:
             print(f"保存匹配历史失败: {e}")
     
     def initialize_nltk(self):
         """初始化NLTK资源"""
         try:
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('wordnet', quiet=True)
+            # 只下载磁盘上还没有的数据，数据齐全时不访问网络
+            for name, resource_path in [('punkt', 'tokenizers/punkt'), ('stopwords', 'corpora/stopwords'),
+                                        ('wordnet', 'corpora/wordnet')]:
+                try:
+                    nltk.data.find(resource_path)
+                except LookupError:
+                    nltk.download(name, quiet=True)
             self.stop_words = set(stopwords.words('english'))
             self.lemmatizer = WordNetLemmatizer()
         except Exception as e:
@@ -110,6 +109,7 @@ class JobMatchingSystem:
         # 重新组合为文本
         return ' '.join(tokens)
     
+    @traced("extract_resume_features")
     def extract_resume_features(self, resume_file):
         """从简历文件中提取特征
         
@@ -262,7 +262,7 @@ class JobMatchingSystem:
         }
         
         # 获取职位描述
-        description = job_data.get("DESCRIPTION", "")
+        description = job_description(job_data)
         job_features["description"] = description
         
         # 提取所需技能
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 紧凑的职位数据结构
+职位DataFrame中重复较多的文本列（网站、公司、城市、工作类型等）转换为分类类型，薪资转换为数值类型；
+职位描述按内容哈希保存在单独的SQLite描述库中（相同描述只保存一份并压缩），DataFrame中只保留描述ID，需要时再读取
+"""
+
+import os
+import zlib
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# 转换为分类类型的列（不同取值的比例超过CATEGORY_MAX_RATIO时保持原样）
+CATEGORY_COLUMNS = ["SITE", "COMPANY", "CITY", "STATE", "JOB_TYPE", "INTERVAL", "CURRENCY", "PLACE_ID"]
+CATEGORY_MAX_RATIO = 0.5
+
+# 转换为数值类型的列
+NUMERIC_COLUMNS = ["MIN_AMOUNT", "MAX_AMOUNT"]
+
+# 描述ID列，替代DESCRIPTION列
+DESCRIPTION_ID = "DESCRIPTION_ID"
+
+DESCRIPTION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS descriptions (
+    id TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+def description_id(text):
+    """计算职位描述的内容哈希（相同内容得到相同ID）"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class DescriptionStore:
+    """按内容哈希保存职位描述的存储类"""
+    
+    def __init__(self, db_file, cache_size=256):
+        """初始化描述库
+        
+        Args:
+            db_file: SQLite数据库文件路径
+            cache_size: 最近读取的描述缓存数量，用于展开单行、生成自荐信等逐条读取
+        """
+        self.db_file = db_file
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(DESCRIPTION_SCHEMA)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+    
+    def put_many(self, texts):
+        """保存多段描述
+        
+        Args:
+            texts: 描述文本列表，空值对应的ID为None
+        
+        Returns:
+            list: 与输入顺序一致的描述ID列表
+        """
+        ids = []
+        new_rows = {}
+        for text in texts:
+            if not isinstance(text, str) or not text:
+                ids.append(None)
+                continue
+            text_id = description_id(text)
+            ids.append(text_id)
+            if text_id not in new_rows:
+                new_rows[text_id] = text
+        # 已保存的描述不再压缩写入（重新读取同一份CSV时只需计算哈希）
+        for text_id in self.existing_ids(list(new_rows)):
+            del new_rows[text_id]
+        if new_rows:
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO descriptions (id, data) VALUES (?, ?)",
+                        ((text_id, zlib.compress(text.encode("utf-8"), 1)) for text_id, text in new_rows.items())
+                    )
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+        return ids
+    
+    def existing_ids(self, text_ids, chunk_size=500):
+        """获取已保存的描述ID
+        
+        Returns:
+            set: text_ids中已保存的ID
+        """
+        existing = set()
+        with self.lock:
+            for start in range(0, len(text_ids), chunk_size):
+                chunk = text_ids[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                existing.update(row[0] for row in self.conn.execute(
+                    f"SELECT id FROM descriptions WHERE id IN ({placeholders})", chunk))
+        return existing
+    
+    def get(self, text_id):
+        """读取一段描述
+        
+        Returns:
+            str: 描述文本，不存在时返回None
+        """
+        if not text_id:
+            return None
+        with self.lock:
+            if text_id in self.cache:
+                self.cache.move_to_end(text_id)
+                return self.cache[text_id]
+        text = self.get_many([text_id]).get(text_id)
+        if text is not None:
+            with self.lock:
+                self.cache[text_id] = text
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return text
+    
+    def get_many(self, text_ids, chunk_size=500):
+        """批量读取描述
+        
+        Args:
+            text_ids: 描述ID列表
+            chunk_size: 每次查询的ID数量
+        
+        Returns:
+            dict: ID到描述文本的映射（不存在的ID不包含在内）
+        """
+        unique_ids = list({text_id for text_id in text_ids if isinstance(text_id, str) and text_id})
+        texts = {}
+        with self.lock:
+            for start in range(0, len(unique_ids), chunk_size):
+                chunk = unique_ids[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                for text_id, data in self.conn.execute(
+                        f"SELECT id, data FROM descriptions WHERE id IN ({placeholders})", chunk):
+                    texts[text_id] = zlib.decompress(data).decode("utf-8")
+        return texts
+    
+    def stats(self):
+        """获取描述数量和压缩后的总大小"""
+        with self.lock:
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM descriptions").fetchone()
+        return {"descriptions": count, "compressed_mb": round(size / 1024 / 1024, 2)}
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+
+# 每个数据目录共用一个描述库
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_description_store(data_dir, db_name="descriptions.db"):
+    """获取数据目录对应的共享描述库
+    
+    Args:
+        data_dir: 数据存储目录
+        db_name: 数据库文件名
+    
+    Returns:
+        DescriptionStore: 描述库
+    """
+    db_file = os.path.abspath(os.path.join(data_dir, db_name))
+    with _stores_lock:
+        if db_file not in _stores:
+            os.makedirs(os.path.dirname(db_file), exist_ok=True)
+            _stores[db_file] = DescriptionStore(db_file)
+        return _stores[db_file]
+
+def stores_for(frame=None):
+    """获取读取描述时使用的描述库：DataFrame记录的描述库优先，其次是所有已打开的描述库"""
+    with _stores_lock:
+        stores = list(_stores.values())
+    db_file = getattr(frame, "attrs", {}).get("description_db") if frame is not None else None
+    stores.sort(key=lambda store: store.db_file != db_file)
+    return stores
+
+def compact_jobs(jobs_df, store=None):
+    """把职位DataFrame转换为紧凑结构
+    
+    Args:
+        jobs_df: scrape_jobs或read_csv得到的职位DataFrame
+        store: 描述库，为None时保留DESCRIPTION列
+    
+    Returns:
+        DataFrame: 新的紧凑DataFrame（不修改输入）
+    """
+    frame = jobs_df.copy()
+    for column in NUMERIC_COLUMNS:
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float32")
+    for column in CATEGORY_COLUMNS:
+        if column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            if len(frame) and frame[column].nunique(dropna=True) / len(frame) <= CATEGORY_MAX_RATIO:
+                frame[column] = frame[column].astype("category")
+    if store is not None and "DESCRIPTION" in frame.columns:
+        frame[DESCRIPTION_ID] = store.put_many(frame["DESCRIPTION"].tolist())
+        frame = frame.drop(columns=["DESCRIPTION"])
+        frame.attrs["description_db"] = store.db_file
+    return frame
+
+def drop_unused_categories(jobs_df):
+    """删除分类列中没有出现的取值，使过滤后的value_counts等统计不包含计数为0的取值"""
+    frame = jobs_df
+    for column in jobs_df.columns:
+        if isinstance(jobs_df[column].dtype, pd.CategoricalDtype):
+            if frame is jobs_df:
+                frame = jobs_df.copy()
+            frame[column] = frame[column].cat.remove_unused_categories()
+    return frame
+
+def job_descriptions(jobs_df):
+    """获取职位DataFrame的描述列，紧凑结构的DataFrame从描述库批量读取
+    
+    Args:
+        jobs_df: 职位DataFrame
+    
+    Returns:
+        Series: 与jobs_df索引一致的描述文本
+    """
+    if "DESCRIPTION" in jobs_df.columns:
+        return jobs_df["DESCRIPTION"]
+    if DESCRIPTION_ID not in jobs_df.columns:
+        return pd.Series(None, index=jobs_df.index, dtype=object)
+    ids = jobs_df[DESCRIPTION_ID]
+    texts = load_descriptions(ids.dropna().unique(), jobs_df)
+    return ids.map(texts).astype(object)
+
+def load_descriptions(text_ids, frame=None):
+    """按描述ID批量读取描述
+    
+    Args:
+        text_ids: 描述ID列表
+        frame: 描述ID所属的DataFrame，优先从它记录的描述库读取
+    
+    Returns:
+        dict: ID到描述文本的映射（找不到的ID不包含在内）
+    """
+    texts = {}
+    for store in stores_for(frame):
+        missing = [text_id for text_id in text_ids if text_id not in texts]
+        if not missing:
+            break
+        texts.update(store.get_many(missing))
+    return texts
+
+def job_description(job_data):
+    """获取一个职位（字典或DataFrame行）的描述
+    
+    Returns:
+        str: 描述文本，没有描述时返回空字符串
+    """
+    description = job_data.get("DESCRIPTION")
+    if isinstance(description, str):
+        return description
+    text_id = job_data.get(DESCRIPTION_ID)
+    if isinstance(text_id, str):
+        for store in stores_for():
+            text = store.get(text_id)
+            if text is not None:
+                return text
+    return ""
+
+def with_descriptions(jobs_df):
+    """获取包含DESCRIPTION列的副本，供需要完整描述的旧代码使用"""
+    if "DESCRIPTION" in jobs_df.columns or DESCRIPTION_ID not in jobs_df.columns:
+        return jobs_df
+    frame = jobs_df.copy()
+    frame["DESCRIPTION"] = job_descriptions(jobs_df)
+    return frame
+
+def memory_bytes(frame):
+    """DataFrame占用的内存（字节，包括字符串内容）"""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+def memory_report(rows):
+    """生成内存占用报告
+    
+    Args:
+        rows: (名称, 转换前字节数, 转换后字节数)列表
+    
+    Returns:
+        str: Markdown格式的报告
+    """
+    lines = ["| 数据 | 转换前(MB) | 转换后(MB) | 减少 |", "| --- | ---: | ---: | ---: |"]
+    for name, before, after in rows:
+        saved = 1 - after / before if before else 0.0
+        lines.append(f"| {name} | {before / 1024 / 1024:.2f} | {after / 1024 / 1024:.2f} | {saved * 100:.0f}% |")
+    return "\n".join(lines)
+
+# 测试代码
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+    from benchmark_suite import synthetic_jobs
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    jobs = synthetic_jobs(count, description_pool=count)
+    store = get_description_store(tempfile.mkdtemp())
+    
+    start_time = time.perf_counter()
+    compact = compact_jobs(jobs, store)
+    print(f"转换 {count} 条职位: {time.perf_counter() - start_time:.2f} 秒")
+    print(memory_report([("职位数据", memory_bytes(jobs), memory_bytes(compact))]))
+    print(f"描述库: {store.stats()}")
+    
+    start_time = time.perf_counter()
+    descriptions = job_descriptions(compact[compact["CITY"] == "Shanghai"])
+    print(f"读取上海的 {len(descriptions)} 条描述: {time.perf_counter() - start_time:.2f} 秒")
+    print(job_description(compact.iloc[0])[:80])
@@ -9,24 +9,48 @@
 import os
 import csv
 import json
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from contextlib import nullcontext
 from jobspy import scrape_jobs
+from job_store import get_store
+from job_schema import job_descriptions
+from report_engine import count_skills, get_report_engine
+from salary_index import salary_index, has_salary
+from geo_index import location_mask
+from metrics import span, inc
+import http_cache
+import identity_pool
 
 class JobSearchSystem:
     """工作搜索系统类，用于从多个招聘网站搜索工作信息"""
     
-    def __init__(self, data_dir="/home/ubuntu/job_data"):
+    def __init__(self, data_dir="/home/ubuntu/job_data", http_cache_mb=512):
         """初始化工作搜索系统
         
         Args:
             data_dir: 数据存储目录
+            http_cache_mb: 抓取页面的HTTP缓存大小（MB），为0时不使用缓存
         """
         self.data_dir = data_dir
-        self.search_history_file = os.path.join(data_dir, "search_history.json")
         self.ensure_data_dir()
+        self.store = get_store(data_dir)
         self.search_history = self.load_search_history()
         
+        # 对招聘网站的请求从身份池中轮换代理、UA和Cookie，并按每个身份的限流情况控制请求节奏；
+        # 身份池先于缓存安装，缓存命中的请求不经过身份池
+        self.identity_pool = identity_pool.get_identity_pool(data_dir)
+        identity_pool.install(self.identity_pool)
+        
+        # 招聘网站的页面缓存在本地，重复搜索时详情页直接从缓存读取
+        self.http_cache = None
+        if http_cache_mb:
+            self.http_cache = http_cache.get_http_cache(os.path.join(data_dir, "http_cache.db"), http_cache_mb)
+            http_cache.install(self.http_cache)
+            # jobspy在自己的线程池中请求各网站，复制上下文后这些请求计入本次搜索的缓存统计
+            http_cache.propagate_context("jobspy")
+    
     def ensure_data_dir(self):
         """确保数据目录存在"""
         if not os.path.exists(self.data_dir):
@@ -34,26 +58,18 @@ class JobSearchSystem:
             print(f"创建数据目录: {self.data_dir}")
     
     def load_search_history(self):
-        """加载搜索历史"""
-        if os.path.exists(self.search_history_file):
-            try:
-                with open(self.search_history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载搜索历史失败: {e}")
-                return []
-        return []
+        """加载搜索历史（数据库中的历史记录表，读取时才查询）"""
+        return self.store.history("search")
     
     def save_search_history(self):
-        """保存搜索历史"""
+        """保存搜索历史：只把新追加和被修改的记录写入数据库"""
         try:
-            with open(self.search_history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.search_history, f, ensure_ascii=False, indent=2)
+            self.search_history.flush()
         except Exception as e:
             print(f"保存搜索历史失败: {e}")
     
-    def search_jobs(self, search_term, location=None, site_names=None, 
-                   job_type=None, is_remote=None, results_wanted=50, 
+    def search_jobs(self, search_term, location=None, site_names=None,
+                   job_type=None, is_remote=None, results_wanted=50,
                    hours_old=72, country=None, description_format="markdown"):
         """搜索工作
         
@@ -67,7 +83,7 @@ class JobSearchSystem:
             hours_old: 过滤多少小时内发布的工作
             country: 国家（用于Indeed和Glassdoor）
             description_format: 描述格式 (markdown, html)
-            
+        
         Returns:
             DataFrame: 工作搜索结果
         """
@@ -93,7 +109,7 @@ class JobSearchSystem:
             search_params["is_remote"] = is_remote
         if country:
             search_params["country_indeed"] = country
-            
+        
         # 如果搜索Google Jobs，添加google_search_term参数
         if "google" in site_names:
             google_search_term = f"{search_term} jobs"
@@ -101,14 +117,20 @@ class JobSearchSystem:
                 google_search_term += f" near {location}"
             google_search_term += " since yesterday"
             search_params["google_search_term"] = google_search_term
-            
+        
         # 记录搜索开始时间
         start_time = datetime.now()
         print(f"开始搜索工作: {search_term}")
         
         try:
-            # 执行搜索
-            jobs_df = scrape_jobs(**search_params)
+            # 执行搜索（只统计本次搜索的缓存命中，并发的其他搜索不计入）
+            with self.http_cache.counting() if self.http_cache else nullcontext() as cache_counts, \
+                    span("search_jobs") as current:
+                jobs_df = scrape_jobs(**search_params)
+                current["rows"] = len(jobs_df)
+            if "site" in jobs_df.columns:
+                for site, count in jobs_df["site"].value_counts().items():
+                    inc("job_assistant_jobs_scraped_total", int(count), "抓取到的职位数", site=site)
             
             # 记录搜索结束时间和结果数量
             end_time = datetime.now()
@@ -134,11 +156,15 @@ class JobSearchSystem:
                 "result_file": result_file,
                 "duration": duration
             }
+            if cache_counts is not None:
+                search_record["http_cache"] = dict(cache_counts)
+                print(f"HTTP缓存: 命中 {search_record['http_cache']['hit']} 次，"
+                      f"重新验证 {search_record['http_cache']['revalidated']} 次，未命中 {search_record['http_cache']['miss']} 次")
             self.search_history.append(search_record)
             self.save_search_history()
             
             return jobs_df
-            
+        
         except Exception as e:
             print(f"搜索工作失败: {e}")
             return pd.DataFrame()
@@ -148,18 +174,18 @@ class JobSearchSystem:
         
         Args:
             limit: 返回的记录数量限制
-            
+        
         Returns:
             list: 最近的搜索记录列表
         """
-        return self.search_history[-limit:] if self.search_history else []
+        return self.search_history.recent(limit)
     
     def load_search_result(self, result_file):
         """加载搜索结果
         
         Args:
             result_file: 搜索结果文件路径
-            
+        
         Returns:
             DataFrame: 搜索结果
         """
@@ -169,82 +195,63 @@ class JobSearchSystem:
             print(f"加载搜索结果失败: {e}")
             return pd.DataFrame()
     
-    def filter_jobs(self, jobs_df, keywords=None, exclude_keywords=None, 
+    def filter_jobs(self, jobs_df, keywords=None, exclude_keywords=None,
                    min_salary=None, max_salary=None, companies=None,
-                   locations=None, job_types=None):
+                   locations=None, job_types=None, radius_km=None, remote_only=False):
         """过滤工作结果
         
         Args:
             jobs_df: 工作结果DataFrame
             keywords: 包含的关键词列表
             exclude_keywords: 排除的关键词列表
-            min_salary: 最低薪资
-            max_salary: 最高薪资
+            min_salary: 最低年薪（基准货币，与按INTERVAL和CURRENCY换算后的年薪比较）
+            max_salary: 最高年薪（基准货币）
             companies: 公司列表
-            locations: 位置列表
+            locations: 位置列表（如"Shanghai"、"上海"、"Cambridge, MA"、"Remote"）
             job_types: 工作类型列表
-            
+            radius_km: 位置范围（公里），为None时只匹配位置本身
+            remote_only: 只保留远程职位
+        
         Returns:
             DataFrame: 过滤后的工作结果
         """
-        filtered_df = jobs_df.copy()
-        
-        # 关键词过滤
-        if keywords:
-            keyword_filters = []
-            for keyword in keywords:
-                # 在标题、公司名称和描述中搜索关键词
-                title_filter = filtered_df['TITLE'].str.contains(keyword, case=False, na=False)
-                company_filter = filtered_df['COMPANY'].str.contains(keyword, case=False, na=False)
-                desc_filter = filtered_df['DESCRIPTION'].str.contains(keyword, case=False, na=False)
-                keyword_filters.append(title_filter | company_filter | desc_filter)
-            
-            if keyword_filters:
-                combined_filter = keyword_filters[0]
-                for f in keyword_filters[1:]:
-                    combined_filter = combined_filter & f
-                filtered_df = filtered_df[combined_filter]
-        
-        # 排除关键词
-        if exclude_keywords:
-            for keyword in exclude_keywords:
-                # 排除标题、公司名称和描述中包含关键词的结果
-                title_filter = ~filtered_df['TITLE'].str.contains(keyword, case=False, na=False)
-                company_filter = ~filtered_df['COMPANY'].str.contains(keyword, case=False, na=False)
-                desc_filter = ~filtered_df['DESCRIPTION'].str.contains(keyword, case=False, na=False)
-                filtered_df = filtered_df[title_filter & company_filter & desc_filter]
-        
-        # 薪资过滤
-        if min_salary is not None and 'MAX_AMOUNT' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['MAX_AMOUNT'] >= min_salary]
-        
-        if max_salary is not None and 'MIN_AMOUNT' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['MIN_AMOUNT'] <= max_salary]
+        # 薪资和位置过滤（用年薪索引和地理索引查找，先过滤可以减少后面逐行检查的数量）
+        selected = np.ones(len(jobs_df), dtype=bool)
+        if (min_salary is not None or max_salary is not None) and has_salary(jobs_df):
+            selected &= salary_index(jobs_df).mask(min_salary, max_salary)
+        if locations or remote_only:
+            selected &= location_mask(jobs_df, locations, radius_km, remote_only)
+        filtered_df = jobs_df[selected].copy()
         
         # 公司过滤
         if companies:
             company_filter = filtered_df['COMPANY'].isin(companies)
             filtered_df = filtered_df[company_filter]
         
-        # 位置过滤
-        if locations:
-            location_filters = []
-            for location in locations:
-                city_filter = filtered_df['CITY'].str.contains(location, case=False, na=False)
-                state_filter = filtered_df['STATE'].str.contains(location, case=False, na=False)
-                location_filters.append(city_filter | state_filter)
-            
-            if location_filters:
-                combined_filter = location_filters[0]
-                for f in location_filters[1:]:
-                    combined_filter = combined_filter | f
-                filtered_df = filtered_df[combined_filter]
-        
         # 工作类型过滤
         if job_types and 'JOB_TYPE' in filtered_df.columns:
             job_type_filter = filtered_df['JOB_TYPE'].isin(job_types)
             filtered_df = filtered_df[job_type_filter]
         
+        # 关键词过滤：在其他条件之后进行，描述只为剩下的职位从描述库读取一次，所有关键词共用
+        if keywords or exclude_keywords:
+            descriptions = job_descriptions(filtered_df)
+            combined_filter = pd.Series(True, index=filtered_df.index)
+            
+            def contains(keyword):
+                # 在标题、公司名称和描述中搜索关键词
+                return (filtered_df['TITLE'].str.contains(keyword, case=False, na=False)
+                        | filtered_df['COMPANY'].str.contains(keyword, case=False, na=False)
+                        | descriptions.str.contains(keyword, case=False, na=False))
+            
+            for keyword in keywords or []:
+                combined_filter &= contains(keyword)
+            
+            # 排除标题、公司名称和描述中包含关键词的结果
+            for keyword in exclude_keywords or []:
+                combined_filter &= ~contains(keyword)
+            filtered_df = filtered_df[combined_filter]
+        
         return filtered_df
     
     def extract_skills_from_jobs(self, jobs_df, top_n=20):
@@ -253,44 +260,11 @@ class JobSearchSystem:
         Args:
             jobs_df: 工作结果DataFrame
             top_n: 返回的技能数量
-            
+        
         Returns:
             dict: 技能及其出现频率
         """
-        # 常见技能关键词列表
-        common_skills = [
-            "python", "java", "javascript", "c++", "c#", "ruby", "php", "swift", "kotlin", 
-            "golang", "rust", "typescript", "scala", "r", "matlab", "sql", "nosql", "mongodb", 
-            "postgresql", "mysql", "oracle", "aws", "azure", "gcp", "docker", "kubernetes", 
-            "jenkins", "git", "github", "gitlab", "ci/cd", "agile", "scrum", "kanban", 
-            "jira", "confluence", "react", "angular", "vue", "node.js", "django", "flask", 
-            "spring", "hibernate", "asp.net", "laravel", "tensorflow", "pytorch", "keras", 
-            "scikit-learn", "pandas", "numpy", "hadoop", "spark", "kafka", "redis", "elasticsearch",
-            "ai", "machine learning", "deep learning", "nlp", "computer vision", "data science",
-            "big data", "data analysis", "data visualization", "tableau", "power bi", "excel",
-            "product management", "project management", "ux/ui", "figma", "sketch", "adobe xd",
-            "photoshop", "illustrator", "indesign", "after effects", "premiere pro",
-            "devops", "sre", "security", "networking", "linux", "windows", "macos",
-            "rest api", "graphql", "soap", "microservices", "serverless", "blockchain",
-            "ios", "android", "mobile", "web", "frontend", "backend", "fullstack"
-        ]
-        
-        # 初始化技能计数器
-        skill_counts = {skill: 0 for skill in common_skills}
-        
-        # 遍历工作描述，计算技能出现次数
-        for desc in jobs_df['DESCRIPTION'].dropna():
-            desc_lower = desc.lower()
-            for skill in common_skills:
-                if skill in desc_lower:
-                    skill_counts[skill] += 1
-        
-        # 过滤掉未出现的技能，并按出现次数排序
-        skill_counts = {k: v for k, v in skill_counts.items() if v > 0}
-        sorted_skills = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        # 返回出现频率最高的技能
-        return dict(sorted_skills[:top_n])
+        return count_skills(jobs_df, top_n=top_n)
     
     def generate_job_search_report(self, jobs_df, output_file=None):
         """生成工作搜索报告
@@ -298,73 +272,11 @@ class JobSearchSystem:
         Args:
             jobs_df: 工作结果DataFrame
             output_file: 输出文件路径，默认为None（返回报告文本）
-            
+        
         Returns:
             str: 报告文本（如果output_file为None）
         """
-        if jobs_df.empty:
-            report = "# 工作搜索报告\n\n**没有找到匹配的工作**"
-            if output_file:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(report)
-            return report
-        
-        # 计算基本统计信息
-        job_count = len(jobs_df)
-        site_counts = jobs_df['SITE'].value_counts().to_dict()
-        company_counts = jobs_df['COMPANY'].value_counts().head(10).to_dict()
-        location_counts = jobs_df['CITY'].value_counts().head(10).to_dict()
-        
-        # 提取常见技能
-        skills = self.extract_skills_from_jobs(jobs_df)
-        
-        # 生成报告
-        report = f"""# 工作搜索报告
-
-## 概述
-- **总工作数量**: {job_count}
-- **搜索时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
-## 来源网站分布
-"""
-        
-        for site, count in site_counts.items():
-            report += f"- **{site}**: {count} ({count/job_count*100:.1f}%)\n"
-        
-        report += "\n## 热门公司\n"
-        for company, count in company_counts.items():
-            report += f"- **{company}**: {count} 个职位\n"
-        
-        report += "\n## 热门地区\n"
-        for location, count in location_counts.items():
-            report += f"- **{location}**: {count} 个职位\n"
-        
-        report += "\n## 常见技能需求\n"
-        for skill, count in skills.items():
-            report += f"- **{skill}**: 出现在 {count} 个职位描述中 ({count/job_count*100:.1f}%)\n"
-        
-        report += "\n## 示例职位\n"
-        # 选择前5个职位作为示例
-        for i, (_, job) in enumerate(jobs_df.head(5).iterrows()):
-            report += f"""
-### {i+1}. {job['TITLE']} - {job['COMPANY']}
-- **位置**: {job['CITY']}, {job['STATE']}
-- **来源**: {job['SITE']}
-- **链接**: {job['JOB_URL']}
-"""
-            # 添加薪资信息（如果有）
-            if pd.notna(job.get('MIN_AMOUNT')) or pd.notna(job.get('MAX_AMOUNT')):
-                min_amount = job.get('MIN_AMOUNT', 'N/A')
-                max_amount = job.get('MAX_AMOUNT', 'N/A')
-                interval = job.get('INTERVAL', 'yearly')
-                report += f"- **薪资**: {min_amount} - {max_amount} ({interval})\n"
-        
-        # 保存报告（如果指定了输出文件）
-        if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report)
-        
-        return report
+        return get_report_engine().search_report(jobs_df, output_file)
 
 # 测试代码
 if __name__ == "__main__":
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 嵌入式数据存储
+用一个SQLite数据库（WAL模式）保存搜索、匹配、求职信和申请历史以及助手配置、定时任务和界面会话，追加记录只写入新行，常用查询走索引
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import weakref
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# 历史记录类型及对应的旧JSON文件
+HISTORY_FILES = {
+    "search": "search_history.json",
+    "matching": "matching_history.json",
+    "cover_letter": "cover_letter_history.json",
+    "application": "application_history.json"
+}
+
+CONFIG_FILE = "assistant_config.json"
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    created_at TEXT,
+    status TEXT,
+    job_url TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_kind ON history (kind, id);
+CREATE INDEX IF NOT EXISTS idx_history_status ON history (kind, status, id);
+CREATE INDEX IF NOT EXISTS idx_history_job_url ON history (kind, job_url);
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+"""
+
+def encode(value):
+    """把记录编码为JSON文本"""
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+def index_columns(record):
+    """提取记录中需要建立索引的字段
+    
+    Args:
+        record: 历史记录字典
+    
+    Returns:
+        tuple: (created_at, status, job_url)
+    """
+    created_at = record.get("timestamp")
+    status = record.get("status")
+    job_url = record.get("job_url")
+    return (
+        str(created_at) if created_at is not None else None,
+        str(status) if status is not None else None,
+        str(job_url) if job_url is not None else None
+    )
+
+class JobStore:
+    """嵌入式数据存储类，所有模块共用一个数据库连接"""
+    
+    def __init__(self, db_file):
+        """初始化数据存储
+        
+        Args:
+            db_file: SQLite数据库文件路径
+        """
+        self.db_file = db_file
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(STORE_SCHEMA)
+        self.tables = {}
+    
+    def flush(self):
+        """写入所有历史记录表中缓冲的记录"""
+        with self.lock:
+            for table in self.tables.values():
+                table.flush()
+    
+    def close(self):
+        """写入所有缓冲的记录并关闭数据库连接"""
+        with self.lock:
+            self.flush()
+            self.conn.close()
+    
+    def transaction(self, func):
+        """在写事务中执行函数
+        
+        Args:
+            func: 参数为连接的函数
+        
+        Returns:
+            函数的返回值
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = func(self.conn)
+                self.conn.execute("COMMIT")
+                return value
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+    
+    def query(self, sql, params=()):
+        """执行只读查询
+        
+        Returns:
+            list: 结果行列表
+        """
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def history(self, kind):
+        """获取某类历史记录的表对象，同一类型返回同一个对象
+        
+        Args:
+            kind: 历史记录类型，如search、matching、cover_letter、application
+        
+        Returns:
+            HistoryTable: 历史记录表
+        """
+        with self.lock:
+            if kind not in self.tables:
+                self.tables[kind] = HistoryTable(self, kind)
+            return self.tables[kind]
+    
+    def load_config(self):
+        """读取助手配置
+        
+        Returns:
+            dict: 配置字典
+        """
+        return {row["key"]: json.loads(row["value"]) for row in self.query("SELECT key, value FROM config")}
+    
+    def save_config(self, config, removed=()):
+        """保存助手配置
+        
+        Args:
+            config: 需要写入的配置项
+            removed: 需要删除的配置键
+        """
+        def write(conn):
+            conn.executemany(
+                "INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(key, encode(value)) for key, value in config.items()]
+            )
+            conn.executemany("DELETE FROM config WHERE key = ?", [(key,) for key in removed])
+        self.transaction(write)
+    
+    def load_schedules(self):
+        """读取定时任务及其运行状态
+        
+        Returns:
+            dict: 定时任务ID到定时任务字典的映射
+        """
+        return {row["id"]: json.loads(row["data"]) for row in self.query("SELECT id, data FROM schedules")}
+    
+    def save_schedule(self, schedule):
+        """保存一个定时任务（定义和运行状态）
+        
+        Args:
+            schedule: 定时任务字典，必须包含id
+        """
+        self.transaction(lambda conn: conn.execute(
+            "INSERT INTO schedules (id, data) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (schedule["id"], encode(schedule))
+        ))
+    
+    def delete_schedule(self, schedule_id):
+        """删除定时任务"""
+        self.transaction(lambda conn: conn.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,)))
+    
+    def load_session(self, session_id):
+        """读取界面会话保存的值（当前简历、工作数据和匹配结果文件等）
+        
+        Args:
+            session_id: 会话ID
+        
+        Returns:
+            dict: 会话的值，没有保存过时返回None
+        """
+        rows = self.query("SELECT data FROM sessions WHERE id = ?", (session_id,))
+        return json.loads(rows[0]["data"]) if rows else None
+    
+    def save_session(self, session_id, values):
+        """保存界面会话的值，同一数据库的所有应用进程都能读到
+        
+        Args:
+            session_id: 会话ID
+            values: 会话的值
+        """
+        self.transaction(lambda conn: conn.execute(
+            "INSERT INTO sessions (id, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (session_id, encode(values), time.time())
+        ))
+    
+    def delete_sessions(self, before, keep=()):
+        """删除在某个时间之前最后保存的会话
+        
+        Args:
+            before: 时间戳
+            keep: 不删除的会话ID
+        
+        Returns:
+            int: 删除的会话数
+        """
+        keep = list(keep)
+        sql = "DELETE FROM sessions WHERE updated_at < ?"
+        if keep:
+            sql += f" AND id NOT IN ({', '.join('?' * len(keep))})"
+        return self.transaction(lambda conn: conn.execute(sql, [before] + keep).rowcount)
+    
+    def import_json(self, data_dir, rename=True):
+        """把旧的JSON历史文件和配置文件导入数据库
+        
+        只导入数据库中还没有记录的类型，导入后把原文件重命名为*.imported
+        
+        Args:
+            data_dir: JSON文件所在目录
+            rename: 导入后是否重命名原文件
+        
+        Returns:
+            dict: 每个文件导入的记录数量
+        """
+        imported = {}
+        for kind, file_name in HISTORY_FILES.items():
+            path = os.path.join(data_dir, file_name)
+            if not os.path.exists(path):
+                continue
+            table = self.history(kind)
+            if len(table):
+                print(f"跳过 {file_name}：数据库中已有{kind}记录")
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+            except Exception as e:
+                print(f"读取 {file_name} 失败: {e}")
+                continue
+            table.extend(record for record in records if isinstance(record, dict))
+            table.flush()
+            imported[file_name] = len(records)
+            if rename:
+                os.replace(path, path + ".imported")
+        
+        path = os.path.join(data_dir, CONFIG_FILE)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                existing = self.load_config()
+                self.save_config({key: value for key, value in config.items() if key not in existing})
+                imported[CONFIG_FILE] = len(config)
+                if rename:
+                    os.replace(path, path + ".imported")
+            except Exception as e:
+                print(f"导入 {CONFIG_FILE} 失败: {e}")
+        return imported
+
+class HistoryRecord(dict):
+    """从数据库读取的历史记录字典，可以被弱引用"""
+
+class HistoryTable:
+    """历史记录表，提供与列表相近的接口
+    
+    append只把记录放入缓冲区，flush时在一个事务中批量写入；
+    读取的记录在仍被使用时会被缓存（弱引用），修改已保存的记录后调用update标记，下次flush时写回
+    """
+    
+    def __init__(self, store, kind, batch_size=100, max_appended=1000):
+        """初始化历史记录表
+        
+        Args:
+            store: JobStore实例
+            kind: 历史记录类型
+            batch_size: 缓冲区达到该数量时自动写入
+            max_appended: 写入后仍保留的追加记录数量（追加的普通字典不能弱引用，只保留最近的记录）
+        """
+        self.store = store
+        self.kind = kind
+        self.batch_size = batch_size
+        self.max_appended = max_appended
+        self.pending = []
+        self.dirty = {}
+        self.records = weakref.WeakValueDictionary()
+        self.appended = OrderedDict()
+        self.ids = {}
+        self.local = threading.local()
+    
+    def append(self, record):
+        """追加一条记录
+        
+        Args:
+            record: 记录字典
+        """
+        with self.store.lock:
+            self.pending.append(record)
+            for captured in getattr(self.local, "captures", ()):
+                captured.append(record)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+    
+    @contextmanager
+    def capture(self):
+        """收集当前线程在with块内追加的记录，其他线程同时追加的记录不包含在内
+        
+        Yields:
+            list: 追加的记录字典
+        """
+        records = []
+        captures = getattr(self.local, "captures", None)
+        if captures is None:
+            captures = self.local.captures = []
+        captures.append(records)
+        try:
+            yield records
+        finally:
+            captures.remove(records)
+    
+    def extend(self, records):
+        """追加多条记录"""
+        for record in records:
+            self.append(record)
+    
+    def update(self, *records):
+        """标记已保存的记录被修改，下次flush时写回
+        
+        Args:
+            *records: 通过本表读取的记录字典
+        """
+        with self.store.lock:
+            for record in records:
+                row_id = self.ids.get(id(record))
+                if row_id is not None:
+                    self.dirty[row_id] = record
+    
+    def flush(self):
+        """在一个事务中写入缓冲的新记录和被修改的记录"""
+        with self.store.lock:
+            if not self.pending and not self.dirty:
+                return
+            pending, dirty = self.pending, self.dirty
+            
+            def write(conn):
+                inserted = []
+                for record in pending:
+                    cursor = conn.execute(
+                        "INSERT INTO history (kind, created_at, status, job_url, data) VALUES (?, ?, ?, ?, ?)",
+                        (self.kind, *index_columns(record), encode(record))
+                    )
+                    inserted.append((cursor.lastrowid, record))
+                conn.executemany(
+                    "UPDATE history SET created_at = ?, status = ?, job_url = ?, data = ? WHERE id = ?",
+                    [(*index_columns(record), encode(record), row_id) for row_id, record in dirty.items()]
+                )
+                return inserted
+            
+            inserted = self.store.transaction(write)
+            self.pending = []
+            self.dirty = {}
+            for row_id, record in inserted:
+                self.remember(row_id, record)
+    
+    def remember(self, row_id, record):
+        """缓存记录对象，使同一行在仍被使用时每次读取都返回同一个字典
+        
+        读取的记录只保留弱引用，不再使用后自动释放；追加的记录只保留最近max_appended条
+        """
+        if isinstance(record, HistoryRecord):
+            self.records[row_id] = record
+            weakref.finalize(record, self.ids.pop, id(record), None)
+        else:
+            self.appended[row_id] = record
+            while len(self.appended) > self.max_appended:
+                _, old = self.appended.popitem(last=False)
+                self.ids.pop(id(old), None)
+        self.ids[id(record)] = row_id
+        return record
+    
+    def rows_to_records(self, rows):
+        """把数据库行转换为记录字典，已缓存的行返回缓存的对象"""
+        records = []
+        for row in rows:
+            record = self.records.get(row["id"])
+            if record is None:
+                record = self.appended.get(row["id"])
+            if record is None:
+                record = self.remember(row["id"], HistoryRecord(json.loads(row["data"])))
+            records.append(record)
+        return records
+    
+    def select(self, where="", params=(), order="ASC", limit=None, offset=0):
+        """按条件读取记录
+        
+        Args:
+            where: 额外的SQL条件（以AND连接）
+            params: 条件参数
+            order: 按写入顺序排序的方向，ASC或DESC
+            limit: 数量上限
+            offset: 跳过的数量
+        
+        Returns:
+            list: 记录字典列表
+        """
+        self.flush()
+        sql = f"SELECT id, data FROM history WHERE kind = ? {where} ORDER BY id {order}"
+        params = (self.kind, *params)
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += (limit, offset)
+        return self.rows_to_records(self.store.query(sql, params))
+    
+    def recent(self, limit=10):
+        """获取最近的记录，按写入顺序从旧到新排列
+        
+        Args:
+            limit: 数量上限
+        
+        Returns:
+            list: 记录字典列表
+        """
+        return list(reversed(self.select(order="DESC", limit=limit)))
+    
+    def by_status(self, status, limit=None):
+        """按状态读取记录（使用索引）
+        
+        Args:
+            status: 状态
+            limit: 数量上限
+        
+        Returns:
+            list: 记录字典列表
+        """
+        return self.select("AND status = ?", (status,), limit=limit)
+    
+    def excluding_status(self, statuses, limit=None):
+        """读取状态不在statuses中的记录（使用状态索引，已排除的记录不读取和解析）
+        
+        Args:
+            statuses: 排除的状态
+            limit: 数量上限
+        
+        Returns:
+            list: 记录字典列表
+        """
+        statuses = list(statuses)
+        if not statuses:
+            return self.select(limit=limit)
+        return self.select(f"AND (status IS NULL OR status NOT IN ({', '.join('?' * len(statuses))}))",
+                           statuses, limit=limit)
+    
+    def by_job_url(self, job_url):
+        """按工作URL读取记录（使用索引）
+        
+        Args:
+            job_url: 工作URL
+        
+        Returns:
+            list: 记录字典列表
+        """
+        return self.select("AND job_url = ?", (job_url,))
+    
+    def count_by_status(self):
+        """统计各状态的记录数量
+        
+        Returns:
+            dict: 状态到数量的映射，没有状态的记录计入None
+        """
+        self.flush()
+        rows = self.store.query(
+            "SELECT status, COUNT(*) AS count FROM history WHERE kind = ? GROUP BY status", (self.kind,)
+        )
+        return {row["status"]: row["count"] for row in rows}
+    
+    def __len__(self):
+        with self.store.lock:
+            count = self.store.query("SELECT COUNT(*) AS count FROM history WHERE kind = ?", (self.kind,))[0]["count"]
+            return count + len(self.pending)
+    
+    def __bool__(self):
+        return len(self) > 0
+    
+    def __iter__(self):
+        return iter(self.select())
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.select()[index]
+            return self.select(limit=max(0, stop - start), offset=start)
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("history index out of range")
+        return self.select(limit=1, offset=index)[0]
+
+# 每个数据目录共用一个存储实例
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(data_dir, db_name="assistant.db"):
+    """获取数据目录对应的共享数据存储，首次打开时自动导入旧的JSON文件
+    
+    Args:
+        data_dir: 数据存储目录
+        db_name: 数据库文件名
+    
+    Returns:
+        JobStore: 数据存储
+    """
+    db_file = os.path.abspath(os.path.join(data_dir, db_name))
+    with _stores_lock:
+        store = _stores.get(db_file)
+        if store is None:
+            if not os.path.exists(data_dir):
+                os.makedirs(data_dir)
+            store = JobStore(db_file)
+            imported = store.import_json(data_dir)
+            if imported:
+                print(f"已把旧的JSON数据导入数据库: {imported}")
+            _stores[db_file] = store
+        return store
+
+# 导入工具
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "/home/ubuntu/job_data"
+    keep = "--keep" in sys.argv
+    store = JobStore(os.path.join(data_dir, "assistant.db"))
+    imported = store.import_json(data_dir, rename=not keep)
+    for file_name, count in imported.items():
+        print(f"{file_name}: 导入 {count} 条记录")
+    if not imported:
+        print("没有需要导入的文件")
+    for kind in HISTORY_FILES:
+        print(f"{kind}: 共 {len(store.history(kind))} 条记录")
+    store.close()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 指标和调用跟踪
+各子系统在关键路径上记录span（每个网站的抓取、特征提取、模板渲染、浏览器步骤等），
+耗时汇总为直方图，次数汇总为计数器，通过Prometheus格式的HTTP接口（/metrics）和本地JSON日志查看
+"""
+
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+import contextvars
+from functools import wraps
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 耗时直方图的默认分桶（秒），覆盖从毫秒级的文本处理到分钟级的浏览器申请
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# span耗时直方图和错误计数器的名称
+SPAN_SECONDS = "job_assistant_span_seconds"
+SPAN_ERRORS = "job_assistant_span_errors_total"
+
+# 当前正在执行的span，子span记录它的ID作为父span
+CURRENT_SPAN = contextvars.ContextVar("job_assistant_span", default=None)
+
+def label_key(labels):
+    """把标签字典转换为可以作为字典键的元组"""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def format_labels(key, extra=None):
+    """格式化Prometheus标签"""
+    pairs = list(key) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = [(name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+class Counter:
+    """计数器，按标签分别累加"""
+    
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def inc(self, amount=1, **labels):
+        """增加计数"""
+        key = label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def render(self):
+        """生成Prometheus文本格式的行"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(key)} {value}")
+        return lines
+    
+    def snapshot(self):
+        """获取所有计数"""
+        with self.lock:
+            return [{"labels": dict(key), "value": value} for key, value in sorted(self.values.items())]
+
+class Histogram:
+    """直方图，按标签分别统计分桶计数、总和和次数"""
+    
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def observe(self, value, **labels):
+        """记录一个观测值"""
+        key = label_key(labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self.values[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+    
+    def render(self):
+        """生成Prometheus文本格式的行（分桶计数为累计值）"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, series in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{format_labels(key, [('le', repr(bound))])} {cumulative}")
+                lines.append(f"{self.name}_bucket{format_labels(key, [('le', '+Inf')])} {series['count']}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{format_labels(key)} {series['count']}")
+        return lines
+    
+    def snapshot(self):
+        """获取各标签的次数、总和和平均值"""
+        with self.lock:
+            return [{"labels": dict(key), "count": series["count"], "sum": round(series["sum"], 6),
+                     "mean": round(series["sum"] / series["count"], 6) if series["count"] else 0.0}
+                    for key, series in sorted(self.values.items())]
+
+class MetricsRegistry:
+    """指标注册表，同名指标只创建一次"""
+    
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+    
+    def counter(self, name, help=""):
+        """获取或创建计数器"""
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Counter(name, help)
+            return self.metrics[name]
+    
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS):
+        """获取或创建直方图"""
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Histogram(name, help, buckets)
+            return self.metrics[name]
+    
+    def render(self):
+        """生成Prometheus文本格式的所有指标"""
+        with self.lock:
+            metrics = [self.metrics[name] for name in sorted(self.metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self):
+        """获取所有指标的JSON可序列化快照"""
+        with self.lock:
+            metrics = dict(self.metrics)
+        return {name: {"type": type(metric).__name__.lower(), "help": metric.help, "series": metric.snapshot()}
+                for name, metric in sorted(metrics.items())}
+
+class SpanLog:
+    """span的本地JSON日志，由后台线程写入，队列已满时丢弃记录而不是阻塞调用方"""
+    
+    def __init__(self, log_file, max_bytes=50 * 1024 * 1024, max_pending=10000):
+        """初始化日志
+        
+        Args:
+            log_file: 日志文件路径（每行一个JSON对象）
+            max_bytes: 日志文件超过该大小时改名为.1并重新开始
+            max_pending: 等待写入的记录上限
+        """
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        self.thread = threading.Thread(target=self.worker, name="span-log", daemon=True)
+        self.thread.start()
+    
+    def write(self, record):
+        """加入一条记录"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+    
+    def worker(self):
+        """后台写入线程，每次把队列中已有的记录一起写入"""
+        while True:
+            records = [self.queue.get()]
+            while True:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in records
+            records = [record for record in records if record is not None]
+            try:
+                if os.path.exists(self.log_file) and os.path.getsize(self.log_file) > self.max_bytes:
+                    os.replace(self.log_file, self.log_file + ".1")
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                print(f"写入指标日志失败: {e}")
+            if stop:
+                return
+    
+    def close(self):
+        """写入剩余记录并停止后台线程"""
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+# 进程内共用的注册表和日志
+REGISTRY = MetricsRegistry()
+SPAN_LOG = None
+LOG_MIN_SECONDS = 0.0
+
+def configure(log_file=None, log_min_seconds=0.0):
+    """设置span日志
+    
+    Args:
+        log_file: JSON日志文件路径，为None时不写日志
+        log_min_seconds: 只记录耗时不少于该值的span（出错的span总是记录），用于减少逐条处理时的日志量
+    """
+    global SPAN_LOG, LOG_MIN_SECONDS
+    if SPAN_LOG is not None:
+        SPAN_LOG.close()
+    SPAN_LOG = SpanLog(log_file) if log_file else None
+    LOG_MIN_SECONDS = log_min_seconds
+
+def inc(name, amount=1, help="", **labels):
+    """增加计数器
+    
+    Args:
+        name: 指标名称
+        amount: 增加的数量
+        help: 指标说明
+        **labels: 标签
+    """
+    REGISTRY.counter(name, help).inc(amount, **labels)
+
+def observe(name, value, help="", **labels):
+    """记录直方图观测值"""
+    REGISTRY.histogram(name, help).observe(value, **labels)
+
+@contextmanager
+def span(name, **labels):
+    """记录一段代码的耗时
+    
+    用法:
+        with span("scrape", site="linkedin") as current:
+            ...
+            current["rows"] = len(jobs_df)
+    
+    Args:
+        name: span名称
+        **labels: 标签（取值种类应当有限，如网站、步骤名称）
+    
+    Yields:
+        dict: span记录，可以添加属性，属性只写入日志
+    """
+    parent = CURRENT_SPAN.get()
+    record = {
+        "span": name,
+        "span_id": uuid.uuid4().hex[:16],
+        "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "labels": labels,
+        "start": time.time()
+    }
+    token = CURRENT_SPAN.set(record)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield record
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        CURRENT_SPAN.reset(token)
+        REGISTRY.histogram(SPAN_SECONDS, "代码段耗时（秒）").observe(duration, span=name, **labels)
+        if error is not None:
+            REGISTRY.counter(SPAN_ERRORS, "出错的代码段次数").inc(span=name, error=type(error).__name__, **labels)
+            record["error"] = f"{type(error).__name__}: {error}"
+        if SPAN_LOG is not None and (error is not None or duration >= LOG_MIN_SECONDS):
+            record["duration_ms"] = round(duration * 1000, 3)
+            SPAN_LOG.write(record)
+
+def traced(name=None, **labels):
+    """把函数的每次调用记录为span的装饰器
+    
+    Args:
+        name: span名称，默认为函数的限定名
+        **labels: 标签
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """指标接口的请求处理类"""
+    
+    def log_message(self, format, *args):
+        """不输出访问日志"""
+        pass
+    
+    def do_GET(self):
+        """/metrics返回Prometheus文本格式，/metrics.json返回JSON"""
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(REGISTRY.snapshot(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        elif self.path.startswith("/metrics"):
+            body = REGISTRY.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """在后台线程中启动指标接口
+    
+    Args:
+        port: 端口
+        host: 监听地址，默认只允许本机访问
+    
+    Returns:
+        ThreadingHTTPServer: 服务器，启动失败时返回None
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    except OSError as e:
+        print(f"启动指标接口失败: {e}")
+        return None
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    print(f"指标接口: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+# 测试代码
+if __name__ == "__main__":
+    import tempfile
+    import urllib.request
+    
+    log_file = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+    configure(log_file)
+    server = start_metrics_server(0)
+    
+    @traced("render_template", template="standard")
+    def render():
+        time.sleep(0.01)
+    
+    with span("search", term="python"):
+        for site in ["linkedin", "indeed"]:
+            with span("scrape", site=site) as current:
+                time.sleep(0.02)
+                current["rows"] = 25
+                inc("job_assistant_jobs_scraped_total", 25, "抓取到的职位数", site=site)
+        render()
+    try:
+        with span("browser_step", step="submit"):
+            raise TimeoutError("提交按钮没有出现")
+    except TimeoutError:
+        pass
+    
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    text = urllib.request.urlopen(url).read().decode("utf-8")
+    print("\n".join(line for line in text.splitlines() if "_count" in line or "_total" in line))
+    SPAN_LOG.close()
+    with open(log_file, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            print(f"{record['span']:<16} {record['duration_ms']:>8.1f} ms  父span {record['parent_id']}  {record.get('error', '')}")
+    server.shutdown()
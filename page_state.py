@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 页面状态探测
+在浏览器内通过一次脚本调用判断所有页面标记，只返回精简的结果字典，避免反复传输完整的页面源码
+"""
+
+# 在浏览器中执行的探测脚本，arguments[0]为标记定义
+PAGE_STATE_SCRIPT = """
+var markers = arguments[0];
+var root = document.documentElement;
+var source = root ? root.outerHTML : '';
+var lowered = null;
+var state = {};
+for (var name in markers) {
+    var marker = markers[name];
+    var haystack = source;
+    if (marker.case_insensitive) {
+        if (lowered === null) { lowered = source.toLowerCase(); }
+        haystack = lowered;
+    }
+    var found = false;
+    for (var i = 0; i < marker.texts.length; i++) {
+        if (haystack.indexOf(marker.texts[i]) !== -1) { found = true; break; }
+    }
+    state[name] = found;
+}
+state.ready_state = document.readyState;
+state.url = window.location.href;
+return state;
+"""
+
+class PageStateProbe:
+    """页面状态探测类，一次脚本调用返回所有标记，并在同一次导航内缓存结果"""
+    
+    def __init__(self, driver, markers):
+        """初始化页面状态探测
+        
+        Args:
+            driver: WebDriver实例
+            markers: 标记定义，格式为{名称: [文字, ...]}或{名称: {"texts": [...], "case_insensitive": bool}}
+        """
+        self.driver = driver
+        self.markers = {}
+        for name, spec in markers.items():
+            if isinstance(spec, dict):
+                texts = spec["texts"]
+                case_insensitive = spec.get("case_insensitive", False)
+            else:
+                texts = spec
+                case_insensitive = False
+            if case_insensitive:
+                texts = [text.lower() for text in texts]
+            self.markers[name] = {"texts": list(texts), "case_insensitive": case_insensitive}
+        self.cached_state = None
+        self.script_calls = 0
+        self.cache_hits = 0
+    
+    def state(self, refresh=False):
+        """获取页面状态
+        
+        Args:
+            refresh: 是否忽略缓存重新探测，等待页面内异步渲染时应为True
+        
+        Returns:
+            dict: 标记名称到是否出现的映射，另含ready_state和url
+        """
+        if self.cached_state is not None and not refresh:
+            self.cache_hits += 1
+            return self.cached_state
+        
+        self.script_calls += 1
+        state = self.driver.execute_script(PAGE_STATE_SCRIPT, self.markers) or {}
+        self.cached_state = state
+        return state
+    
+    def invalidate(self):
+        """使缓存失效，在导航或点击等会改变页面的操作之后调用"""
+        self.cached_state = None
+    
+    def navigate(self, url):
+        """访问新页面并使缓存失效
+        
+        Args:
+            url: 页面URL
+        """
+        self.driver.get(url)
+        self.invalidate()
+    
+    def stats(self):
+        """获取探测统计
+        
+        Returns:
+            dict: 脚本调用次数和缓存命中次数
+        """
+        return {"probe_calls": self.script_calls, "probe_cache_hits": self.cache_hits}
+    
+    def reset_stats(self):
+        """重置探测统计"""
+        self.script_calls = 0
+        self.cache_hits = 0
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 采样性能分析
+后台线程按固定间隔读取被分析线程的调用栈并计数，不修改被分析的代码，开销很低，可以在生产环境中对单次操作开启；
+结果保存为折叠调用栈格式（每行"函数;函数;函数 次数"），可以直接用flamegraph.pl、speedscope或inferno生成火焰图
+"""
+
+import os
+import sys
+import time
+import threading
+
+class SamplingProfiler:
+    """采样性能分析类"""
+    
+    def __init__(self, interval=0.005, max_depth=128, output_file=None):
+        """初始化性能分析
+        
+        Args:
+            interval: 采样间隔（秒）
+            max_depth: 每个调用栈最多记录的层数
+            output_file: 折叠调用栈的默认输出文件路径
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.output_file = output_file
+        self.stacks = {}
+        self.samples = 0
+        self.thread_ids = set()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started_at = None
+        self.elapsed = 0.0
+    
+    def start(self, thread_id=None):
+        """开始采样
+        
+        Args:
+            thread_id: 被分析的线程ID，默认为调用start的线程
+        """
+        self.thread_ids = {thread_id or threading.get_ident()}
+        self.stop_event.clear()
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+    
+    def add_thread(self, thread_id=None):
+        """把一个线程加入分析，只分析本次操作自己的线程，其他请求的线程不计入结果
+        
+        可以作为ThreadPoolExecutor的initializer，使操作创建的工作线程启动时加入分析
+        
+        Args:
+            thread_id: 线程ID，默认为调用add_thread的线程
+        """
+        self.thread_ids.add(thread_id or threading.get_ident())
+    
+    def stop(self):
+        """停止采样"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.elapsed = time.perf_counter() - self.started_at
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+    
+    def run(self):
+        """采样线程"""
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id != own_id and thread_id in self.thread_ids:
+                    self.record(frame)
+    
+    def record(self, frame):
+        """记录一个调用栈"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack = ";".join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+    
+    def write_folded(self, output_file=None):
+        """保存折叠调用栈格式的结果
+        
+        Args:
+            output_file: 输出文件路径，默认为初始化时指定的路径
+        
+        Returns:
+            str: 输出文件路径
+        """
+        output_file = output_file or self.output_file
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+        return output_file
+    
+    def top_functions(self, limit=10):
+        """按采样次数列出耗时最多的函数
+        
+        Args:
+            limit: 返回的函数数量
+        
+        Returns:
+            list: (函数, 自身采样次数, 包含子调用的采样次数)列表，按自身采样次数排列
+        """
+        own = {}
+        total = {}
+        for stack, count in self.stacks.items():
+            names = stack.split(";")
+            own[names[-1]] = own.get(names[-1], 0) + count
+            for name in set(names):
+                total[name] = total.get(name, 0) + count
+        ranked = sorted(own.items(), key=lambda item: -item[1])[:limit]
+        return [(name, count, total[name]) for name, count in ranked]
+    
+    def summary(self, limit=10):
+        """生成文本摘要"""
+        lines = [f"采样 {self.samples} 次，耗时 {self.elapsed:.2f} 秒，间隔 {self.interval * 1000:.0f} 毫秒"]
+        for name, own_count, total_count in self.top_functions(limit):
+            lines.append(f"  {own_count / max(1, self.samples) * 100:5.1f}%  {total_count / max(1, self.samples) * 100:5.1f}%  {name}")
+        return "\n".join(lines)
+
+# 测试代码
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def tokenize(text):
+        return [word.lower() for word in text.split()]
+    
+    def score(words):
+        return sum(len(word) ** 2 for word in words)
+    
+    def match(count):
+        text = "Python engineer with machine learning and SQL experience " * 50
+        return sum(score(tokenize(text)) for _ in range(count))
+    
+    def wait_for_page():
+        time.sleep(0.3)
+    
+    with SamplingProfiler(interval=0.002) as profiler:
+        match(2000)
+        with ThreadPoolExecutor(max_workers=2, initializer=profiler.add_thread) as executor:
+            list(executor.map(lambda _: wait_for_page(), range(2)))
+    
+    output_file = profiler.write_folded(os.path.join(tempfile.mkdtemp(), "match.folded"))
+    print(profiler.summary(5))
+    print(f"折叠调用栈已保存到: {output_file}")
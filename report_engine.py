@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 报告生成
+搜索报告和匹配报告的统计（网站、公司、城市、薪资分布、技能）一次计算完成，技能按不同的描述统计后再按出现次数加权；
+报告模板预先解析，渲染时按顺序拼接文本片段；统计结果按数据指纹缓存，同一份数据再次生成报告时不需要重新计算
+"""
+
+import os
+import string
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from job_schema import DESCRIPTION_ID, job_descriptions, load_descriptions, drop_unused_categories
+from salary_index import annual_salaries, has_salary
+from metrics import span, inc
+
+# 常见技能关键词列表
+COMMON_SKILLS = [
+    "python", "java", "javascript", "c++", "c#", "ruby", "php", "swift", "kotlin",
+    "golang", "rust", "typescript", "scala", "r", "matlab", "sql", "nosql", "mongodb",
+    "postgresql", "mysql", "oracle", "aws", "azure", "gcp", "docker", "kubernetes",
+    "jenkins", "git", "github", "gitlab", "ci/cd", "agile", "scrum", "kanban",
+    "jira", "confluence", "react", "angular", "vue", "node.js", "django", "flask",
+    "spring", "hibernate", "asp.net", "laravel", "tensorflow", "pytorch", "keras",
+    "scikit-learn", "pandas", "numpy", "hadoop", "spark", "kafka", "redis", "elasticsearch",
+    "ai", "machine learning", "deep learning", "nlp", "computer vision", "data science",
+    "big data", "data analysis", "data visualization", "tableau", "power bi", "excel",
+    "product management", "project management", "ux/ui", "figma", "sketch", "adobe xd",
+    "photoshop", "illustrator", "indesign", "after effects", "premiere pro",
+    "devops", "sre", "security", "networking", "linux", "windows", "macos",
+    "rest api", "graphql", "soap", "microservices", "serverless", "blockchain",
+    "ios", "android", "mobile", "web", "frontend", "backend", "fullstack"
+]
+
+# 年薪分布的区间（基准货币）和显示名称
+SALARY_BINS = [0, 50000, 100000, 150000, 200000, 300000, np.inf]
+SALARY_LABELS = ["5万以下", "5万-10万", "10万-15万", "15万-20万", "20万-30万", "30万以上"]
+
+# 计算数据指纹时使用的列（报告中用到的列）
+FINGERPRINT_COLUMNS = ["SITE", "TITLE", "COMPANY", "CITY", "STATE", "JOB_URL", "MIN_AMOUNT", "MAX_AMOUNT",
+                       "INTERVAL", "CURRENCY", "DESCRIPTION", DESCRIPTION_ID]
+
+class ReportTemplate:
+    """预先解析的报告模板，渲染时只按顺序拼接文本片段和格式化后的字段"""
+    
+    def __init__(self, text):
+        """解析模板
+        
+        Args:
+            text: str.format格式的模板文本，字段只能是简单名称
+        """
+        self.parts = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(text):
+            if field is not None and not field.isidentifier():
+                raise ValueError(f"模板字段只能是简单名称: {field}")
+            self.parts.append((literal, field, format_spec or "", conversion))
+    
+    def render(self, values):
+        """渲染模板
+        
+        Args:
+            values: 字段值字典
+        
+        Returns:
+            str: 渲染后的文本
+        """
+        pieces = []
+        for literal, field, format_spec, conversion in self.parts:
+            pieces.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion == "r":
+                    value = repr(value)
+                elif conversion == "s":
+                    value = str(value)
+                pieces.append(format(value, format_spec))
+        return "".join(pieces)
+    
+    def render_lines(self, rows):
+        """逐行渲染多条记录并用换行连接"""
+        return "\n".join(self.render(row) for row in rows)
+
+SEARCH_TEMPLATE = ReportTemplate("""# 工作搜索报告
+
+## 概述
+- **总工作数量**: {job_count}
+- **搜索时间**: {generated_at}
+
+## 来源网站分布
+{sites}
+
+## 热门公司
+{companies}
+
+## 热门地区
+{locations}
+
+## 薪资分布（年薪）
+{salaries}
+
+## 常见技能需求
+{skills}
+
+## 示例职位
+{samples}
+""")
+
+MATCH_TEMPLATE = ReportTemplate("""# 工作匹配报告
+
+## 概述
+- **简历**: {resume_name}
+- **匹配工作数量**: {job_count}
+- **平均匹配分数**: {mean_score}
+- **最高匹配分数**: {max_score}
+- **生成时间**: {generated_at}
+
+## 匹配分数分布
+{score_bins}
+
+## 最佳匹配
+{top_matches}
+
+## 热门公司
+{companies}
+
+## 常见技能需求
+{skills}
+""")
+
+SHARE_LINE = ReportTemplate("- **{name}**: {count} ({percent:.1f}%)")
+COUNT_LINE = ReportTemplate("- **{name}**: {count} 个职位")
+SKILL_LINE = ReportTemplate("- **{name}**: 出现在 {count} 个职位描述中 ({percent:.1f}%)")
+MATCH_LINE = ReportTemplate("{rank}. **{title}** - {company}（{city}）: {score}")
+SAMPLE_JOB = ReportTemplate("""
+### {rank}. {TITLE} - {COMPANY}
+- **位置**: {CITY}, {STATE}
+- **来源**: {SITE}
+- **链接**: {JOB_URL}{salary}""")
+SALARY_LINE = ReportTemplate("\n- **薪资**: {min_amount} - {max_amount} ({interval})")
+
+NO_DATA = "- 无数据"
+
+def count_skills(jobs_df, skills=COMMON_SKILLS, top_n=20):
+    """统计职位描述中出现的技能
+    
+    相同的描述只检查一次，再按描述出现的次数累加，紧凑结构的DataFrame按描述ID分组，不需要读取重复的描述
+    
+    Args:
+        jobs_df: 工作结果DataFrame
+        skills: 技能关键词列表
+        top_n: 返回前N个技能
+    
+    Returns:
+        dict: 技能及其出现的职位数量，按数量从多到少排列
+    """
+    if "DESCRIPTION" not in jobs_df.columns and DESCRIPTION_ID in jobs_df.columns:
+        weights = jobs_df[DESCRIPTION_ID].value_counts()
+        texts = load_descriptions(weights.index.tolist(), jobs_df)
+        groups = ((texts.get(text_id), count) for text_id, count in weights.items())
+    else:
+        groups = job_descriptions(jobs_df).dropna().value_counts().items()
+    
+    skill_counts = dict.fromkeys(skills, 0)
+    for text, count in groups:
+        if not isinstance(text, str):
+            continue
+        text = text.lower()
+        for skill in skills:
+            if skill in text:
+                skill_counts[skill] += count
+    
+    # 过滤掉未出现的技能，并按出现次数排序
+    ranked = sorted(((skill, int(count)) for skill, count in skill_counts.items() if count > 0),
+                    key=lambda item: item[1], reverse=True)
+    return dict(ranked[:top_n])
+
+def top_counts(jobs_df, column, top_n=None):
+    """统计一列中各取值的数量
+    
+    Returns:
+        list: (取值, 数量)列表，按数量从多到少排列
+    """
+    if column not in jobs_df.columns:
+        return []
+    counts = jobs_df[column].value_counts()
+    if top_n:
+        counts = counts.head(top_n)
+    return [(name, int(count)) for name, count in counts.items() if count > 0]
+
+def salary_histogram(jobs_df):
+    """统计年薪分布，薪资按周期和货币换算为基准货币的年薪后，取最低和最高年薪的平均值
+    
+    Returns:
+        list: (区间名称, 数量)列表，没有薪资数据时为空
+    """
+    if not has_salary(jobs_df):
+        return []
+    lower, upper = annual_salaries(jobs_df)
+    amounts = pd.Series((lower + upper) / 2).dropna()
+    if amounts.empty:
+        return []
+    counts = pd.cut(amounts, SALARY_BINS, labels=SALARY_LABELS, right=False).value_counts(sort=False)
+    return [(label, int(count)) for label, count in counts.items()]
+
+def format_amount(value):
+    """格式化薪资金额"""
+    if value is None or pd.isna(value):
+        return "N/A"
+    return f"{float(value):,.0f}"
+
+def format_score(value):
+    """格式化匹配分数"""
+    if value is None or pd.isna(value):
+        return "N/A"
+    return f"{float(value):.2f}"
+
+def score_column(matches_df):
+    """获取匹配结果中的分数列：名称包含score的数值列优先，其次是名称包含match的数值列"""
+    numeric = [column for column in matches_df.columns if pd.api.types.is_numeric_dtype(matches_df[column])]
+    for keyword in ["score", "match"]:
+        for column in numeric:
+            if keyword in str(column).lower():
+                return column
+    return None
+
+def share_lines(counts, total):
+    """生成"名称: 数量 (百分比)"列表"""
+    if not counts:
+        return NO_DATA
+    return SHARE_LINE.render_lines({"name": name, "count": count, "percent": count / total * 100}
+                                   for name, count in counts)
+
+def count_lines(counts, template=COUNT_LINE, total=None):
+    """生成"名称: 数量"列表"""
+    if not counts:
+        return NO_DATA
+    return template.render_lines({"name": name, "count": count, "percent": count / max(1, total or 1) * 100}
+                                 for name, count in counts)
+
+def sample_lines(jobs_df, count=5):
+    """生成示例职位"""
+    columns = ["TITLE", "COMPANY", "CITY", "STATE", "SITE", "JOB_URL", "MIN_AMOUNT", "MAX_AMOUNT", "INTERVAL"]
+    records = jobs_df.head(count).reindex(columns=columns).astype(object).to_dict("records")
+    rows = []
+    for rank, job in enumerate(records, 1):
+        salary = ""
+        if pd.notna(job["MIN_AMOUNT"]) or pd.notna(job["MAX_AMOUNT"]):
+            salary = SALARY_LINE.render({
+                "min_amount": format_amount(job["MIN_AMOUNT"]),
+                "max_amount": format_amount(job["MAX_AMOUNT"]),
+                "interval": job["INTERVAL"] if pd.notna(job["INTERVAL"]) else "yearly"
+            })
+        rows.append({**job, "rank": rank, "salary": salary})
+    return SAMPLE_JOB.render_lines(rows)
+
+def search_sections(jobs_df, top_n=10, skill_count=20):
+    """计算搜索报告的所有统计并生成各部分文本
+    
+    Args:
+        jobs_df: 工作结果DataFrame（不为空）
+        top_n: 公司和地区显示的数量
+        skill_count: 技能显示的数量
+    
+    Returns:
+        dict: 模板字段值（不包括生成时间）
+    """
+    jobs_df = drop_unused_categories(jobs_df)
+    job_count = len(jobs_df)
+    return {
+        "job_count": job_count,
+        "sites": share_lines(top_counts(jobs_df, "SITE"), job_count),
+        "companies": count_lines(top_counts(jobs_df, "COMPANY", top_n)),
+        "locations": count_lines(top_counts(jobs_df, "CITY", top_n)),
+        "salaries": share_lines([item for item in salary_histogram(jobs_df) if item[1]], job_count),
+        "skills": count_lines(list(count_skills(jobs_df, top_n=skill_count).items()), SKILL_LINE, job_count),
+        "samples": sample_lines(jobs_df)
+    }
+
+def match_sections(matches_df, top_n=10, skill_count=20):
+    """计算匹配报告的所有统计并生成各部分文本
+    
+    Args:
+        matches_df: 匹配结果DataFrame（不为空）
+        top_n: 最佳匹配和公司显示的数量
+        skill_count: 技能显示的数量
+    
+    Returns:
+        dict: 模板字段值（不包括简历和生成时间）
+    """
+    matches_df = drop_unused_categories(matches_df)
+    job_count = len(matches_df)
+    column = score_column(matches_df)
+    scores = matches_df[column].astype(float) if column else pd.Series(dtype=float)
+    
+    if column and scores.notna().any():
+        # 分数在0-1之间时按0.1分段，否则按10分段
+        upper = 1.0 if scores.max() <= 1.0 else 100.0
+        edges = np.linspace(0, upper, 11)
+        edges[-1] = np.inf
+        labels = [f"{format_score(low)}-{format_score(high)}" for low, high in zip(edges[:-2], edges[1:-1])]
+        labels.append(f"{format_score(edges[-2])}以上")
+        binned = pd.cut(scores.dropna(), edges, labels=labels, right=False).value_counts(sort=False)
+        score_bins = share_lines([(label, int(count)) for label, count in binned.items() if count], job_count)
+        top = matches_df.loc[scores.sort_values(ascending=False, kind="stable").index[:top_n]]
+    else:
+        score_bins = NO_DATA
+        top = matches_df.head(top_n)
+    
+    records = top.reindex(columns=["TITLE", "COMPANY", "CITY"]).astype(object).to_dict("records")
+    top_scores = scores.reindex(top.index).tolist() if column else [None] * len(records)
+    top_matches = MATCH_LINE.render_lines({
+        "rank": rank,
+        "title": job["TITLE"],
+        "company": job["COMPANY"],
+        "city": job["CITY"],
+        "score": format_score(score)
+    } for rank, (job, score) in enumerate(zip(records, top_scores), 1)) or NO_DATA
+    
+    return {
+        "job_count": job_count,
+        "mean_score": format_score(scores.mean()) if column else "N/A",
+        "max_score": format_score(scores.max()) if column else "N/A",
+        "score_bins": score_bins,
+        "top_matches": top_matches,
+        "companies": count_lines(top_counts(matches_df, "COMPANY", top_n)),
+        "skills": count_lines(list(count_skills(matches_df, top_n=skill_count).items()), SKILL_LINE, job_count)
+    }
+
+def dataset_fingerprint(frame):
+    """计算DataFrame中报告用到的列的内容指纹，内容相同的数据得到相同的指纹"""
+    columns = [column for column in FINGERPRINT_COLUMNS if column in frame.columns]
+    columns += sorted((column for column in frame.columns if column not in columns), key=str)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((frame.shape, [str(column) for column in columns])).encode("utf-8"))
+    for column in columns:
+        values = frame[column]
+        if values.dtype == object:
+            values = values.astype(str)
+        digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class ReportEngine:
+    """报告生成类，按数据指纹缓存各部分文本"""
+    
+    def __init__(self, cache_size=32):
+        """初始化报告生成
+        
+        Args:
+            cache_size: 缓存的报告数量
+        """
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.fingerprints = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def fingerprint(self, frame):
+        """获取DataFrame的数据指纹
+        
+        同一个DataFrame对象只计算一次（形状或列变化时重新计算）；程序中的结果DataFrame生成后不再原地修改，
+        原地修改单元格的DataFrame需要复制后再生成报告
+        """
+        key = id(frame)
+        shape = (frame.shape, tuple(frame.columns))
+        with self.lock:
+            entry = self.fingerprints.get(key)
+            if entry and entry[0]() is frame and entry[1] == shape:
+                return entry[2]
+        fingerprint = dataset_fingerprint(frame)
+        with self.lock:
+            self.fingerprints[key] = (weakref.ref(frame, lambda _: self.fingerprints.pop(key, None)), shape, fingerprint)
+        return fingerprint
+    
+    def sections(self, kind, frame, build, **options):
+        """获取报告各部分文本，缓存中没有时调用build计算
+        
+        Args:
+            kind: 报告类型
+            frame: 报告数据
+            build: 计算函数，参数为frame和options
+            options: 影响报告内容的参数
+        
+        Returns:
+            dict: 模板字段值
+        """
+        key = (kind, self.fingerprint(frame), tuple(sorted(options.items())))
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                inc("job_assistant_report_cache_total", help="报告缓存命中情况", kind=kind, result="hit")
+                return self.cache[key]
+            self.misses += 1
+        inc("job_assistant_report_cache_total", help="报告缓存命中情况", kind=kind, result="miss")
+        
+        with span("report", kind=kind):
+            values = build(frame, **options)
+        with self.lock:
+            self.cache[key] = values
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return values
+    
+    def search_report(self, jobs_df, output_file=None, top_n=10, skill_count=20):
+        """生成工作搜索报告
+        
+        Args:
+            jobs_df: 工作结果DataFrame
+            output_file: 输出文件路径，默认为None（只返回报告文本）
+            top_n: 公司和地区显示的数量
+            skill_count: 技能显示的数量
+        
+        Returns:
+            str: 报告文本
+        """
+        if jobs_df.empty:
+            report = "# 工作搜索报告\n\n**没有找到匹配的工作**"
+        else:
+            values = self.sections("search", jobs_df, search_sections, top_n=top_n, skill_count=skill_count)
+            report = SEARCH_TEMPLATE.render({**values, "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        return write_report(report, output_file)
+    
+    def match_report(self, matches_df, resume_file=None, output_file=None, top_n=10, skill_count=20):
+        """生成工作匹配报告
+        
+        Args:
+            matches_df: 匹配结果DataFrame
+            resume_file: 简历文件路径
+            output_file: 输出文件路径，默认为None（只返回报告文本）
+            top_n: 最佳匹配和公司显示的数量
+            skill_count: 技能显示的数量
+        
+        Returns:
+            str: 报告文本
+        """
+        if matches_df.empty:
+            report = "# 工作匹配报告\n\n**没有匹配结果**"
+        else:
+            values = self.sections("match", matches_df, match_sections, top_n=top_n, skill_count=skill_count)
+            report = MATCH_TEMPLATE.render({
+                **values,
+                "resume_name": os.path.basename(resume_file) if resume_file else "未指定",
+                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+        return write_report(report, output_file)
+    
+    def get_stats(self):
+        """获取缓存统计"""
+        with self.lock:
+            return {"reports": len(self.cache), "hits": self.hits, "misses": self.misses}
+    
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self.cache.clear()
+            self.fingerprints.clear()
+
+def write_report(report, output_file=None):
+    """保存报告（如果指定了输出文件）并返回报告文本"""
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(report)
+    return report
+
+# 程序中共用一个报告生成实例
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_report_engine():
+    """获取共享的报告生成实例"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ReportEngine()
+        return _engine
+
+# 测试代码
+if __name__ == "__main__":
+    import sys
+    import time
+    from benchmark_suite import synthetic_jobs
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    jobs = synthetic_jobs(count)
+    engine = ReportEngine()
+    
+    start_time = time.perf_counter()
+    report = engine.search_report(jobs)
+    print(f"生成 {count} 条职位的报告: {(time.perf_counter() - start_time) * 1000:.0f} 毫秒")
+    start_time = time.perf_counter()
+    engine.search_report(jobs)
+    print(f"再次生成: {(time.perf_counter() - start_time) * 1000:.2f} 毫秒")
+    start_time = time.perf_counter()
+    engine.search_report(jobs.copy())
+    print(f"内容相同的副本: {(time.perf_counter() - start_time) * 1000:.0f} 毫秒")
+    print(engine.get_stats())
+    print(report[:1200])
+    
+    matches = jobs.head(1000).assign(MATCH_SCORE=np.random.default_rng(0).random(1000))
+    print(engine.match_report(matches, "resume.pdf")[:800])
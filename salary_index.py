@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 薪资换算和范围索引
+读取职位数据时按薪资周期（INTERVAL）和货币（CURRENCY）把最低、最高薪资换算为基准货币的年薪，
+并按年薪排序建立索引，薪资范围过滤用二分查找完成，不同周期和货币的职位可以直接比较
+"""
+
+import os
+import json
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# 换算后的年薪列
+ANNUAL_MIN = "ANNUAL_MIN"
+ANNUAL_MAX = "ANNUAL_MAX"
+
+# 基准货币
+BASE_CURRENCY = "CNY"
+
+# 各薪资周期换算为年薪的倍数（按每年52周、260个工作日、2080个工作小时计算）
+INTERVAL_FACTORS = {
+    "yearly": 1,
+    "monthly": 12,
+    "weekly": 52,
+    "daily": 260,
+    "hourly": 2080
+}
+
+# 本地汇率表：1单位货币折合的人民币（近似值，可以在数据目录的exchange_rates.json中覆盖或补充）
+DEFAULT_RATES = {
+    "CNY": 1.0,
+    "USD": 7.2,
+    "EUR": 7.8,
+    "GBP": 9.1,
+    "JPY": 0.048,
+    "KRW": 0.0053,
+    "HKD": 0.92,
+    "TWD": 0.22,
+    "SGD": 5.3,
+    "AUD": 4.7,
+    "CAD": 5.2,
+    "CHF": 8.1,
+    "INR": 0.086
+}
+
+def load_rates(rates_file=None):
+    """读取汇率表
+    
+    Args:
+        rates_file: JSON格式的汇率文件（货币代码到人民币汇率的映射），不存在时只使用DEFAULT_RATES
+    
+    Returns:
+        dict: 货币代码（大写）到人民币汇率的映射
+    """
+    rates = dict(DEFAULT_RATES)
+    if rates_file and os.path.exists(rates_file):
+        try:
+            with open(rates_file, 'r', encoding='utf-8') as f:
+                rates.update({str(code).upper(): float(rate) for code, rate in json.load(f).items()})
+        except Exception as e:
+            print(f"读取汇率文件失败: {e}")
+    return rates
+
+def has_salary(frame):
+    """DataFrame中是否有薪资列"""
+    return any(column in frame.columns for column in [ANNUAL_MIN, ANNUAL_MAX, "MIN_AMOUNT", "MAX_AMOUNT"])
+
+def annualize(frame, rates=None, base_currency=BASE_CURRENCY):
+    """把最低、最高薪资换算为基准货币的年薪
+    
+    没有薪资周期的按年薪处理，没有货币的按基准货币处理；无法识别的周期或没有汇率的货币换算结果为空值。
+    只有最低或最高薪资其中一个时，另一个取相同的值
+    
+    Args:
+        frame: 职位DataFrame
+        rates: 汇率表，默认为DEFAULT_RATES
+        base_currency: 基准货币
+    
+    Returns:
+        tuple: (最低年薪, 最高年薪)，与frame行顺序一致的float64数组
+    """
+    rates = rates or DEFAULT_RATES
+    empty = pd.Series(np.nan, index=frame.index)
+    lower = pd.to_numeric(frame.get("MIN_AMOUNT", empty), errors="coerce").astype(float)
+    upper = pd.to_numeric(frame.get("MAX_AMOUNT", empty), errors="coerce").astype(float)
+    
+    factor = pd.Series(1.0, index=frame.index)
+    if "INTERVAL" in frame.columns:
+        intervals = frame["INTERVAL"].astype(object)
+        factor = intervals.str.strip().str.lower().map(INTERVAL_FACTORS).astype(float)
+        factor[intervals.isna()] = 1.0
+    
+    rate = pd.Series(1.0, index=frame.index)
+    if "CURRENCY" in frame.columns:
+        currencies = frame["CURRENCY"].astype(object)
+        base_rate = rates[base_currency.upper()]
+        rate = currencies.str.strip().str.upper().map(rates).astype(float) / base_rate
+        rate[currencies.isna()] = 1.0
+    
+    scale = (factor * rate).to_numpy()
+    lower = lower.to_numpy() * scale
+    upper = upper.to_numpy() * scale
+    return np.where(np.isnan(lower), upper, lower), np.where(np.isnan(upper), lower, upper)
+
+def normalize_salaries(frame, rates=None, base_currency=BASE_CURRENCY):
+    """添加换算后的年薪列（ANNUAL_MIN、ANNUAL_MAX），读取职位数据时调用
+    
+    Returns:
+        DataFrame: 添加了年薪列的副本，没有薪资列时返回原DataFrame
+    """
+    if not has_salary(frame):
+        return frame
+    lower, upper = annualize(frame, rates, base_currency)
+    frame = frame.copy()
+    frame[ANNUAL_MIN] = lower.astype("float32")
+    frame[ANNUAL_MAX] = upper.astype("float32")
+    frame.attrs["salary_currency"] = base_currency
+    return frame
+
+def annual_salaries(frame):
+    """获取年薪数组，已换算的DataFrame直接使用年薪列，否则按默认汇率换算
+    
+    Returns:
+        tuple: (最低年薪, 最高年薪)数组
+    """
+    if ANNUAL_MIN in frame.columns and ANNUAL_MAX in frame.columns:
+        return frame[ANNUAL_MIN].to_numpy(dtype=float), frame[ANNUAL_MAX].to_numpy(dtype=float)
+    return annualize(frame)
+
+class SalaryIndex:
+    """按年薪排序的索引，用二分查找回答薪资范围查询"""
+    
+    def __init__(self, lower, upper):
+        """建立索引
+        
+        Args:
+            lower: 每行的最低年薪数组（空值表示没有薪资）
+            upper: 每行的最高年薪数组
+        """
+        self.size = len(lower)
+        lower = np.asarray(lower, dtype=float)
+        upper = np.asarray(upper, dtype=float)
+        # 空值不进入索引，查询薪资范围时没有薪资的职位不会被选中
+        self.lower_order = np.flatnonzero(~np.isnan(lower))
+        self.lower_order = self.lower_order[np.argsort(lower[self.lower_order], kind="stable")]
+        self.lower_values = lower[self.lower_order]
+        self.upper_order = np.flatnonzero(~np.isnan(upper))
+        self.upper_order = self.upper_order[np.argsort(upper[self.upper_order], kind="stable")]
+        self.upper_values = upper[self.upper_order]
+    
+    @classmethod
+    def from_frame(cls, frame):
+        """根据职位DataFrame建立索引"""
+        return cls(*annual_salaries(frame))
+    
+    def mask(self, min_salary=None, max_salary=None):
+        """获取薪资范围与[min_salary, max_salary]有交集的行
+        
+        Args:
+            min_salary: 最低年薪，职位的最高年薪不低于该值
+            max_salary: 最高年薪，职位的最低年薪不高于该值
+        
+        Returns:
+            ndarray: 布尔数组，与建立索引时的行顺序一致
+        """
+        selected = np.ones(self.size, dtype=bool)
+        if min_salary is not None:
+            start = np.searchsorted(self.upper_values, min_salary, side="left")
+            matched = np.zeros(self.size, dtype=bool)
+            matched[self.upper_order[start:]] = True
+            selected &= matched
+        if max_salary is not None:
+            end = np.searchsorted(self.lower_values, max_salary, side="right")
+            matched = np.zeros(self.size, dtype=bool)
+            matched[self.lower_order[:end]] = True
+            selected &= matched
+        return selected
+    
+    def query(self, min_salary=None, max_salary=None):
+        """获取薪资范围与[min_salary, max_salary]有交集的行位置
+        
+        Returns:
+            ndarray: 按原顺序排列的行位置
+        """
+        return np.flatnonzero(self.mask(min_salary, max_salary))
+
+# 每个DataFrame对象的索引只建立一次（形状或列变化时重新建立）
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def salary_index(frame):
+    """获取DataFrame的薪资索引
+    
+    结果DataFrame生成后不再原地修改，原地修改薪资的DataFrame需要复制后再查询
+    
+    Args:
+        frame: 职位DataFrame
+    
+    Returns:
+        SalaryIndex: 薪资索引
+    """
+    key = id(frame)
+    shape = (frame.shape, tuple(frame.columns))
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry and entry[0]() is frame and entry[1] == shape:
+            return entry[2]
+    index = SalaryIndex.from_frame(frame)
+    with _indexes_lock:
+        _indexes[key] = (weakref.ref(frame, lambda _: _indexes.pop(key, None)), shape, index)
+    return index
+
+# 测试代码
+if __name__ == "__main__":
+    import time
+    from benchmark_suite import synthetic_jobs
+    
+    jobs = pd.DataFrame({
+        "TITLE": ["年薪", "月薪", "时薪", "美元年薪", "无薪资"],
+        "MIN_AMOUNT": [300000, 20000, 150, 60000, None],
+        "MAX_AMOUNT": [400000, 30000, 200, 80000, None],
+        "INTERVAL": ["yearly", "monthly", "hourly", "yearly", None],
+        "CURRENCY": ["CNY", "CNY", "CNY", "USD", None]
+    })
+    jobs = normalize_salaries(jobs)
+    print(jobs[["TITLE", "INTERVAL", "CURRENCY", ANNUAL_MIN, ANNUAL_MAX]].to_string())
+    print(f"年薪35万以上: {jobs.iloc[salary_index(jobs).query(min_salary=350000)]['TITLE'].tolist()}")
+    
+    jobs = normalize_salaries(synthetic_jobs(100000))
+    start_time = time.perf_counter()
+    index = salary_index(jobs)
+    print(f"建立 {len(jobs)} 条职位的索引: {(time.perf_counter() - start_time) * 1000:.1f} 毫秒")
+    start_time = time.perf_counter()
+    positions = salary_index(jobs).query(100000, 150000)
+    print(f"查询10万-15万: {(time.perf_counter() - start_time) * 1000:.2f} 毫秒，{len(positions)} 条")
+    scan = ((jobs[ANNUAL_MAX] >= 100000) & (jobs[ANNUAL_MIN] <= 150000)).to_numpy()
+    print(f"与逐行比较一致: {np.array_equal(np.flatnonzero(scan), positions)}")
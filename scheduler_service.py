@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 定时任务
+按类似cron的时间表在后台运行保存的搜索、增量匹配和申请状态跟踪，用户打开界面时结果已经准备好；
+运行时间加随机延迟避免同时访问招聘网站，同时运行的任务数量有上限，程序停止期间错过的运行在启动后补一次，
+定时任务的定义和运行状态保存在数据库中
+"""
+
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+
+# cron字段的取值范围：分钟、小时、日、月、星期（0和7都表示星期日）
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+# 常用时间表的简写
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *"
+}
+
+# 运行记录在历史记录中的类型
+HISTORY_KIND = "schedule"
+
+# 任务结束状态（与task_manager一致）
+FINISHED_STATES = {"done", "failed", "cancelled"}
+
+def parse_cron_field(text, low, high):
+    """解析一个cron字段，支持*、*/n、a-b、a-b/n和逗号分隔的列表
+    
+    Returns:
+        set: 字段允许的取值
+    """
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"无效的步长: {text}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"取值超出范围 {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """cron格式的时间表（分钟 小时 日 月 星期），按本地时间计算"""
+    
+    def __init__(self, expression):
+        """解析时间表
+        
+        Args:
+            expression: cron表达式，如"0 8 * * 1-5"（工作日8点）、"*/30 * * * *"，或@hourly、@daily等简写
+        """
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f"cron表达式需要5个字段: {expression}")
+        parsed = [parse_cron_field(text, low, high) for text, (_, low, high) in zip(fields, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        # 与cron相同：日和星期都有限制时满足其一即可
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+    
+    def day_matches(self, moment):
+        """日期是否符合日和星期字段"""
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+    
+    def next_after(self, moment):
+        """获取moment之后（不含）的下一个运行时间
+        
+        Args:
+            moment: datetime
+        
+        Returns:
+            datetime: 下一个运行时间（精确到分钟）
+        """
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366 * 5)
+        while current < limit:
+            if current.month not in self.months:
+                current = (current.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        raise ValueError(f"时间表没有可运行的时间: {self.expression}")
+
+def parse_time(value):
+    """读取保存的时间（ISO格式文本），空值返回None"""
+    return datetime.fromisoformat(value) if value else None
+
+class SchedulerService:
+    """定时任务服务类，到期的定时任务通过submit提交为后台任务，并跟踪任务结果"""
+    
+    def __init__(self, store, submit, status, max_concurrent=2, jitter_seconds=120, poll_interval=30):
+        """初始化定时任务服务
+        
+        Args:
+            store: JobStore实例，定时任务保存在其中的schedules表，运行记录保存在schedule历史记录中
+            submit: 提交任务的函数，调用方式为submit(kind, params)，返回任务ID
+            status: 获取任务状态的函数，调用方式为status(task_id)，返回任务状态快照（任务不存在时为None）
+            max_concurrent: 同时运行的定时任务数量上限，到期但超出上限的任务等到有空位时再运行
+            jitter_seconds: 默认的随机延迟上限（秒），每次运行时间在时间表的时间之后随机延迟
+            poll_interval: 最长检查间隔（秒），用于跟踪运行中任务的结果
+        """
+        self.store = store
+        self.submit = submit
+        self.status = status
+        self.max_concurrent = max_concurrent
+        self.jitter_seconds = jitter_seconds
+        self.poll_interval = poll_interval
+        self.schedules = store.load_schedules()
+        self.history = store.history(HISTORY_KIND)
+        self.running = {}
+        self.lock = threading.RLock()
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def add(self, schedule_id, kind, cron, params=None, jitter_seconds=None, catch_up=True, enabled=True):
+        """添加或修改定时任务，已有的运行状态（上次运行时间等）保留
+        
+        Args:
+            schedule_id: 定时任务ID
+            kind: 任务类型，如search、rematch、status
+            cron: cron表达式
+            params: 任务参数
+            jitter_seconds: 随机延迟上限（秒），默认使用服务的设置
+            catch_up: 程序停止期间错过运行时，启动后是否补运行一次
+            enabled: 是否启用
+        
+        Returns:
+            dict: 定时任务
+        """
+        schedule = CronSchedule(cron)
+        with self.lock:
+            previous = self.schedules.get(schedule_id, {})
+            definition = {
+                "id": schedule_id,
+                "kind": kind,
+                "cron": cron,
+                "params": params or {},
+                "jitter_seconds": self.jitter_seconds if jitter_seconds is None else jitter_seconds,
+                "catch_up": catch_up,
+                "enabled": enabled
+            }
+            changed = any(previous.get(key) != definition[key] for key in ["cron", "jitter_seconds"])
+            record = {
+                "last_run": None, "last_status": None, "last_error": None, "last_task_id": None,
+                "runs": 0, "missed": 0, **previous, **definition
+            }
+            if changed or not record.get("next_run"):
+                record["next_run"] = self.next_time(schedule, record["jitter_seconds"], datetime.now()).isoformat()
+            self.schedules[schedule_id] = record
+            self.store.save_schedule(record)
+        self.wakeup.set()
+        return dict(record)
+    
+    def remove(self, schedule_id):
+        """删除定时任务（运行中的任务继续执行）
+        
+        Returns:
+            bool: 定时任务是否存在
+        """
+        with self.lock:
+            if self.schedules.pop(schedule_id, None) is None:
+                return False
+            self.store.delete_schedule(schedule_id)
+        return True
+    
+    def list(self):
+        """列出定时任务
+        
+        Returns:
+            list: 定时任务字典列表，按下次运行时间排列
+        """
+        with self.lock:
+            schedules = [dict(schedule, running=schedule["id"] in self.running) for schedule in self.schedules.values()]
+        return sorted(schedules, key=lambda schedule: schedule.get("next_run") or "")
+    
+    def run_now(self, schedule_id):
+        """在下一次检查时运行定时任务，之后仍按时间表运行
+        
+        Returns:
+            bool: 是否已安排（定时任务不存在或正在运行时为False）
+        """
+        with self.lock:
+            schedule = self.schedules.get(schedule_id)
+            if schedule is None or schedule_id in self.running:
+                return False
+            schedule["next_run"] = datetime.now().isoformat()
+        self.wakeup.set()
+        return True
+    
+    def next_time(self, schedule, jitter_seconds, after):
+        """计算下次运行时间：时间表的下一个时间加随机延迟"""
+        jitter = random.uniform(0, jitter_seconds) if jitter_seconds else 0
+        return schedule.next_after(after) + timedelta(seconds=jitter)
+    
+    def catch_up(self, now=None):
+        """处理程序停止期间错过的运行：允许补运行的定时任务在本次检查时运行一次（多次错过只补一次），
+        其他的跳到下一个运行时间"""
+        now = now or datetime.now()
+        with self.lock:
+            for schedule in self.schedules.values():
+                next_run = parse_time(schedule.get("next_run"))
+                if not schedule["enabled"] or next_run is None or next_run > now:
+                    continue
+                # 检查间隔和随机延迟内的到期不算错过
+                if (now - next_run).total_seconds() <= self.poll_interval + schedule["jitter_seconds"]:
+                    continue
+                schedule["missed"] = schedule.get("missed", 0) + 1
+                if schedule["catch_up"]:
+                    schedule["next_run"] = now.isoformat()
+                    print(f"定时任务 {schedule['id']} 错过了 {next_run:%Y-%m-%d %H:%M} 的运行，现在补运行")
+                else:
+                    schedule["next_run"] = self.next_time(CronSchedule(schedule["cron"]), schedule["jitter_seconds"],
+                                                          now).isoformat()
+                self.store.save_schedule(schedule)
+    
+    def collect(self):
+        """记录已结束的定时任务的结果"""
+        with self.lock:
+            running = list(self.running.items())
+        for schedule_id, (task_id, started_at) in running:
+            snapshot = self.status(task_id)
+            if snapshot is not None and snapshot["status"] not in FINISHED_STATES:
+                continue
+            status = snapshot["status"] if snapshot else "lost"
+            error = snapshot["error"] if snapshot else "任务记录已不存在"
+            with self.lock:
+                del self.running[schedule_id]
+                schedule = self.schedules.get(schedule_id)
+                if schedule is not None:
+                    schedule["last_status"] = status
+                    schedule["last_error"] = error
+                    self.store.save_schedule(schedule)
+            self.history.append({
+                "timestamp": started_at.strftime("%Y%m%d_%H%M%S"),
+                "schedule_id": schedule_id,
+                "task_id": task_id,
+                "status": status,
+                "error": error,
+                "duration": round((datetime.now() - started_at).total_seconds(), 3)
+            })
+    
+    def tick(self, now=None):
+        """检查一次：记录结束的任务，提交到期的定时任务
+        
+        Returns:
+            list: 本次提交的定时任务ID
+        """
+        now = now or datetime.now()
+        self.collect()
+        with self.lock:
+            due = [schedule for schedule in self.schedules.values()
+                   if schedule["enabled"] and schedule["id"] not in self.running
+                   and parse_time(schedule.get("next_run")) is not None and parse_time(schedule["next_run"]) <= now]
+            due.sort(key=lambda schedule: schedule["next_run"])
+            slots = max(0, self.max_concurrent - len(self.running))
+            launched = []
+            for schedule in due[:slots]:
+                try:
+                    task_id = self.submit(schedule["kind"], dict(schedule["params"]))
+                except Exception as e:
+                    task_id = None
+                    schedule["last_status"] = "failed"
+                    schedule["last_error"] = str(e)
+                    print(f"提交定时任务 {schedule['id']} 失败: {e}")
+                if task_id:
+                    self.running[schedule["id"]] = (task_id, now)
+                    schedule["last_task_id"] = task_id
+                    schedule["runs"] = schedule.get("runs", 0) + 1
+                    launched.append(schedule["id"])
+                schedule["last_run"] = now.isoformat()
+                schedule["next_run"] = self.next_time(CronSchedule(schedule["cron"]), schedule["jitter_seconds"],
+                                                      now).isoformat()
+                self.store.save_schedule(schedule)
+        return launched
+    
+    def seconds_until_next(self, now=None):
+        """距离最早的下次运行还有多少秒（不超过poll_interval）"""
+        now = now or datetime.now()
+        with self.lock:
+            times = [parse_time(schedule.get("next_run")) for schedule in self.schedules.values() if schedule["enabled"]]
+            running = bool(self.running)
+        times = [moment for moment in times if moment is not None]
+        wait = min([(moment - now).total_seconds() for moment in times], default=self.poll_interval)
+        # 有运行中的任务或到期任务等待空位时按检查间隔轮询
+        if running:
+            wait = min(wait, self.poll_interval)
+        return max(1.0, min(wait, self.poll_interval))
+    
+    def run(self):
+        """定时任务线程"""
+        while not self.stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"定时任务检查失败: {e}")
+            self.wakeup.wait(self.seconds_until_next())
+            self.wakeup.clear()
+    
+    def start(self):
+        """启动定时任务线程（先处理错过的运行）"""
+        if self.thread is not None:
+            return
+        self.catch_up()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="scheduler", daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout=5.0):
+        """停止定时任务线程（已提交的任务由任务管理负责取消）"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.wakeup.set()
+        self.thread.join(timeout)
+        self.thread = None
+        self.collect()
+
+# 测试代码
+if __name__ == "__main__":
+    import tempfile
+    from job_store import JobStore
+    from task_manager import TaskManager
+    
+    schedule = CronSchedule("0 8 * * 1-5")
+    print(f"工作日8点的下一次运行: {schedule.next_after(datetime(2024, 6, 7, 9, 0))}")
+    print(f"每30分钟的下一次运行: {CronSchedule('*/30 * * * *').next_after(datetime(2024, 6, 7, 9, 10))}")
+    
+    store = JobStore(tempfile.mktemp(suffix=".db"))
+    tasks = TaskManager()
+    
+    def saved_search(search_term, task):
+        task.report(progress=0.5, message=f"搜索 {search_term}")
+        time.sleep(0.2)
+        return f"{search_term}: 12 个新工作"
+    
+    scheduler = SchedulerService(store, lambda kind, params: tasks.submit(kind, saved_search, **params),
+                                 tasks.status, max_concurrent=1, jitter_seconds=0, poll_interval=1)
+    scheduler.add("python", "search", "* * * * *", {"search_term": "Python"})
+    scheduler.add("ai", "search", "@daily", {"search_term": "AI Product Manager"})
+    
+    # 模拟程序停止了两天：两个定时任务都错过了运行，都补运行一次，但同时只能运行一个
+    for record in scheduler.schedules.values():
+        record["next_run"] = (datetime.now() - timedelta(days=2)).isoformat()
+    scheduler.catch_up()
+    print(f"第一次检查提交: {scheduler.tick()}")
+    print(f"第二次检查提交: {scheduler.tick()}")
+    time.sleep(0.5)
+    print(f"第三次检查提交: {scheduler.tick()}")
+    time.sleep(0.5)
+    scheduler.collect()
+    for record in scheduler.list():
+        print(f"{record['id']}: 下次 {record['next_run'][:16]}，上次状态 {record['last_status']}，错过 {record['missed']} 次")
+    
+    # 定义和运行状态保存在数据库中
+    print(f"重新读取: {sorted(SchedulerService(store, None, None).schedules)}")
+    store.close()
+    tasks.shutdown()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 会话状态
+每个界面用户（Gradio会话）有独立的当前简历、工作数据和匹配结果，互不覆盖；
+所有会话的DataFrame共用一个内存预算，超出时把最久未使用的会话的数据写到磁盘，再次使用时自动读回；
+会话的值保存在数据库中，进程重启或换到另一个应用进程后按值中的文件路径重新读取数据
+"""
+
+import os
+import re
+import time
+import shutil
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# 没有界面会话时（命令行、启动时读取的数据）使用的会话，它的当前文件保存在配置中
+DEFAULT_SESSION = "default"
+
+# 当前线程或协程正在处理的会话
+CURRENT_SESSION = contextvars.ContextVar("job_assistant_session", default=DEFAULT_SESSION)
+
+def current_session_id():
+    """获取当前会话ID"""
+    return CURRENT_SESSION.get()
+
+@contextmanager
+def use_session(session_id):
+    """在with块内把当前会话切换为session_id
+    
+    Args:
+        session_id: 会话ID，为空时使用默认会话
+    """
+    token = CURRENT_SESSION.set(session_id or DEFAULT_SESSION)
+    try:
+        yield
+    finally:
+        CURRENT_SESSION.reset(token)
+
+def session_id_from_request(request):
+    """从Gradio请求中获取会话ID
+    
+    Args:
+        request: gr.Request，回调函数声明request: gr.Request参数即可得到
+    
+    Returns:
+        str: 会话ID，没有请求时返回默认会话
+    """
+    return getattr(request, "session_hash", None) or DEFAULT_SESSION
+
+def frame_bytes(frame):
+    """估算DataFrame占用的内存（字节）"""
+    try:
+        return int(frame.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+class Session:
+    """一个用户会话的状态"""
+    
+    def __init__(self, session_id):
+        """初始化会话
+        
+        Args:
+            session_id: 会话ID
+        """
+        self.id = session_id
+        self.values = {}
+        self.frames = {}
+        self.sizes = {}
+        self.spilled = {}
+        # 由DataFrame派生的缓存（如表格视图），换出数据时一起清空
+        self.cache = {}
+        self.created_at = time.time()
+        self.last_access = self.created_at
+        self.lock = threading.RLock()
+    
+    def memory_bytes(self):
+        """内存中的DataFrame占用的字节数"""
+        return sum(self.sizes.values())
+
+class SessionManager:
+    """会话状态管理类，按LRU顺序把空闲会话的DataFrame换出到磁盘"""
+    
+    def __init__(self, spill_dir, memory_budget_mb=512, session_ttl_hours=24, max_sessions=1000,
+                 store=None, loader=None, frame_sources=None):
+        """初始化会话管理
+        
+        Args:
+            spill_dir: 换出的DataFrame保存目录，每个进程使用自己的目录
+            memory_budget_mb: 所有会话的DataFrame共用的内存预算（MB）
+            session_ttl_hours: 会话空闲多久后删除（小时），默认会话不会删除
+            max_sessions: 最多保留的会话数，超出时删除最久未使用的会话
+            store: 保存会话值的JobStore，为None时会话只保存在内存中
+            loader: 按文件读取DataFrame的函数，参数为(数据名称, 文件路径)
+            frame_sources: 数据名称到会话中保存其文件路径的键的映射，如{"jobs": "jobs_file"}
+        """
+        self.spill_dir = spill_dir
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.session_ttl = session_ttl_hours * 3600
+        self.max_sessions = max_sessions
+        self.store = store
+        self.loader = loader
+        self.frame_sources = dict(frame_sources or {})
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+        self.reloads = 0
+        os.makedirs(spill_dir, exist_ok=True)
+    
+    def get(self, session_id=None):
+        """获取会话，不存在时创建：数据库中保存过的会话读回它的值，
+        新的界面会话从默认会话复制当前文件（定时任务的结果保存在默认会话中）
+        
+        Args:
+            session_id: 会话ID，默认为当前会话
+        
+        Returns:
+            Session: 会话
+        """
+        session_id = session_id or current_session_id()
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = Session(session_id)
+                values = self.load_values(session_id)
+                if values is None and session_id != DEFAULT_SESSION:
+                    values = dict(self.refresh_default().values)
+                session.values.update(values or {})
+                self.sessions[session_id] = session
+            else:
+                self.sessions.move_to_end(session_id)
+            session.last_access = time.time()
+        if len(self.sessions) > self.max_sessions:
+            self.expire()
+        return session
+    
+    def refresh_default(self):
+        """从数据库读回默认会话的值（定时任务可能在其他应用进程中更新了它），文件变化的数据在下次使用时重新读取
+        
+        调用时必须持有self.lock
+        
+        Returns:
+            Session: 默认会话
+        """
+        session = self.sessions.get(DEFAULT_SESSION)
+        if session is None:
+            session = Session(DEFAULT_SESSION)
+            self.sessions[DEFAULT_SESSION] = session
+        values = self.load_values(DEFAULT_SESSION)
+        if not values:
+            return session
+        with session.lock:
+            for name, key in self.frame_sources.items():
+                if key in values and values[key] != session.values.get(key):
+                    session.frames.pop(name, None)
+                    session.sizes.pop(name, None)
+                    self.discard_spilled(session, name)
+                    session.cache.clear()
+            session.values.update(values)
+        return session
+    
+    def get_value(self, key, default=None, session_id=None):
+        """读取会话中的值"""
+        return self.get(session_id).values.get(key, default)
+    
+    def set_value(self, key, value, session_id=None):
+        """修改会话中的值并保存到数据库"""
+        session = self.get(session_id)
+        with session.lock:
+            session.values[key] = value
+            self.save_values(session)
+    
+    def load_values(self, session_id):
+        """从数据库读取会话的值
+        
+        Returns:
+            dict: 会话的值，没有保存过或读取失败时返回None
+        """
+        if self.store is None:
+            return None
+        try:
+            return self.store.load_session(session_id)
+        except Exception as e:
+            print(f"读取会话 {session_id} 失败: {e}")
+            return None
+    
+    def save_values(self, session):
+        """把会话的值保存到数据库，其他应用进程和重启后的进程可以读回"""
+        if self.store is None:
+            return
+        try:
+            self.store.save_session(session.id, session.values)
+        except Exception as e:
+            print(f"保存会话 {session.id} 失败: {e}")
+    
+    def get_frame(self, name, session_id=None):
+        """获取会话中的DataFrame，已换出到磁盘时读回，后台读取尚未完成时等待，
+        本进程中还没有该数据时（会话在其他进程或重启前创建）按会话中保存的文件路径读取
+        
+        Args:
+            name: 数据名称，如jobs、matches
+            session_id: 会话ID，默认为当前会话
+        
+        Returns:
+            DataFrame: 数据，不存在时返回None
+        """
+        session = self.get(session_id)
+        with session.lock:
+            frame = session.frames.get(name)
+            if isinstance(frame, Future):
+                frame = frame.result()
+                self.store_frame(session, name, frame)
+            elif frame is None and name in session.spilled:
+                frame = self.reload(session, name)
+            elif name not in session.frames:
+                frame = self.load_source(session, name)
+        self.enforce_budget(session.id)
+        return frame
+    
+    def load_source(self, session, name):
+        """按会话中保存的文件路径读取DataFrame
+        
+        Returns:
+            DataFrame: 数据，没有文件路径或读取失败时返回None
+        """
+        key = self.frame_sources.get(name)
+        file_path = session.values.get(key) if key else None
+        if not file_path:
+            return None
+        if session.id != DEFAULT_SESSION and file_path == self.get_value(key, session_id=DEFAULT_SESSION):
+            # 与默认会话是同一个文件时共用默认会话的数据，内存计入默认会话
+            frame = self.get_frame(name, DEFAULT_SESSION)
+            if frame is not None:
+                session.frames[name] = frame
+                return frame
+        if self.loader is None:
+            return None
+        try:
+            frame = self.loader(name, file_path)
+        except Exception as e:
+            print(f"读取会话 {session.id} 的 {name} 数据失败: {e}")
+            return None
+        self.store_frame(session, name, frame)
+        return frame
+    
+    def set_frame(self, name, frame, session_id=None):
+        """保存会话中的DataFrame
+        
+        Args:
+            name: 数据名称
+            frame: DataFrame，或者后台读取DataFrame的Future
+            session_id: 会话ID，默认为当前会话
+        """
+        session = self.get(session_id)
+        with session.lock:
+            self.discard_spilled(session, name)
+            if isinstance(frame, Future):
+                session.frames[name] = frame
+                session.sizes.pop(name, None)
+                return
+            self.store_frame(session, name, frame)
+        self.enforce_budget(session.id)
+    
+    def store_frame(self, session, name, frame):
+        """把DataFrame放入会话并记录占用的内存"""
+        session.frames[name] = frame
+        session.sizes[name] = frame_bytes(frame) if frame is not None else 0
+    
+    def spill_path(self, session, name):
+        """换出文件路径"""
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '_', session.id)
+        return os.path.join(self.spill_dir, safe_id, f"{name}.pkl")
+    
+    def spill(self, session):
+        """把会话内存中的DataFrame写到磁盘并释放内存
+        
+        Returns:
+            int: 释放的字节数
+        """
+        freed = 0
+        with session.lock:
+            session.cache.clear()
+            for name, frame in list(session.frames.items()):
+                if isinstance(frame, Future) or frame is None or name not in session.sizes:
+                    continue
+                path = self.spill_path(session, name)
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    frame.to_pickle(path)
+                except Exception as e:
+                    print(f"换出会话 {session.id} 的 {name} 数据失败: {e}")
+                    continue
+                session.spilled[name] = path
+                freed += session.sizes.pop(name, 0)
+                del session.frames[name]
+        if freed:
+            self.evictions += 1
+        return freed
+    
+    def reload(self, session, name):
+        """从磁盘读回换出的DataFrame"""
+        import pandas as pd
+        path = session.spilled.pop(name)
+        try:
+            frame = pd.read_pickle(path)
+        except Exception as e:
+            print(f"读回会话 {session.id} 的 {name} 数据失败: {e}")
+            return None
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        self.store_frame(session, name, frame)
+        self.reloads += 1
+        return frame
+    
+    def discard_spilled(self, session, name):
+        """删除已被新数据取代的换出文件"""
+        path = session.spilled.pop(name, None)
+        if path and os.path.exists(path):
+            os.remove(path)
+    
+    def memory_bytes(self):
+        """所有会话内存中的DataFrame占用的字节数"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+        return sum(session.memory_bytes() for session in sessions)
+    
+    def enforce_budget(self, active_id=None):
+        """超出内存预算时按最久未使用的顺序换出会话，正在使用的会话不换出
+        
+        Args:
+            active_id: 正在使用的会话ID
+        """
+        total = self.memory_bytes()
+        if total <= self.memory_budget:
+            return
+        with self.lock:
+            candidates = [session for session in self.sessions.values()
+                          if session.id != active_id and session.sizes]
+        for session in candidates:
+            if total <= self.memory_budget:
+                break
+            total -= self.spill(session)
+    
+    def remove(self, session_id):
+        """从内存中删除会话和它换出的文件，数据库中的值保留到过期"""
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        with session.lock:
+            for name in list(session.spilled):
+                self.discard_spilled(session, name)
+            session.frames.clear()
+            session.sizes.clear()
+            session.cache.clear()
+    
+    def expire(self):
+        """删除空闲超过保留时间的会话，会话数超出上限时删除最久未使用的会话
+        
+        Returns:
+            int: 删除的会话数
+        """
+        cutoff = time.time() - self.session_ttl
+        with self.lock:
+            sessions = [session for session in self.sessions.values() if session.id != DEFAULT_SESSION]
+            expired = [session.id for session in sessions if session.last_access < cutoff]
+            overflow = len(self.sessions) - len(expired) - self.max_sessions
+            if overflow > 0:
+                expired += [session.id for session in sessions if session.id not in expired][:overflow]
+        for session_id in expired:
+            self.remove(session_id)
+        if self.store is not None:
+            try:
+                self.store.delete_sessions(cutoff, keep=(DEFAULT_SESSION,))
+            except Exception as e:
+                print(f"删除过期会话失败: {e}")
+        return len(expired)
+    
+    def get_stats(self):
+        """获取会话统计
+        
+        Returns:
+            dict: 会话数、内存占用、换出数据数和换出/读回次数
+        """
+        with self.lock:
+            sessions = list(self.sessions.values())
+        return {
+            "sessions": len(sessions),
+            "memory_mb": round(sum(session.memory_bytes() for session in sessions) / 1024 / 1024, 2),
+            "budget_mb": round(self.memory_budget / 1024 / 1024, 2),
+            "spilled_frames": sum(len(session.spilled) for session in sessions),
+            "evictions": self.evictions,
+            "reloads": self.reloads
+        }
+    
+    def close(self):
+        """删除本进程的换出文件，数据库中的会话值保留"""
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+# 测试代码
+if __name__ == "__main__":
+    import tempfile
+    import pandas as pd
+    
+    manager = SessionManager(os.path.join(tempfile.mkdtemp(), "sessions"), memory_budget_mb=2)
+    
+    for user in ["alice", "bob", "carol"]:
+        with use_session(user):
+            manager.set_value("resume_file", f"/tmp/{user}.md")
+            frame = pd.DataFrame({"TITLE": [f"{user} job {i}" for i in range(10000)], "SCORE": range(10000)})
+            manager.set_frame("jobs", frame)
+            print(f"{user}: 内存 {manager.get_stats()['memory_mb']} MB")
+    
+    print(f"换出后统计: {manager.get_stats()}")
+    with use_session("alice"):
+        jobs = manager.get_frame("jobs")
+        print(f"alice 读回 {len(jobs)} 行，第一行: {jobs.iloc[0]['TITLE']}，简历: {manager.get_value('resume_file')}")
+    print(f"读回后统计: {manager.get_stats()}")
+    manager.close()
@@ -6,21 +6,75 @@
 整合所有组件并构建用户界面，提供完整的求职助手系统
 """
 
-import os
-import sys
-import json
-import pandas as pd
-from datetime import datetime
-import gradio as gr
-import markdown
-import re
-import importlib.util
+from startup_timer import StartupTimer
 
-# 导入自定义模块
-from job_search_system import JobSearchSystem
-from cover_letter_generator import CoverLetterGenerator
-from job_matching_system import JobMatchingSystem
-from automated_application_system import AutomatedApplicationSystem
+# 模块级的启动耗时统计，记录主程序自身的导入耗时
+STARTUP_TIMER = StartupTimer()
+
+with STARTUP_TIMER.stage("基础模块", "import"):
+    import os
+    import sys
+    import json
+    import signal
+    import threading
+    import uuid
+    import pandas as pd
+    from datetime import datetime
+    import markdown
+    import re
+    import importlib
+    import importlib.util
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import contextmanager
+
+# 导入自定义模块（较重的子系统在首次使用时才导入，见COMPONENTS）
+with STARTUP_TIMER.stage("数据存储模块", "import"):
+    from application_queue import ApplicationQueue
+    from job_store import get_store
+    from config_store import ConfigStore
+    from task_manager import TaskManager
+    from table_views import TableView, ROW_ID
+    from salary_index import load_rates, normalize_salaries, BASE_CURRENCY
+    from geo_index import resolve_locations
+    from report_engine import get_report_engine, score_column
+    from scheduler_service import SchedulerService
+    import metrics
+    from profiler import SamplingProfiler
+    from job_schema import get_description_store, compact_jobs, with_descriptions, memory_bytes, memory_report, DESCRIPTION_ID
+    from session_state import SessionManager, DEFAULT_SESSION, current_session_id, use_session, session_id_from_request
+
+# 子系统的模块和类名，首次访问对应属性时才导入模块并创建实例；
+# 这些模块会导入selenium、sklearn、NLTK和jobspy，是启动耗时的主要来源
+COMPONENTS = {
+    "job_search": ("job_search_system", "JobSearchSystem"),
+    "cover_letter_generator": ("cover_letter_generator", "CoverLetterGenerator"),
+    "job_matcher": ("job_matching_system", "JobMatchingSystem"),
+    "application_system": ("automated_application_system", "AutomatedApplicationSystem")
+}
+
+def session_value(key, config_key=None, doc=""):
+    """当前会话中的值对应的属性，默认会话的值同时保存到配置中
+    
+    Args:
+        key: 会话中的键
+        config_key: 默认会话同步保存的配置键
+        doc: 属性说明
+    
+    Returns:
+        property: 属性
+    """
+    def getter(self):
+        return self.sessions.get_value(key, "")
+    
+    def setter(self, value):
+        self.sessions.set_value(key, value)
+        if config_key and current_session_id() == DEFAULT_SESSION:
+            self.update_config(config_key, value)
+    return property(getter, setter, doc=doc)
+
+def resume_stamp(resume_file):
+    """简历文件的路径和修改时间，用于判断匹配结果是否基于当前版本的简历"""
+    return f"{os.path.abspath(resume_file)}:{os.path.getmtime(resume_file)}"
 
 class SmartJobAssistant:
     """智能求职助手类，整合所有组件并提供用户界面"""
@@ -31,47 +85,443 @@ class SmartJobAssistant:
         Args:
             base_dir: 基础目录
         """
+        self.startup_timer = STARTUP_TIMER
         self.base_dir = base_dir
         self.data_dir = os.path.join(base_dir, "job_data")
         self.resume_dir = os.path.join(base_dir, "resumes")
-        self.config_file = os.path.join(self.data_dir, "assistant_config.json")
         
         # 确保目录存在
-        self.ensure_directories()
+        with self.startup_timer.stage("创建目录"):
+            self.ensure_directories()
+        with self.startup_timer.stage("打开数据库"):
+            self.store = get_store(self.data_dir)
         
         # 加载配置
-        self.config = self.load_config()
-        
-        # 初始化组件
-        self.job_search = JobSearchSystem(self.data_dir)
-        self.cover_letter_generator = CoverLetterGenerator(self.data_dir)
-        self.job_matcher = JobMatchingSystem(self.data_dir)
-        self.application_system = AutomatedApplicationSystem(self.data_dir)
-        
-        # 当前简历文件
-        self.current_resume_file = self.config.get("current_resume_file", "")
-        self.current_resume_content = ""
-        if self.current_resume_file and os.path.exists(self.current_resume_file):
-            with open(self.current_resume_file, 'r', encoding='utf-8') as f:
-                self.current_resume_content = f.read()
+        with self.startup_timer.stage("加载配置"):
+            self.config = self.load_config()
+        
+        # 指标日志和指标接口（设置metrics_port后启动，进程监管下每个工作进程使用端口metrics_port+序号）
+        with self.startup_timer.stage("启动指标"):
+            self.start_metrics()
+        
+        # 耗时操作在后台任务中执行
+        self.tasks = TaskManager(self.config.get("task_limits"))
+        
+        # 子系统在首次使用时创建
+        self.components = {}
+        # 每个子系统一把锁，创建一个子系统时不会阻塞其他子系统的创建和使用
+        self.component_locks = {}
+        self.component_lock = threading.Lock()
+        with self.startup_timer.stage("打开申请队列"):
+            self.application_queue = ApplicationQueue(os.path.join(self.data_dir, "application_queue.db"))
+        
+        # 职位数据使用紧凑结构，职位描述保存在描述库中
+        with self.startup_timer.stage("打开描述库"):
+            self.descriptions = get_description_store(self.data_dir)
+        self.memory_stats = {}
+        
+        # 读取职位数据时把薪资换算为基准货币的年薪（汇率表可以在数据目录的exchange_rates.json中修改）
+        self.salary_rates = load_rates(os.path.join(self.data_dir, "exchange_rates.json"))
+        self.salary_currency = self.config.get("salary_currency", BASE_CURRENCY)
+        
+        # 当前简历、工作数据和匹配结果按会话保存，每个界面用户互不影响；
+        # 配置中保存的当前文件属于默认会话（命令行使用和新会话之前的状态）；
+        # 会话的值保存在数据库中，滚动重启或换到其他应用进程后按其中的文件路径读回数据，换出目录按进程区分
+        self.sessions = SessionManager(
+            os.path.join(self.data_dir, "sessions", str(os.getpid())),
+            memory_budget_mb=self.config.get("session_memory_mb", 512),
+            session_ttl_hours=self.config.get("session_ttl_hours", 24),
+            store=self.store,
+            loader=self.read_frame,
+            frame_sources={"jobs": "jobs_file", "matches": "matches_file"}
+        )
+        default_session = self.sessions.get(DEFAULT_SESSION)
+        resume_file = self.config.get("current_resume_file", "")
+        default_session.values["resume_file"] = resume_file
+        default_session.values["resume_content"] = ""
+        default_session.values["matched_resume"] = self.config.get("matched_resume", "")
+        if resume_file and os.path.exists(resume_file):
+            with self.startup_timer.stage("读取简历", "load"):
+                with open(resume_file, 'r', encoding='utf-8') as f:
+                    default_session.values["resume_content"] = f.read()
+        
+        # 默认会话的工作数据和匹配结果在后台线程中读取，首次使用时才等待读取完成
+        self.background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        for name, config_key in [("jobs", "current_jobs_file"), ("matches", "current_matches_file")]:
+            file_path = self.config.get(config_key, "")
+            default_session.values[f"{name}_file"] = file_path
+            self.sessions.set_frame(name, self.load_frame_async(name, file_path), DEFAULT_SESSION)
+        
+        # 定时运行保存的搜索、增量匹配和状态跟踪；进程监管下只在第一个工作进程中运行，避免重复执行
+        self.scheduler = SchedulerService(
+            self.store, self.submit_scheduled, self.tasks.status,
+            max_concurrent=self.config.get("scheduler_max_concurrent", 2),
+            jitter_seconds=self.config.get("scheduler_jitter_seconds", 120)
+        )
+        # 配置项schedules中的每一项是add_schedule的参数，如{"schedule_id": "daily", "kind": "search", "cron": "0 8 * * *", "params": {...}}
+        for definition in self.config.get("schedules", []):
+            self.scheduler.add(**definition)
+        if self.config.get("scheduler_enabled", True) and int(os.environ.get("JOB_ASSISTANT_WORKER", 0)) == 0:
+            self.scheduler.start()
+        
+        self.install_shutdown_handler()
+        
+        # UI出现后在后台预先创建子系统，使第一次操作不必等待导入
+        prewarm_delay = self.config.get("prewarm_delay", 5)
+        if prewarm_delay is not None and prewarm_delay >= 0:
+            timer = threading.Timer(prewarm_delay, self.prewarm)
+            timer.daemon = True
+            timer.start()
+    
+    def install_shutdown_handler(self):
+        """收到SIGTERM时写入未保存的配置和历史记录后退出（进程监管停止或滚动重启应用时使用）"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        
+        def shutdown(signum, frame):
+            print("收到停止信号，正在保存数据...")
+            self.shutdown()
+            sys.exit(0)
+        signal.signal(signal.SIGTERM, shutdown)
+    
+    def shutdown(self):
+        """写入未保存的配置和历史记录"""
+        try:
+            self.scheduler.stop()
+            self.tasks.shutdown()
+            self.sessions.close()
+            self.config.close()
+            self.store.flush()
+            # 写入剩余的span日志
+            metrics.configure(None)
+        except Exception as e:
+            print(f"保存数据失败: {e}")
+    
+    def component_class(self, name):
+        """导入子系统所在的模块并返回子系统的类
         
-        # 当前工作数据
-        self.current_jobs_file = self.config.get("current_jobs_file", "")
-        self.current_jobs_df = pd.DataFrame()
-        if self.current_jobs_file and os.path.exists(self.current_jobs_file):
-            try:
-                self.current_jobs_df = pd.read_csv(self.current_jobs_file)
-            except:
-                pass
-        
-        # 当前匹配结果
-        self.current_matches_file = self.config.get("current_matches_file", "")
-        self.current_matches_df = pd.DataFrame()
-        if self.current_matches_file and os.path.exists(self.current_matches_file):
+        Args:
+            name: 子系统名称，见COMPONENTS
+        
+        Returns:
+            type: 子系统的类
+        """
+        module_name, class_name = COMPONENTS[name]
+        if module_name in sys.modules:
+            return getattr(sys.modules[module_name], class_name)
+        with self.startup_timer.stage(module_name, "import"):
+            module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+    
+    def get_component(self, name):
+        """获取子系统，第一次调用时导入模块并创建实例
+        
+        Args:
+            name: 子系统名称，见COMPONENTS
+        
+        Returns:
+            子系统实例
+        """
+        component = self.components.get(name)
+        if component is not None:
+            return component
+        with self.component_lock:
+            lock = self.component_locks.setdefault(name, threading.RLock())
+        with lock:
+            if name not in self.components:
+                component_class = self.component_class(name)
+                with self.startup_timer.stage(f"创建{component_class.__name__}"):
+                    self.components[name] = component_class(self.data_dir)
+            return self.components[name]
+    
+    @property
+    def job_search(self):
+        """工作搜索系统"""
+        return self.get_component("job_search")
+    
+    @property
+    def cover_letter_generator(self):
+        """自荐信生成系统"""
+        return self.get_component("cover_letter_generator")
+    
+    @property
+    def job_matcher(self):
+        """工作匹配系统"""
+        return self.get_component("job_matcher")
+    
+    @property
+    def application_system(self):
+        """自动申请系统"""
+        return self.get_component("application_system")
+    
+    def prewarm(self, names=None):
+        """在当前线程中依次创建尚未创建的子系统
+        
+        Args:
+            names: 子系统名称列表，默认为所有子系统
+        """
+        for name in names or COMPONENTS:
             try:
-                self.current_matches_df = pd.read_csv(self.current_matches_file)
-            except:
-                pass
+                self.get_component(name)
+            except Exception as e:
+                print(f"预先创建子系统 {name} 失败: {e}")
+    
+    def load_frame_async(self, name, file_path):
+        """在后台线程中读取CSV文件
+        
+        Args:
+            name: 数据名称，用于耗时统计
+            file_path: CSV文件路径
+        
+        Returns:
+            Future: 读取结果，文件不存在或读取失败时为空DataFrame
+        """
+        def load():
+            with self.startup_timer.stage(f"读取{name}数据", "load"):
+                return self.read_frame(name, file_path)
+        return self.background.submit(load)
+    
+    def read_frame(self, name, file_path):
+        """读取CSV文件并转换为紧凑结构
+        
+        Args:
+            name: 数据名称，jobs或matches
+            file_path: CSV文件路径
+        
+        Returns:
+            DataFrame: 数据，文件不存在或读取失败时为空DataFrame
+        """
+        if not file_path or not os.path.exists(file_path):
+            return pd.DataFrame()
+        try:
+            return self.compact_frame(name, pd.read_csv(file_path))
+        except Exception as e:
+            print(f"读取 {file_path} 失败: {e}")
+            return pd.DataFrame()
+    
+    def compact_frame(self, name, frame):
+        """把职位数据转换为紧凑结构（描述移入描述库，薪资换算为年薪，位置解析为地点），并记录转换前后的内存占用
+        
+        Args:
+            name: 数据名称，用于内存报告
+            frame: 职位或匹配结果DataFrame
+        
+        Returns:
+            DataFrame: 紧凑的DataFrame
+        """
+        before = memory_bytes(frame)
+        frame = resolve_locations(normalize_salaries(frame, self.salary_rates, self.salary_currency))
+        compact = compact_jobs(frame, self.descriptions)
+        self.memory_stats[name] = (before, memory_bytes(compact))
+        return compact
+    
+    def memory_report(self):
+        """生成内存报告：职位数据转换前后的内存占用、描述库大小和会话内存
+        
+        Returns:
+            str: Markdown格式的报告
+        """
+        rows = [(name, before, after) for name, (before, after) in self.memory_stats.items()]
+        descriptions = self.descriptions.stats()
+        sessions = self.sessions.get_stats()
+        return "\n".join([
+            "# 内存报告", "",
+            memory_report(rows) if rows else "尚未读取职位数据", "",
+            f"- 描述库: {descriptions['descriptions']} 条描述，压缩后 {descriptions['compressed_mb']} MB",
+            f"- 会话: {sessions['sessions']} 个，内存中的数据 {sessions['memory_mb']} MB / 预算 {sessions['budget_mb']} MB"
+        ])
+    
+    def get_frame(self, name):
+        """获取当前会话的数据，后台读取尚未完成时等待，已换出到磁盘时读回
+        
+        Args:
+            name: 数据名称，jobs或matches
+        
+        Returns:
+            DataFrame: 数据
+        """
+        frame = self.sessions.get_frame(name)
+        return frame if frame is not None else pd.DataFrame()
+    
+    @property
+    def current_jobs_df(self):
+        """当前会话的工作数据"""
+        return self.get_frame("jobs")
+    
+    @current_jobs_df.setter
+    def current_jobs_df(self, value):
+        self.sessions.set_frame("jobs", value)
+    
+    @property
+    def current_matches_df(self):
+        """当前会话的匹配结果"""
+        return self.get_frame("matches")
+    
+    @current_matches_df.setter
+    def current_matches_df(self, value):
+        self.sessions.set_frame("matches", value)
+    
+    current_resume_file = session_value("resume_file", "current_resume_file", "当前会话的简历文件")
+    current_resume_content = session_value("resume_content", doc="当前会话的简历内容")
+    current_jobs_file = session_value("jobs_file", "current_jobs_file", "当前会话的工作数据文件")
+    current_matches_file = session_value("matches_file", "current_matches_file", "当前会话的匹配结果文件")
+    matched_resume = session_value("matched_resume", "matched_resume", "当前匹配结果使用的简历版本（路径和修改时间）")
+    
+    def session_for(self, request):
+        """在Gradio回调中切换到请求所属的会话
+        
+        用法: with self.session_for(request): ...，回调函数声明request: gr.Request参数即可得到请求
+        
+        Args:
+            request: gr.Request
+        
+        Returns:
+            上下文管理器
+        """
+        return use_session(session_id_from_request(request))
+    
+    def session_stats(self):
+        """获取会话统计（会话数、内存占用和换出次数）"""
+        return self.sessions.get_stats()
+    
+    def table_view(self, name):
+        """获取当前会话数据的表格视图，数据变化后重新创建
+        
+        Args:
+            name: 数据名称，jobs或matches
+        
+        Returns:
+            TableView: 表格视图
+        """
+        frame = self.get_frame(name)
+        views = self.sessions.get().cache.setdefault("views", {})
+        view = views.get(name)
+        if view is None or view.frame is not frame:
+            view = TableView(frame, page_size=self.config.get("table_page_size", 25))
+            views[name] = view
+        return view
+    
+    def table_page(self, name, page=1, sort_by=None, ascending=True, query=None):
+        """获取结果表格的一页，界面表格只显示这一页，不包含职位描述
+        
+        Args:
+            name: 数据名称，jobs或matches
+            page: 页码（从1开始）
+            sort_by: 排序列
+            ascending: 是否升序
+            query: 关键词筛选
+        
+        Returns:
+            DataFrame: 当前页的数据（第一列为ROW_ID）
+            str: 分页信息
+        """
+        result = self.table_view(name).page(page, sort_by, ascending, query)
+        return result["rows"], f"第 {result['page']}/{result['pages']} 页，共 {result['total']} 条"
+    
+    def row_detail(self, name, row_id):
+        """获取表格中一行的完整信息，展开行时调用
+        
+        Args:
+            name: 数据名称，jobs或matches
+            row_id: 当前页数据中的ROW_ID
+        
+        Returns:
+            str: Markdown格式的详情
+        """
+        detail = self.table_view(name).detail(row_id)
+        if detail is None:
+            return "没有找到该职位"
+        title = f"### {detail.get('TITLE', '')} - {detail.get('COMPANY', '')}"
+        fields = [f"- **{column}**: {value}" for column, value in detail.items()
+                  if column not in ("TITLE", "COMPANY", "DESCRIPTION", ROW_ID) and value is not None]
+        return "\n".join([title, ""] + fields + ["", str(detail.get("DESCRIPTION") or "")])
+    
+    def start_metrics(self):
+        """设置span日志并按配置启动指标接口"""
+        metrics.configure(
+            self.config.get("metrics_log", os.path.join(self.data_dir, "metrics", "spans.jsonl")),
+            log_min_seconds=self.config.get("metrics_log_min_ms", 50) / 1000
+        )
+        self.metrics_server = None
+        port = self.config.get("metrics_port")
+        if port:
+            port += int(os.environ.get("JOB_ASSISTANT_WORKER", 0))
+            self.metrics_server = metrics.start_metrics_server(port, self.config.get("metrics_host", "127.0.0.1"))
+    
+    def metrics_report(self, limit=30):
+        """生成耗时报告，按总耗时列出各代码段
+        
+        Args:
+            limit: 最多列出的行数
+        
+        Returns:
+            str: Markdown格式的报告
+        """
+        series = metrics.REGISTRY.snapshot().get(metrics.SPAN_SECONDS, {}).get("series", [])
+        series = sorted(series, key=lambda item: -item["sum"])[:limit]
+        lines = ["# 耗时统计", "", "| 代码段 | 标签 | 次数 | 总耗时(s) | 平均(ms) |", "| --- | --- | ---: | ---: | ---: |"]
+        for item in series:
+            labels = dict(item["labels"])
+            name = labels.pop("span", "")
+            label_text = ", ".join(f"{key}={value}" for key, value in labels.items())
+            lines.append(f"| {name} | {label_text} | {item['count']} | {item['sum']:.2f} | {item['mean'] * 1000:.1f} |")
+        return "\n".join(lines)
+    
+    @contextmanager
+    def profiled(self, operation, enabled=None):
+        """对一次操作进行采样性能分析
+        
+        Args:
+            operation: 操作名称，如match、apply
+            enabled: 是否分析，默认为None（操作在配置profile_operations中时分析）
+        
+        Yields:
+            SamplingProfiler: 性能分析，output_file为结果文件路径（折叠调用栈格式），不分析时为None；
+            操作创建的工作线程需通过add_thread加入分析
+        """
+        if enabled is None:
+            enabled = operation in self.config.get("profile_operations", [])
+        if not enabled:
+            yield None
+            return
+        
+        # 同一秒内开始的操作（如并发的匹配）使用不同的文件
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        profile_file = os.path.join(self.data_dir, "profiles", f"{operation}_{timestamp}_{uuid.uuid4().hex[:8]}.folded")
+        profiler = SamplingProfiler(self.config.get("profile_interval_ms", 5) / 1000, output_file=profile_file)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            profiler.write_folded()
+            print(profiler.summary(5))
+            print(f"性能分析结果已保存到: {profile_file}（可用flamegraph.pl或speedscope查看）")
+    
+    def attach_profile(self, history, records, profiler):
+        """把分析结果文件路径写入本次操作追加的历史记录
+        
+        Args:
+            history: 历史记录表
+            records: 本次操作追加的记录（history.capture收集的记录，不包含其他请求同时追加的记录）
+            profiler: 性能分析，为None时不处理
+        """
+        if profiler is None or not records:
+            return
+        history.flush()
+        for record in records:
+            record["profile_file"] = profiler.output_file
+        history.update(*records)
+        history.flush()
+    
+    def startup_report(self):
+        """生成启动耗时报告，包括模块导入、组件创建和数据读取的耗时
+        
+        Returns:
+            str: 报告文本
+        """
+        created = ", ".join(self.components) or "无"
+        return self.startup_timer.report() + f"\n\n已创建的子系统: {created}"
     
     def ensure_directories(self):
         """确保必要的目录存在"""
@@ -81,33 +531,21 @@ class SmartJobAssistant:
                 print(f"创建目录: {directory}")
     
     def load_config(self):
-        """加载配置"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载配置失败: {e}")
-                return {}
-        return {}
+        """加载配置（内存中的配置存储，修改由后台线程延迟写入）"""
+        return ConfigStore(self.store)
     
     def save_config(self):
-        """保存配置"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+        """立即保存所有未写入的配置修改"""
+        self.config.flush()
     
     def update_config(self, key, value):
-        """更新配置
+        """更新配置，只修改内存中的值，不等待写入
         
         Args:
             key: 配置键
             value: 配置值
         """
         self.config[key] = value
-        self.save_config()
     
     def set_current_resume(self, resume_file):
         """设置当前简历
@@ -122,7 +560,6 @@ class SmartJobAssistant:
             return "简历文件不存在"
         
         self.current_resume_file = resume_file
-        self.update_config("current_resume_file", resume_file)
         
         try:
             with open(resume_file, 'r', encoding='utf-8') as f:
@@ -154,7 +591,6 @@ class SmartJobAssistant:
             # 更新当前简历
             self.current_resume_file = file_path
             self.current_resume_content = content
-            self.update_config("current_resume_file", file_path)
             
             return file_path
         except Exception as e:
@@ -197,33 +633,36 @@ class SmartJobAssistant:
         
         # 更新当前工作数据
         if not jobs_df.empty:
-            self.current_jobs_df = jobs_df
-            
-            # 保存到文件
+            # 保存到文件（包含完整描述）
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             jobs_file = os.path.join(self.data_dir, f"jobs_{timestamp}.csv")
             jobs_df.to_csv(jobs_file, index=False)
             
+            # 内存中使用紧凑结构
+            jobs_df = self.compact_frame("jobs", jobs_df)
+            self.current_jobs_df = jobs_df
+            
             # 更新配置
             self.current_jobs_file = jobs_file
-            self.update_config("current_jobs_file", jobs_file)
         
         return jobs_df
     
     def filter_jobs(self, jobs_df=None, keywords=None, exclude_keywords=None, 
                    min_salary=None, max_salary=None, companies=None,
-                   locations=None, job_types=None):
+                   locations=None, job_types=None, radius_km=None, remote_only=False):
         """过滤工作结果
         
         Args:
             jobs_df: 工作结果DataFrame，默认为当前工作数据
             keywords: 包含的关键词列表
             exclude_keywords: 排除的关键词列表
-            min_salary: 最低薪资
-            max_salary: 最高薪资
+            min_salary: 最低年薪（基准货币，配置项salary_currency）
+            max_salary: 最高年薪（基准货币）
             companies: 公司列表
             locations: 位置列表
             job_types: 工作类型列表
+            radius_km: 位置范围（公里），为None时只匹配位置本身
+            remote_only: 只保留远程职位
             
         Returns:
             DataFrame: 过滤后的工作结果
@@ -260,7 +699,9 @@ class SmartJobAssistant:
             max_salary=max_salary,
             companies=companies,
             locations=locations,
-            job_types=job_types
+            job_types=job_types,
+            radius_km=radius_km,
+            remote_only=remote_only
         )
         
         return filtered_df
@@ -286,16 +727,18 @@ class SmartJobAssistant:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = os.path.join(self.data_dir, f"job_search_report_{timestamp}.md")
         
-        report_text = self.job_search.generate_job_search_report(jobs_df, report_file)
+        # 与JobSearchSystem.generate_job_search_report使用同一个报告生成实例，不需要为生成报告导入搜索系统
+        report_text = get_report_engine().search_report(jobs_df, report_file)
         
         return report_text, report_file
     
-    def match_jobs(self, resume_file=None, jobs_df=None):
+    def match_jobs(self, resume_file=None, jobs_df=None, profile=None):
         """匹配工作
         
         Args:
             resume_file: 简历文件路径，默认为当前简历
             jobs_df: 工作DataFrame，默认为当前工作数据
+            profile: 是否进行性能分析，默认为None（按配置profile_operations）
             
         Returns:
             DataFrame: 匹配结果DataFrame
@@ -315,23 +758,88 @@ class SmartJobAssistant:
             return pd.DataFrame()
         
         # 执行匹配
-        matches_df = self.job_matcher.match_jobs(resume_file, jobs_df)
+        # 整批匹配记录一个span（不为每个职位的文本处理单独记录）
+        with self.job_matcher.history.capture() as records, self.profiled("match", profile) as profiler, \
+                metrics.span("match_jobs") as current:
+            matches_df = self.job_matcher.match_jobs(resume_file, with_descriptions(jobs_df))
+            current["jobs"] = len(jobs_df)
+        self.attach_profile(self.job_matcher.history, records, profiler)
         
         # 更新当前匹配结果
         if not matches_df.empty:
-            self.current_matches_df = matches_df
-            
-            # 保存到文件
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            matches_file = os.path.join(self.data_dir, f"job_matches_{timestamp}.csv")
-            matches_df.to_csv(matches_file, index=False)
-            
-            # 更新配置
-            self.current_matches_file = matches_file
-            self.update_config("current_matches_file", matches_file)
+            matches_df = self.save_matches(matches_df, resume_file)
         
         return matches_df
     
+    def save_matches(self, matches_df, resume_file):
+        """保存匹配结果并设为当前匹配结果
+        
+        Args:
+            matches_df: 包含完整描述的匹配结果DataFrame
+            resume_file: 匹配使用的简历，记录下来供增量匹配判断简历是否变化
+        
+        Returns:
+            DataFrame: 紧凑结构的匹配结果
+        """
+        # 保存到文件（包含完整描述）
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        matches_file = os.path.join(self.data_dir, f"job_matches_{timestamp}.csv")
+        matches_df.drop(columns=[DESCRIPTION_ID], errors="ignore").to_csv(matches_file, index=False)
+        
+        # 内存中使用紧凑结构
+        matches_df = self.compact_frame("matches", matches_df)
+        self.current_matches_df = matches_df
+        self.matched_resume = resume_stamp(resume_file)
+        
+        # 更新配置
+        self.current_matches_file = matches_file
+        return matches_df
+    
+    def refresh_matches(self, resume_file=None, task=None):
+        """增量匹配：只匹配当前工作数据中还没有匹配过的工作，并与已有的匹配结果合并；
+        简历修改过或没有匹配结果时全部重新匹配（定时任务在每次搜索之后运行）
+        
+        Args:
+            resume_file: 简历文件路径，默认为当前简历
+            task: 后台任务，用于报告进度和响应取消，默认为None
+        
+        Returns:
+            DataFrame: 合并后的匹配结果
+        """
+        if resume_file is None:
+            resume_file = self.current_resume_file
+        if not resume_file or not os.path.exists(resume_file):
+            return pd.DataFrame()
+        jobs_df = self.current_jobs_df
+        if jobs_df.empty:
+            return self.current_matches_df
+        
+        previous = self.current_matches_df
+        incremental = not previous.empty and "JOB_URL" in jobs_df.columns and "JOB_URL" in previous.columns \
+            and self.matched_resume == resume_stamp(resume_file)
+        new_jobs = jobs_df[~jobs_df["JOB_URL"].isin(previous["JOB_URL"])] if incremental else jobs_df
+        if task is not None:
+            task.report(progress=0.05, message=f"需要匹配 {len(new_jobs)} 个工作")
+        if new_jobs.empty:
+            return previous
+        
+        with metrics.span("match_jobs") as current:
+            matches_df = self.job_matcher.match_jobs(resume_file, with_descriptions(new_jobs))
+            current["jobs"] = len(new_jobs)
+        if task is not None:
+            task.check_cancelled()
+        if matches_df.empty:
+            return previous
+        if incremental:
+            matches_df = pd.concat([with_descriptions(previous), matches_df], ignore_index=True)
+            column = score_column(matches_df)
+            if column:
+                matches_df = matches_df.sort_values(column, ascending=False, kind="stable").reset_index(drop=True)
+        matches_df = self.save_matches(matches_df, resume_file)
+        if task is not None:
+            task.report(progress=1.0, message=f"匹配完成，共 {len(matches_df)} 个结果", partial=matches_df.head(50))
+        return matches_df
+    
     def generate_match_report(self, matches_df=None, resume_file=None):
         """生成匹配报告
         
@@ -361,7 +869,7 @@ class SmartJobAssistant:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = os.path.join(self.data_dir, f"match_report_{timestamp}.md")
         
-        report_text = self.job_matcher.generate_match_report(matches_df, resume_file, report_file)
+        report_text = get_report_engine().match_report(matches_df, resume_file, report_file)
         
         return report_text, report_file
     
@@ -424,15 +932,22 @@ class SmartJobAssistant:
         
         return result
     
-    def batch_apply(self, jobs_df=None, resume_file=None, cover_letter_file=None, credentials=None, max_applications=10):
+    def batch_apply(self, jobs_df=None, resume_file=None, cover_letter_file=None, credentials=None, max_applications=10,
+                    task=None, profile=None):
         """批量申请工作
         
+        职位按SITE分派给对应平台的申请适配器，各平台并发执行，互不阻塞。
+        职位先写入持久化申请队列，已申请过的JOB_URL不会重复申请；本次只处理这一批加入的职位，
+        中途崩溃后未完成的职位用resume_applications继续
+        
         Args:
             jobs_df: 工作DataFrame，默认为当前匹配结果
             resume_file: 简历文件路径，默认为当前简历
             cover_letter_file: 求职信文件路径
             credentials: 登录凭据
             max_applications: 最大申请数量
+            task: 后台任务，用于报告进度和响应取消，默认为None
+            profile: 是否进行性能分析，默认为None（按配置profile_operations），分析结果路径写入每条申请记录
             
         Returns:
             list: 申请结果列表
@@ -451,17 +966,111 @@ class SmartJobAssistant:
         if not resume_file or not os.path.exists(resume_file):
             return [{"success": False, "message": "简历文件不存在"}]
         
-        # 批量申请
-        results = self.application_system.batch_apply(
-            jobs_df=jobs_df,
-            resume_file=resume_file,
-            cover_letter_file=cover_letter_file,
-            credentials=credentials,
-            max_applications=max_applications
-        )
+        # 调度器会导入selenium，在需要时才导入
+        from application_dispatcher import job_records
+        
+        # 加入申请队列，批次记录所属会话以及简历和求职信路径
+        session_id = current_session_id()
+        batch_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        added = self.application_queue.enqueue(job_records(jobs_df, max_applications), batch_id, session_id,
+                                               os.path.abspath(resume_file),
+                                               os.path.abspath(cover_letter_file) if cover_letter_file else None)
+        print(f"已加入申请队列: {added} 个职位")
+        if not added:
+            return [{"success": False, "message": "这些职位已经在申请队列中"}]
+        
+        return self.run_application_queue(batch_id, session_id, credentials, task, profile)
+    
+    def resume_applications(self, batch_id=None, credentials=None, task=None, profile=None):
+        """继续处理之前中断的批次中未完成的申请
+        
+        Args:
+            batch_id: 批次标识，默认为None（当前会话所有未完成的批次）
+            credentials: 登录凭据
+            task: 后台任务
+            profile: 是否进行性能分析
+        
+        Returns:
+            list: 申请结果列表
+        """
+        session_id = None if batch_id else current_session_id()
+        batches = self.application_queue.unfinished_batches(session_id)
+        batches = [batch for batch in batches if batch["batch_id"] and batch_id in (None, batch["batch_id"])]
+        results = []
+        for batch in batches:
+            print(f"继续申请批次 {batch['batch_id']}: {batch['unfinished']} 个未完成")
+            results.extend(self.run_application_queue(batch["batch_id"], batch["session_id"], credentials, task, profile))
+        return results
+    
+    def run_application_queue(self, batch_id, session_id, credentials=None, task=None, profile=None):
+        """处理申请队列中一个批次的职位，进度按该批次的数量计算
+        
+        Args:
+            batch_id: 批次标识
+            session_id: 批次所属会话
+            credentials: 登录凭据
+            task: 后台任务
+            profile: 是否进行性能分析
+        
+        Returns:
+            list: 申请结果列表
+        """
+        from application_dispatcher import ApplicationDispatcher
+        
+        stats = self.application_queue.stats(batch_id)
+        total = max(1, sum(count for status, count in stats.items() if status not in ("done", "dead")))
+        finished = []
+        
+        with self.profiled("apply", profile) as profiler:
+            dispatcher = ApplicationDispatcher(self.create_application_session, self.config.get("platform_limits"),
+                                               thread_initializer=profiler.add_thread if profiler is not None else None)
+            
+            def on_result(result):
+                if profiler is not None:
+                    result["profile_file"] = profiler.output_file
+                self.record_application_result(result)
+                finished.append(result)
+                if task is not None:
+                    task.report(progress=min(1.0, len(finished) / total),
+                                message=f"已处理 {len(finished)}/{total}: {result.get('job_title', '')} {result.get('message', '')}",
+                                partial=result)
+            
+            try:
+                results = dispatcher.run_queue(
+                    self.application_queue,
+                    credentials=credentials,
+                    on_result=on_result,
+                    max_wait=self.config.get("apply_retry_wait", 120),
+                    stop_event=task.cancel_event if task is not None else None,
+                    batch_id=batch_id,
+                    session_id=session_id
+                )
+            finally:
+                dispatcher.close()
+        
+        stats = self.application_queue.stats(batch_id)
+        if stats.get("dead"):
+            print(f"批次 {batch_id} 中有 {stats['dead']} 个职位需要人工处理")
         
         return results
     
+    def create_application_session(self):
+        """创建一个独立的申请会话（每个会话持有一个浏览器），供批量申请并发使用
+        
+        Returns:
+            AutomatedApplicationSystem: 申请会话
+        """
+        return self.component_class("application_system")(self.data_dir)
+    
+    def record_application_result(self, result):
+        """把申请结果写入申请历史
+        
+        Args:
+            result: 申请结果
+        """
+        self.application_system.history.append(result)
+        self.application_system.save_history()
+    
     def generate_application_report(self, application_results):
         """生成申请报告
         
@@ -483,17 +1092,40 @@ class SmartJobAssistant:
         
         return report_text, report_file
     
-    def track_application_status(self, credentials=None):
+    def track_application_status(self, credentials=None, task=None):
         """跟踪申请状态
         
+        只检查到期的申请并跳过已结束的申请，页面没有变化时不解析状态，
+        检查通过浏览器会话池并发进行
+        
         Args:
             credentials: 登录凭据
+            task: 后台任务，用于报告进度和响应取消，默认为None
             
         Returns:
-            dict: 更新的申请状态
+            dict: 本次检查的统计和更新的申请状态
         """
-        # 跟踪状态
-        status_updates = self.application_system.track_application_status(credentials)
+        from status_tracker import StatusTracker
+        tracker = StatusTracker(
+            self.create_application_session,
+            pool_size=self.config.get("status_tracker_browsers", 3),
+            max_checks=self.config.get("status_tracker_max_checks")
+        )
+        try:
+            on_check = None
+            if task is not None:
+                def on_check(check):
+                    task.report(progress=check["completed"] / check["total"],
+                                message=f"已检查 {check['completed']}/{check['total']}",
+                                partial=check if check["outcome"] == "changed" else None)
+            status_updates = tracker.track(self.application_system.history, credentials, on_check=on_check,
+                                           stop_event=task.cancel_event if task is not None else None)
+        finally:
+            tracker.close()
+        
+        # 检查时间和内容哈希也需要保存，供下次增量检查使用
+        self.application_system.save_history()
+        print(f"检查了 {status_updates['checked']} 个申请，{len(status_updates['updates'])} 个状态发生变化")
         
         return status_updates
     
@@ -512,11 +1144,134 @@ class SmartJobAssistant:
         
         return report_text, report_file
     
+    def start_task(self, kind, *args, owner=None, **kwargs):
+        """提交后台任务，立即返回任务ID
+        
+        Args:
+            kind: 任务类型，search、match、apply、resume_apply、status或rematch
+            *args: 对应操作的参数
+            owner: 提交任务的用户或会话标识，默认为当前会话
+            **kwargs: 对应操作的关键字参数
+        
+        Returns:
+            str: 任务ID
+        """
+        operations = {
+            "search": (self.search_jobs_task, "搜索工作"),
+            "match": (self.match_jobs_task, "匹配工作"),
+            "apply": (self.batch_apply, "批量申请"),
+            "resume_apply": (self.resume_applications, "继续批量申请"),
+            "status": (self.track_application_status, "跟踪申请状态"),
+            "rematch": (self.refresh_matches, "增量匹配工作")
+        }
+        func, name = operations[kind]
+        
+        # 后台线程中继续使用提交任务的会话
+        session_id = current_session_id()
+        
+        def run(*args, task, **kwargs):
+            with use_session(session_id):
+                return func(*args, task=task, **kwargs)
+        return self.tasks.submit(kind, run, *args, name=name, owner=owner or session_id, **kwargs)
+    
+    def search_jobs_task(self, *args, task, **kwargs):
+        """在后台任务中搜索工作，结果的前几行作为部分结果"""
+        task.report(progress=0.05, message="正在搜索工作...")
+        jobs_df = self.search_jobs(*args, **kwargs)
+        task.check_cancelled()
+        task.report(progress=1.0, message=f"找到 {len(jobs_df)} 个工作", partial=jobs_df.head(50))
+        return jobs_df
+    
+    def match_jobs_task(self, *args, task, **kwargs):
+        """在后台任务中匹配工作"""
+        task.report(progress=0.05, message="正在匹配工作...")
+        matches_df = self.match_jobs(*args, **kwargs)
+        task.check_cancelled()
+        task.report(progress=1.0, message=f"匹配完成，共 {len(matches_df)} 个结果", partial=matches_df.head(50))
+        return matches_df
+    
+    def submit_scheduled(self, kind, params):
+        """提交定时任务，结果保存在默认会话中并写入数据库；
+        新打开的界面会话（包括其他应用进程中的）创建时从数据库读回默认会话，复制它的当前文件和数据
+        
+        Returns:
+            str: 任务ID
+        """
+        with use_session(DEFAULT_SESSION):
+            return self.start_task(kind, owner="scheduler", **params)
+    
+    def add_schedule(self, schedule_id, kind, cron, params=None, **options):
+        """添加或修改定时任务
+        
+        Args:
+            schedule_id: 定时任务ID
+            kind: 任务类型，search（params为search_jobs的参数）、rematch或status
+            cron: cron表达式，如"0 8 * * 1-5"
+            params: 任务参数
+            **options: jitter_seconds、catch_up、enabled
+        
+        Returns:
+            dict: 定时任务
+        """
+        return self.scheduler.add(schedule_id, kind, cron, params, **options)
+    
+    def remove_schedule(self, schedule_id):
+        """删除定时任务
+        
+        Returns:
+            str: 提示信息
+        """
+        return "已删除定时任务" if self.scheduler.remove(schedule_id) else "定时任务不存在"
+    
+    def schedule_report(self):
+        """生成定时任务列表
+        
+        Returns:
+            str: Markdown格式的表格
+        """
+        lines = ["| 定时任务 | 类型 | 时间表 | 下次运行 | 上次运行 | 上次结果 |", "| --- | --- | --- | --- | --- | --- |"]
+        for schedule in self.scheduler.list():
+            status = "运行中" if schedule["running"] else (schedule["last_status"] or "-")
+            if schedule["last_error"] and not schedule["running"]:
+                status += f"（{schedule['last_error']}）"
+            lines.append(f"| {schedule['id']} | {schedule['kind']} | `{schedule['cron']}` | "
+                         f"{(schedule['next_run'] or '-')[:16]} | {(schedule['last_run'] or '-')[:16]} | {status} |")
+        return "\n".join(lines)
+    
+    def task_updates(self, task_id, interval=1.0):
+        """持续获取任务进度，供Gradio生成器回调使用
+        
+        Args:
+            task_id: 任务ID
+            interval: 没有更新时的刷新间隔（秒）
+        
+        Yields:
+            tuple: (进度文本, 最新的部分结果)
+        """
+        latest = None
+        for snapshot in self.tasks.stream(task_id, interval):
+            if snapshot["partial_results"]:
+                latest = snapshot["partial_results"][-1]
+            if snapshot["status"] == "done" and isinstance(snapshot["result"], pd.DataFrame):
+                latest = snapshot["result"]
+            text = f"**{snapshot['name']}** [{snapshot['status']}] {snapshot['progress'] * 100:.0f}% - {snapshot['message']}"
+            yield text, latest
+    
+    def cancel_task(self, task_id):
+        """取消后台任务
+        
+        Returns:
+            str: 提示信息
+        """
+        return "已请求取消任务" if self.tasks.cancel(task_id) else "任务不存在或已结束"
+    
     def build_ui(self):
         """构建用户界面
         
         Returns:
             gr.Blocks: Gradio界面
         """
+        with self.startup_timer.stage("gradio", "import"):
+            import gradio as gr
      
 (Content truncated due to size limit. Use line ranges to read in chunks)
\ No newline at end of file
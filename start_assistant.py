@@ -7,47 +7,198 @@
 """
 
 import os
+import re
 import sys
+import json
+import glob
+import hashlib
 import subprocess
 import time
+from importlib import metadata
 
-def check_dependencies():
-    """检查并安装依赖"""
-    print("正在检查依赖...")
+REQUIREMENTS_FILE = "requirements.txt"
+
+# 依赖检查通过后写入的标记文件，环境没有变化时跳过检查
+PREFLIGHT_STAMP = os.path.join("job_data", ".preflight.json")
+
+# 需要的NLTK数据及其在数据目录中的相对路径
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet"
+}
+
+def read_requirements(requirements_file=REQUIREMENTS_FILE):
+    """读取依赖列表
     
-    # 必要的依赖列表
-    dependencies = [
-        "gradio",
-        "pandas",
-        "selenium",
-        "nltk",
-        "scikit-learn",
-        "python-jobspy",
-        "markdown",
-        "webdriver-manager"
-    ]
+    Args:
+        requirements_file: 依赖文件路径
     
-    # 检查并安装缺失的依赖
-    for dep in dependencies:
-        try:
-            __import__(dep)
-            print(f"✓ {dep} 已安装")
-        except ImportError:
-            print(f"✗ {dep} 未安装，正在安装...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
-            print(f"✓ {dep} 安装完成")
-    
-    # 安装NLTK数据
+    Returns:
+        list: (发行包名称, 最低版本)列表，没有版本要求时最低版本为None
+    """
+    requirements = []
+    with open(requirements_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            match = re.match(r"^([A-Za-z0-9_.\-]+)\s*(?:>=\s*([0-9][0-9A-Za-z.]*))?", line)
+            if match:
+                requirements.append((match.group(1), match.group(2)))
+    return requirements
+
+def version_tuple(version):
+    """把版本号转换为可比较的元组，只比较开头的数字部分"""
+    parts = []
+    for part in version.split("."):
+        match = re.match(r"\d+", part)
+        if not match:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts)
+
+def nltk_data_dirs():
+    """获取NLTK查找数据的目录（与nltk.data.path的默认值一致，不导入nltk）"""
+    directories = [path for path in os.environ.get("NLTK_DATA", "").split(os.pathsep) if path]
+    directories.append(os.path.expanduser("~/nltk_data"))
+    for prefix in [sys.prefix, getattr(sys, "base_prefix", sys.prefix)]:
+        directories += [os.path.join(prefix, "nltk_data"), os.path.join(prefix, "share", "nltk_data"),
+                        os.path.join(prefix, "lib", "nltk_data")]
+    directories += ["/usr/share/nltk_data", "/usr/local/share/nltk_data", "/usr/lib/nltk_data", "/usr/local/lib/nltk_data"]
+    return list(dict.fromkeys(directories))
+
+def find_nltk_resource(resource_path):
+    """在NLTK数据目录中查找资源（目录或zip包）
+    
+    Args:
+        resource_path: 资源相对路径，如corpora/stopwords
+    
+    Returns:
+        str: 找到的路径，找不到时返回None
+    """
+    for directory in nltk_data_dirs():
+        path = os.path.join(directory, resource_path)
+        if os.path.isdir(path) or os.path.isfile(path + ".zip"):
+            return path
+    return None
+
+def environment_hash(requirements_file=REQUIREMENTS_FILE):
+    """计算环境哈希：Python解释器、依赖文件、已安装的发行包目录和NLTK数据目录
+    
+    安装或卸载包会改变site-packages中的*.dist-info目录，下载NLTK数据会改变数据目录的修改时间
+    
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.sha256()
+    digest.update(sys.executable.encode("utf-8"))
+    digest.update(sys.version.encode("utf-8"))
+    if os.path.exists(requirements_file):
+        with open(requirements_file, 'rb') as f:
+            digest.update(f.read())
+    for entry in sys.path:
+        if not os.path.isdir(entry):
+            continue
+        for info in sorted(glob.glob(os.path.join(entry, "*.dist-info")) + glob.glob(os.path.join(entry, "*.egg-info"))):
+            digest.update(os.path.basename(info).encode("utf-8"))
+    for directory in nltk_data_dirs():
+        for resource_path in NLTK_RESOURCES.values():
+            path = os.path.join(directory, resource_path)
+            for candidate in [path, path + ".zip"]:
+                if os.path.exists(candidate):
+                    digest.update(f"{candidate}:{os.path.getmtime(candidate)}".encode("utf-8"))
+    return digest.hexdigest()
+
+def read_stamp():
+    """读取依赖检查标记"""
     try:
-        import nltk
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-        nltk.download('wordnet', quiet=True)
-        print("✓ NLTK数据已下载")
-    except Exception as e:
-        print(f"✗ NLTK数据下载失败: {e}")
+        with open(PREFLIGHT_STAMP, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_stamp(env_hash):
+    """写入依赖检查标记（先写临时文件再重命名）"""
+    os.makedirs(os.path.dirname(PREFLIGHT_STAMP), exist_ok=True)
+    temp_file = PREFLIGHT_STAMP + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({"env_hash": env_hash, "checked_at": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+    os.replace(temp_file, PREFLIGHT_STAMP)
+
+def preflight(requirements_file=REQUIREMENTS_FILE):
+    """离线检查依赖：通过包元数据检查已安装的发行包（不导入），在磁盘上查找NLTK数据
     
-    print("所有依赖检查完成！")
+    Returns:
+        tuple: (缺失或版本过低的发行包列表, 缺失的NLTK数据列表)
+    """
+    missing_packages = []
+    for name, minimum in read_requirements(requirements_file):
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            print(f"✗ {name} 未安装")
+            missing_packages.append(name if not minimum else f"{name}>={minimum}")
+            continue
+        if minimum and version_tuple(installed) < version_tuple(minimum):
+            print(f"✗ {name} 版本过低: {installed} < {minimum}")
+            missing_packages.append(f"{name}>={minimum}")
+        else:
+            print(f"✓ {name} {installed}")
+    
+    missing_nltk = []
+    for name, resource_path in NLTK_RESOURCES.items():
+        if find_nltk_resource(resource_path):
+            print(f"✓ NLTK数据 {name}")
+        else:
+            print(f"✗ NLTK数据 {name} 不存在")
+            missing_nltk.append(name)
+    return missing_packages, missing_nltk
+
+def check_dependencies(install=False):
+    """检查依赖
+    
+    环境哈希与上次检查通过时相同则直接返回；默认不访问网络，
+    只有指定install（命令行参数--install）时才通过pip安装缺失的包并下载NLTK数据
+    
+    Args:
+        install: 是否安装缺失的依赖
+    
+    Returns:
+        bool: 依赖是否齐全
+    """
+    start_time = time.perf_counter()
+    env_hash = environment_hash()
+    if read_stamp().get("env_hash") == env_hash:
+        print(f"✓ 依赖检查已通过（环境未变化，{(time.perf_counter() - start_time) * 1000:.0f} 毫秒）")
+        return True
+    
+    print("正在检查依赖...")
+    missing_packages, missing_nltk = preflight()
+    
+    if (missing_packages or missing_nltk) and install:
+        if missing_packages:
+            print(f"正在安装: {' '.join(missing_packages)}")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
+        if missing_nltk:
+            import nltk
+            for name in missing_nltk:
+                nltk.download(name, quiet=True)
+        # 安装后重新检查，并使用安装后的环境哈希
+        env_hash = environment_hash()
+        missing_packages, missing_nltk = preflight()
+    
+    if missing_packages or missing_nltk:
+        if missing_packages:
+            print(f"缺少依赖，请运行: {sys.executable} -m pip install -r {REQUIREMENTS_FILE}")
+        if missing_nltk:
+            print(f"缺少NLTK数据，请运行: {sys.executable} -m nltk.downloader {' '.join(missing_nltk)}")
+        print("也可以使用 --install 参数自动安装")
+        return False
+    
+    write_stamp(env_hash)
+    print(f"所有依赖检查完成！（{(time.perf_counter() - start_time) * 1000:.0f} 毫秒）")
+    return True
 
 def setup_environment():
     """设置环境"""
@@ -68,8 +219,24 @@ def setup_environment():
     
     print("环境设置完成！")
 
-def start_assistant():
-    """启动智能求职助手"""
+def command_option(name, default):
+    """读取命令行参数，格式为 --name value"""
+    if name in sys.argv:
+        position = sys.argv.index(name)
+        if position + 1 < len(sys.argv):
+            return sys.argv[position + 1]
+    return default
+
+def start_assistant(port=7860, ready_timeout=120):
+    """启动智能求职助手，等待应用通过HTTP就绪检查后才报告启动成功
+    
+    Args:
+        port: 应用监听的端口
+        ready_timeout: 等待就绪的最长时间（秒）
+    
+    Returns:
+        bool: 是否启动成功
+    """
     print("正在启动智能求职助手...")
     
     try:
@@ -79,28 +246,61 @@ def start_assistant():
             return False
         
         # 启动主程序
-        subprocess.Popen([sys.executable, "smart_job_assistant.py"])
+        from supervisor import WorkerProcess
+        worker = WorkerProcess(0, port, [sys.executable, "smart_job_assistant.py"])
+        worker.start()
+        if not worker.wait_ready(timeout=ready_timeout):
+            print(f"✗ 应用未能在 {ready_timeout} 秒内就绪（进程{'仍在运行' if worker.alive() else '已退出'}）")
+            worker.terminate()
+            return False
         print("✓ 智能求职助手已启动！")
-        print("请在浏览器中访问显示的URL地址")
+        print(f"请在浏览器中访问: http://127.0.0.1:{port}")
         return True
     except Exception as e:
         print(f"✗ 启动失败: {e}")
         return False
 
+def supervise_assistant(workers=1, port=7860):
+    """以监管模式运行智能求职助手（阻塞直到收到SIGTERM或Ctrl+C）
+    
+    应用进程崩溃后自动重启，发送SIGHUP可以滚动重启所有进程
+    
+    Args:
+        workers: 应用进程数量
+        port: 用户访问的端口
+    
+    Returns:
+        bool: 是否成功启动
+    """
+    from supervisor import Supervisor
+    supervisor = Supervisor([sys.executable, "smart_job_assistant.py"], workers=workers, public_port=port,
+                            base_port=port + 10)
+    return supervisor.run()
+
 def main():
     """主函数"""
     print("=" * 50)
     print("智能求职助手 - 启动程序")
     print("=" * 50)
     
-    # 检查并安装依赖
-    check_dependencies()
+    # 检查依赖
+    if not check_dependencies(install="--install" in sys.argv):
+        print("\n依赖不完整，未启动系统")
+        return
     
     # 设置环境
     setup_environment()
     
+    port = int(command_option("--port", 7860))
+    
+    # 监管模式：保持运行，崩溃后自动重启
+    if "--supervise" in sys.argv:
+        if not supervise_assistant(int(command_option("--workers", 1)), port):
+            print("\n系统启动失败，请检查错误信息")
+        return
+    
     # 启动助手
-    if start_assistant():
+    if start_assistant(port):
         print("\n系统已成功启动！")
         print("您可以通过Web界面使用以下功能：")
         print("1. 简历管理 - 上传和优化您的简历")
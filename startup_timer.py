@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 启动耗时统计
+记录启动过程中每个阶段（导入模块、创建组件、加载数据）的耗时，并生成启动耗时报告
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+class StartupTimer:
+    """启动耗时统计类，可以在多个线程中同时记录"""
+    
+    def __init__(self):
+        """初始化启动耗时统计"""
+        self.start_time = time.perf_counter()
+        self.stages = []
+        self.lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name, kind="init"):
+        """记录一个阶段的耗时
+        
+        Args:
+            name: 阶段名称
+            kind: 阶段类型，如import、init、load
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, kind, start)
+    
+    def record(self, name, seconds, kind="init", start=None):
+        """直接记录一个阶段的耗时
+        
+        Args:
+            name: 阶段名称
+            seconds: 耗时（秒）
+            kind: 阶段类型
+            start: 开始时间（perf_counter），默认为结束时间减去耗时
+        """
+        if start is None:
+            start = time.perf_counter() - seconds
+        with self.lock:
+            self.stages.append({
+                "name": name,
+                "kind": kind,
+                "seconds": seconds,
+                "offset": start - self.start_time,
+                "thread": threading.current_thread().name
+            })
+    
+    def elapsed(self):
+        """从开始统计到现在的时间（秒）"""
+        return time.perf_counter() - self.start_time
+    
+    def totals(self):
+        """按阶段类型汇总耗时
+        
+        Returns:
+            dict: 类型到总耗时（秒）的映射
+        """
+        totals = {}
+        with self.lock:
+            for stage in self.stages:
+                totals[stage["kind"]] = totals.get(stage["kind"], 0.0) + stage["seconds"]
+        return totals
+    
+    def report(self, title="启动耗时报告"):
+        """生成启动耗时报告
+        
+        Returns:
+            str: Markdown格式的报告
+        """
+        with self.lock:
+            stages = sorted(self.stages, key=lambda stage: stage["offset"])
+        lines = [f"# {title}", "", f"已运行 {self.elapsed() * 1000:.0f} 毫秒", "",
+                 "| 开始(ms) | 耗时(ms) | 类型 | 阶段 | 线程 |", "| ---: | ---: | --- | --- | --- |"]
+        for stage in stages:
+            lines.append(f"| {stage['offset'] * 1000:.0f} | {stage['seconds'] * 1000:.1f} | {stage['kind']} "
+                         f"| {stage['name']} | {stage['thread']} |")
+        lines.append("")
+        for kind, seconds in sorted(self.totals().items(), key=lambda item: -item[1]):
+            lines.append(f"- {kind}: {seconds * 1000:.0f} 毫秒")
+        return "\n".join(lines)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 增量申请状态跟踪
+按申请时间和上次变化时间安排检查，跳过已结束的申请，通过浏览器会话池并发读取（登录后的）状态区域，
+用状态区域文字的内容哈希判断状态是否变化；公开职位页面的ETag和Last-Modified与申请状态无关，不用于判断
+"""
+
+import time
+import hashlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from browser_pool import BrowserPool
+from metrics import traced, inc
+
+# 不再变化的申请状态
+TERMINAL_STATUSES = {"rejected", "offer", "withdrawn", "closed"}
+
+# 状态关键字，按优先级排列，页面状态区域中先匹配到的关键字决定状态
+STATUS_KEYWORDS = [
+    ("offer", ["offer extended", "you received an offer", "录用"]),
+    ("rejected", ["no longer under consideration", "not selected", "not moving forward",
+                  "application was rejected", "unfortunately", "未通过"]),
+    ("withdrawn", ["application withdrawn", "you withdrew", "已撤回"]),
+    ("closed", ["no longer accepting applications", "this job is no longer available", "job has expired", "已关闭"]),
+    ("interview", ["interview", "面试"]),
+    ("viewed", ["application viewed", "resume was downloaded", "viewed your application", "已查看"]),
+    ("applied", ["applied", "application submitted", "已提交申请"])
+]
+
+# 在浏览器中提取状态区域文字的脚本，arguments[0]为CSS选择器列表，找不到时退回到正文
+STATUS_PANEL_SCRIPT = """
+var selectors = arguments[0];
+var panel = null;
+for (var i = 0; i < selectors.length && !panel; i++) {
+    panel = document.querySelector(selectors[i]);
+}
+var text = (panel || document.body || document.documentElement).innerText || '';
+return {text: text.replace(/\\s+/g, ' ').trim().slice(0, 20000), url: window.location.href,
+        ready_state: document.readyState};
+"""
+
+# 各平台状态区域的选择器
+STATUS_PANEL_SELECTORS = {
+    "linkedin": [".post-apply-timeline", ".jobs-details-top-card__apply-status", ".artdeco-inline-feedback",
+                 ".jobs-unified-top-card", ".jobs-details"],
+    "indeed": [".jobsearch-ApplyStatus", "#applyButtonLinkContainer", ".jobsearch-JobInfoHeader-title-container"],
+    "glassdoor": ["[data-test='apply-status']", "[data-test='job-details-header']"],
+    "generic": ["[data-test*='status']", "[class*='application-status']", "main"]
+}
+
+def parse_time(value):
+    """把历史记录中的时间字符串转换为时间戳
+    
+    Args:
+        value: 时间字符串（%Y-%m-%d %H:%M:%S）或时间戳
+    
+    Returns:
+        float: 时间戳，无法解析时返回None
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None
+
+def format_time(timestamp):
+    """把时间戳格式化为历史记录使用的时间字符串"""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+def classify_status(text):
+    """根据状态区域文字判断申请状态
+    
+    Args:
+        text: 状态区域文字
+    
+    Returns:
+        str: 申请状态，无法判断时返回None
+    """
+    lowered = text.lower()
+    for status, keywords in STATUS_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return status
+    return None
+
+def content_hash(text):
+    """计算状态区域文字的哈希"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def platform_key(application):
+    """获取申请记录对应的平台名称"""
+    platform = str(application.get("site") or application.get("platform") or "").lower().replace(" ", "_")
+    return platform if platform in STATUS_PANEL_SELECTORS else "generic"
+
+class StatusTracker:
+    """增量申请状态跟踪类"""
+    
+    def __init__(self, system_factory, pool_size=3, min_interval_hours=6, max_interval_hours=168,
+                 max_checks=None):
+        """初始化状态跟踪
+        
+        Args:
+            system_factory: 创建AutomatedApplicationSystem实例的函数
+            pool_size: 并发使用的浏览器数量
+            min_interval_hours: 同一申请两次检查之间的最短间隔（小时）
+            max_interval_hours: 同一申请两次检查之间的最长间隔（小时）
+            max_checks: 每次运行最多检查的申请数量，默认为None（不限制）
+        """
+        self.pool = BrowserPool(system_factory, size=pool_size, name="status")
+        self.pool_size = pool_size
+        self.min_interval = min_interval_hours * 3600
+        self.max_interval = max_interval_hours * 3600
+        self.max_checks = max_checks
+        self.logged_in = set()
+    
+    def close(self):
+        """关闭浏览器会话池"""
+        self.pool.close()
+    
+    def check_interval(self, application, now):
+        """计算申请的检查间隔：状态越久没有变化，检查间隔越长
+        
+        Args:
+            application: 申请记录
+            now: 当前时间戳
+        
+        Returns:
+            float: 检查间隔（秒）
+        """
+        changed_at = parse_time(application.get("status_changed_at")) or parse_time(application.get("timestamp")) or now
+        return min(self.max_interval, max(self.min_interval, (now - changed_at) / 4))
+    
+    def due_applications(self, history, now=None):
+        """选出本次需要检查的申请，按优先级排序
+        
+        已结束的申请和未到检查时间的申请会被跳过；
+        从未检查过的申请最优先，其余按逾期时间占检查间隔的比例从大到小排列
+        
+        Args:
+            history: 申请历史列表或HistoryTable，HistoryTable通过状态索引只读取未结束的申请
+            now: 当前时间戳，默认为当前时间
+        
+        Returns:
+            list: 需要检查的申请记录
+        """
+        now = now or time.time()
+        if hasattr(history, "excluding_status"):
+            history = history.excluding_status(TERMINAL_STATUSES)
+        due = []
+        for application in history:
+            if not application.get("success") or not application.get("job_url"):
+                continue
+            if application.get("status") in TERMINAL_STATUSES:
+                continue
+            checked_at = parse_time(application.get("status_checked_at"))
+            if checked_at is None:
+                due.append((float("inf"), application))
+                continue
+            interval = self.check_interval(application, now)
+            overdue = now - checked_at - interval
+            if overdue >= 0:
+                due.append((overdue / interval, application))
+        
+        due.sort(key=lambda item: item[0], reverse=True)
+        applications = [application for _, application in due]
+        if self.max_checks is not None:
+            applications = applications[:self.max_checks]
+        return applications
+    
+    def read_status_panel(self, system, application, credentials=None):
+        """在浏览器中打开申请页面并读取状态区域
+        
+        Args:
+            system: AutomatedApplicationSystem实例
+            application: 申请记录
+            credentials: 登录凭据
+        
+        Returns:
+            dict: 状态区域文字和页面URL
+        """
+        platform = platform_key(application)
+        if not system.browser and not system.initialize_browser(platform=platform):
+            raise RuntimeError("浏览器初始化失败")
+        
+        if platform == "linkedin" and credentials and id(system) not in self.logged_in:
+            linkedin_credentials = credentials.get("linkedin", credentials)
+            if system.linkedin_login(linkedin_credentials):
+                self.logged_in.add(id(system))
+        
+        system.browser.get(application["job_url"])
+        return system.browser.execute_script(STATUS_PANEL_SCRIPT, STATUS_PANEL_SELECTORS[platform]) or {}
+    
+    @traced("status_check")
+    def check(self, application, credentials=None):
+        """检查一个申请的状态（在工作线程中运行）
+        
+        Args:
+            application: 申请记录
+            credentials: 登录凭据
+        
+        Returns:
+            dict: 检查结果，包含job_url、outcome（unchanged、changed、same_status或error）和新状态
+        """
+        check = {"job_url": application["job_url"], "old_status": application.get("status", "applied")}
+        try:
+            with self.pool.session() as system:
+                panel = self.read_status_panel(system, application, credentials)
+        except Exception as e:
+            check["outcome"] = "error"
+            check["message"] = str(e)
+            return check
+        
+        text = panel.get("text", "")
+        digest = content_hash(text)
+        check["hash"] = digest
+        if digest == application.get("status_hash"):
+            check["outcome"] = "unchanged"
+            return check
+        
+        status = classify_status(text) or check["old_status"]
+        check["status"] = status
+        check["outcome"] = "changed" if status != check["old_status"] else "same_status"
+        return check
+    
+    def apply_check(self, application, check, now):
+        """把检查结果写回申请记录
+        
+        Args:
+            application: 申请记录
+            check: check返回的检查结果
+            now: 当前时间戳
+        """
+        if check["outcome"] == "error":
+            return
+        application["status_checked_at"] = format_time(now)
+        if "hash" in check:
+            application["status_hash"] = check["hash"]
+        if check["outcome"] == "changed":
+            application["status"] = check["status"]
+            application["status_changed_at"] = format_time(now)
+            application.setdefault("status_history", []).append({
+                "status": check["status"],
+                "timestamp": format_time(now)
+            })
+    
+    def track(self, history, credentials=None, on_check=None, stop_event=None):
+        """增量检查申请状态
+        
+        Args:
+            history: 申请历史列表或HistoryTable，检查结果直接写回其中的记录
+            credentials: 登录凭据
+            on_check: 每个申请检查完成时调用的函数，参数为检查结果（含completed和total）
+            stop_event: threading.Event，设置后不再开始新的检查
+        
+        Returns:
+            dict: 本次检查的统计和状态变化列表
+        """
+        start_time = time.perf_counter()
+        applications = self.due_applications(history)
+        outcomes = {"unchanged": 0, "changed": 0, "same_status": 0, "error": 0}
+        updates = []
+        
+        with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="status") as executor:
+            futures = {executor.submit(self.check, application, credentials): application
+                       for application in applications}
+            completed = 0
+            for future in as_completed(futures):
+                if stop_event is not None and stop_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                if future.cancelled():
+                    continue
+                application = futures[future]
+                check = future.result()
+                inc("job_assistant_status_checks_total", help="申请状态检查次数",
+                    outcome=check["outcome"])
+                completed += 1
+                check["completed"] = completed
+                check["total"] = len(futures)
+                self.apply_check(application, check, time.time())
+                # 数据库中的历史记录表需要标记被修改的记录
+                if hasattr(history, "update"):
+                    history.update(application)
+                outcomes[check["outcome"]] += 1
+                if check["outcome"] == "changed":
+                    updates.append({
+                        "job_url": check["job_url"],
+                        "job_title": application.get("job_title", ""),
+                        "company": application.get("company", ""),
+                        "old_status": check["old_status"],
+                        "status": check["status"]
+                    })
+                if on_check:
+                    on_check(check)
+        
+        return {
+            "checked": sum(outcomes.values()),
+            "skipped": len(history) - len(applications),
+            "outcomes": outcomes,
+            "updates": updates,
+            "duration": round(time.perf_counter() - start_time, 3)
+        }
+
+# 测试代码
+if __name__ == "__main__":
+    import random
+    
+    class FakeBrowser:
+        """模拟浏览器：随机延迟后返回状态区域文字"""
+        
+        def __init__(self):
+            self.url = None
+        
+        def get(self, url):
+            self.url = url
+            time.sleep(random.uniform(0.05, 0.15))
+        
+        def execute_script(self, script, selectors):
+            number = int(self.url.rsplit("/", 1)[-1])
+            text = "Application viewed" if number % 10 == 0 else "Applied 3 days ago"
+            return {"text": text, "url": self.url, "ready_state": "complete"}
+    
+    class FakeSystem:
+        """模拟申请会话"""
+        
+        def __init__(self):
+            self.browser = FakeBrowser()
+        
+        def initialize_browser(self, platform=None):
+            return True
+        
+        def close_browser(self):
+            pass
+    
+    now = time.time()
+    history = []
+    for i in range(1000):
+        applied_at = now - random.uniform(1, 60) * 86400
+        application = {"success": True, "job_url": f"http://127.0.0.1:9/jobs/{i}", "site": "linkedin",
+                       "timestamp": format_time(applied_at)}
+        if i % 4 == 0:
+            application["status"] = random.choice(["rejected", "offer"])
+        elif i % 4 == 1:
+            application["status_checked_at"] = format_time(now - 3600)
+        history.append(application)
+    
+    tracker = StatusTracker(FakeSystem, pool_size=8)
+    try:
+        summary = tracker.track(history)
+        print(f"检查 {summary['checked']} 个申请，跳过 {summary['skipped']} 个，耗时 {summary['duration']:.2f} 秒")
+        print(f"检查结果: {summary['outcomes']}，状态变化 {len(summary['updates'])} 个")
+        summary = tracker.track(history)
+        print(f"再次运行: 检查 {summary['checked']} 个申请，耗时 {summary['duration']:.2f} 秒")
+    finally:
+        tracker.close()
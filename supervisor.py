@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 应用进程监管
+启动一个或多个应用进程并通过HTTP就绪检查确认可用，进程崩溃后按退避时间重启，
+SIGTERM转发给应用进程以便正常退出；前端代理把连接转发给就绪的进程，滚动重启时已有的连接不会中断；
+浏览器通过Cookie固定在一个进程编号上，会话的值保存在共享数据库中，进程重启后由新进程读回
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+
+# 记录浏览器所在进程编号的Cookie
+WORKER_COOKIE = "job_assistant_worker"
+
+# 读取请求头的最大长度
+MAX_HEADER_BYTES = 65536
+
+def read_request_head(sock, timeout=10.0):
+    """读取请求行和请求头（直到空行）
+    
+    Args:
+        sock: 用户连接
+        timeout: 等待请求头的最长时间（秒）
+    
+    Returns:
+        bytes: 已读取的数据，可能包含请求体的开头
+    """
+    data = b""
+    sock.settimeout(timeout)
+    try:
+        while b"\r\n\r\n" not in data and len(data) < MAX_HEADER_BYTES:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    except OSError:
+        pass
+    finally:
+        sock.settimeout(None)
+    return data
+
+def cookie_worker(head):
+    """从请求头的Cookie中读取进程编号
+    
+    Args:
+        head: 请求头数据
+    
+    Returns:
+        int: 进程编号，没有该Cookie时返回None
+    """
+    for line in head.split(b"\r\n\r\n", 1)[0].split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() != b"cookie":
+            continue
+        for item in value.decode("latin-1").split(";"):
+            key, _, cookie = item.strip().partition("=")
+            if key == WORKER_COOKIE and cookie.strip().isdigit():
+                return int(cookie.strip())
+    return None
+
+def add_cookie(head, index):
+    """在响应的状态行后插入记录进程编号的Set-Cookie头"""
+    status, _, rest = head.partition(b"\r\n")
+    return status + f"\r\nSet-Cookie: {WORKER_COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n".encode("latin-1") + rest
+
+class WorkerProcess:
+    """一个应用进程"""
+    
+    def __init__(self, index, port, command, env=None):
+        """初始化应用进程
+        
+        Args:
+            index: 进程编号
+            port: 应用监听的端口
+            command: 启动命令列表
+            env: 额外的环境变量
+        """
+        self.index = index
+        self.port = port
+        self.command = command
+        self.env = dict(env or {})
+        self.process = None
+        self.started_at = None
+        self.ready = False
+        self.draining = False
+        self.connections = 0
+        self.lock = threading.Lock()
+    
+    def start(self):
+        """启动进程，端口通过GRADIO_SERVER_PORT传给Gradio"""
+        env = dict(os.environ)
+        env.update(self.env)
+        env["GRADIO_SERVER_NAME"] = "127.0.0.1"
+        env["GRADIO_SERVER_PORT"] = str(self.port)
+        env["JOB_ASSISTANT_WORKER"] = str(self.index)
+        self.process = subprocess.Popen(self.command, env=env)
+        self.started_at = time.time()
+        self.ready = False
+        self.draining = False
+        print(f"应用进程 {self.index} 已启动: pid={self.process.pid} 端口={self.port}")
+    
+    def alive(self):
+        """进程是否仍在运行"""
+        return self.process is not None and self.process.poll() is None
+    
+    def probe(self, path="/", timeout=2.0):
+        """HTTP就绪检查
+        
+        Args:
+            path: 就绪检查路径
+            timeout: 请求超时时间（秒）
+        
+        Returns:
+            bool: 返回2xx或3xx时为True
+        """
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", timeout=timeout) as response:
+                return response.status < 400
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+    
+    def wait_ready(self, path="/", timeout=120.0, interval=0.5):
+        """等待进程就绪
+        
+        Args:
+            path: 就绪检查路径
+            timeout: 最长等待时间（秒）
+            interval: 检查间隔（秒）
+        
+        Returns:
+            bool: 是否在超时前就绪
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.alive():
+                return False
+            if self.probe(path):
+                self.ready = True
+                return True
+            time.sleep(interval)
+        return False
+    
+    def terminate(self, grace=20.0):
+        """发送SIGTERM，让应用写入未保存的数据后退出，超时后强制结束
+        
+        Args:
+            grace: 等待正常退出的时间（秒）
+        
+        Returns:
+            int: 进程退出码
+        """
+        self.ready = False
+        if not self.alive():
+            return self.process.returncode if self.process else None
+        self.process.terminate()
+        try:
+            return self.process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            print(f"应用进程 {self.index} 未在 {grace} 秒内退出，强制结束")
+            self.process.kill()
+            return self.process.wait()
+
+class Supervisor:
+    """应用进程监管类"""
+    
+    def __init__(self, command, workers=1, public_port=7860, base_port=7870, host="0.0.0.0",
+                 readiness_path="/", ready_timeout=120.0, backoff_base=1.0, backoff_max=60.0,
+                 stable_seconds=60.0, drain_seconds=300.0, grace_seconds=20.0):
+        """初始化进程监管
+        
+        Args:
+            command: 应用启动命令列表
+            workers: 预先启动的应用进程数量
+            public_port: 前端代理监听的端口（用户访问的端口）
+            base_port: 应用进程端口的起始值，每个进程使用不同的端口
+            host: 前端代理监听的地址
+            readiness_path: 就绪检查路径
+            ready_timeout: 等待进程就绪的最长时间（秒）
+            backoff_base: 崩溃重启的初始退避时间（秒），连续崩溃时翻倍
+            backoff_max: 崩溃重启的最长退避时间（秒）
+            stable_seconds: 进程运行超过该时间后重置退避时间
+            drain_seconds: 滚动重启时等待旧进程上的连接结束的最长时间（秒）
+            grace_seconds: 进程收到SIGTERM后等待正常退出的时间（秒）
+        """
+        self.command = command
+        self.worker_count = workers
+        self.public_port = public_port
+        self.base_port = base_port
+        self.host = host
+        self.readiness_path = readiness_path
+        self.ready_timeout = ready_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_seconds = stable_seconds
+        self.drain_seconds = drain_seconds
+        self.grace_seconds = grace_seconds
+        self.workers = []
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.restart_requested = threading.Event()
+        self.failures = {}
+        self.restart_at = {}
+        self.next_port = base_port
+        self.listener = None
+    
+    def allocate_port(self):
+        """分配一个未被占用的应用端口"""
+        with self.lock:
+            used = {worker.port for worker in self.workers}
+            while self.next_port in used or not self.port_free(self.next_port):
+                self.next_port += 1
+            port = self.next_port
+            self.next_port += 1
+            return port
+    
+    def port_free(self, port):
+        """判断本机端口是否空闲"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            return sock.connect_ex(("127.0.0.1", port)) != 0
+    
+    def spawn(self, index):
+        """启动一个应用进程并等待就绪
+        
+        Args:
+            index: 进程编号
+        
+        Returns:
+            WorkerProcess: 应用进程，未能就绪时返回None
+        """
+        worker = WorkerProcess(index, self.allocate_port(), self.command)
+        with self.lock:
+            self.workers.append(worker)
+        worker.start()
+        if worker.wait_ready(self.readiness_path, self.ready_timeout):
+            print(f"应用进程 {index} 已就绪: http://127.0.0.1:{worker.port}")
+            return worker
+        print(f"应用进程 {index} 未能就绪")
+        worker.terminate(self.grace_seconds)
+        self.remove(worker)
+        return None
+    
+    def remove(self, worker):
+        """从进程列表中移除"""
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+    
+    def ready_workers(self):
+        """获取可以接收新连接的进程列表"""
+        with self.lock:
+            return [worker for worker in self.workers if worker.ready and not worker.draining]
+    
+    def choose_worker(self, preferred=None):
+        """为新连接选择进程：浏览器Cookie中的进程就绪时使用它，使Gradio会话保持在一个进程中，
+        否则选择连接最少的就绪进程（同一NAT后的用户也会分散到不同进程）
+        
+        Args:
+            preferred: Cookie中的进程编号
+        
+        Returns:
+            WorkerProcess: 进程，没有就绪进程时返回None
+        """
+        workers = self.ready_workers()
+        if not workers:
+            return None
+        for worker in workers:
+            if worker.index == preferred:
+                return worker
+        return min(workers, key=lambda worker: (worker.connections, worker.index))
+    
+    def serve_proxy(self):
+        """前端代理：接受用户连接并转发给就绪的应用进程"""
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.public_port))
+        self.listener.listen(128)
+        self.listener.settimeout(1.0)
+        print(f"前端代理已启动: http://{self.host}:{self.public_port}")
+        while not self.stopping.is_set():
+            try:
+                client, address = self.listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self.proxy_connection, args=(client, address), daemon=True).start()
+    
+    def proxy_connection(self, client, address):
+        """转发一个连接，直到任意一端关闭
+        
+        Args:
+            client: 用户连接
+            address: 用户地址
+        """
+        head = read_request_head(client)
+        preferred = cookie_worker(head)
+        worker = self.choose_worker(preferred)
+        if worker is None:
+            client.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nRetry-After: 2\r\n\r\n")
+            client.close()
+            return
+        try:
+            upstream = socket.create_connection(("127.0.0.1", worker.port), timeout=10)
+            upstream.settimeout(None)
+            upstream.sendall(head)
+        except OSError:
+            client.close()
+            return
+        
+        with worker.lock:
+            worker.connections += 1
+        
+        def pipe(source, target, set_cookie=False):
+            try:
+                pending = b""
+                while True:
+                    data = source.recv(65536)
+                    if not data:
+                        if pending:
+                            target.sendall(pending)
+                        break
+                    if set_cookie:
+                        # 在第一个响应的状态行后写入Cookie，之后浏览器的请求都转发到这个进程编号
+                        pending += data
+                        if b"\r\n" not in pending:
+                            continue
+                        data, pending, set_cookie = add_cookie(pending, worker.index), b"", False
+                    target.sendall(data)
+            except OSError:
+                pass
+            finally:
+                for sock in (source, target):
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+        
+        reverse = threading.Thread(target=pipe, args=(upstream, client, preferred != worker.index), daemon=True)
+        reverse.start()
+        pipe(client, upstream)
+        reverse.join()
+        client.close()
+        upstream.close()
+        with worker.lock:
+            worker.connections -= 1
+    
+    def restart_delay(self, index):
+        """计算进程崩溃后的重启等待时间"""
+        failures = self.failures.get(index, 0)
+        return min(self.backoff_max, self.backoff_base * (2 ** failures))
+    
+    def schedule_restart(self, index):
+        """记录一次失败并安排重启时间"""
+        delay = self.restart_delay(index)
+        self.failures[index] = self.failures.get(index, 0) + 1
+        self.restart_at[index] = time.time() + delay
+        return delay
+    
+    def check_workers(self):
+        """检查进程状态：崩溃的进程按退避时间重启，缺少的进程编号到时间后重新启动"""
+        with self.lock:
+            crashed = [worker for worker in self.workers if not worker.alive() and not worker.draining]
+        for worker in crashed:
+            self.remove(worker)
+            runtime = time.time() - (worker.started_at or time.time())
+            if runtime >= self.stable_seconds:
+                self.failures[worker.index] = 0
+            delay = self.schedule_restart(worker.index)
+            print(f"应用进程 {worker.index} 已退出（退出码 {worker.process.returncode}），{delay:.1f} 秒后重启")
+        
+        for index in range(self.worker_count):
+            if self.stopping.is_set():
+                return
+            with self.lock:
+                running = any(worker.index == index and not worker.draining for worker in self.workers)
+            if running or time.time() < self.restart_at.get(index, 0):
+                continue
+            if self.spawn(index) is None:
+                delay = self.schedule_restart(index)
+                print(f"应用进程 {index} 启动失败，{delay:.1f} 秒后重试")
+    
+    def rolling_restart(self):
+        """滚动重启：逐个启动新进程，就绪后让旧进程停止接收新连接，等旧连接结束后再停止旧进程"""
+        print("开始滚动重启")
+        for index in range(self.worker_count):
+            with self.lock:
+                old_workers = [worker for worker in self.workers if worker.index == index and not worker.draining]
+            replacement = self.spawn(index)
+            if replacement is None:
+                print(f"新的应用进程 {index} 未能就绪，保留旧进程")
+                continue
+            for worker in old_workers:
+                worker.draining = True
+                threading.Thread(target=self.drain, args=(worker,), daemon=True).start()
+        print("滚动重启完成")
+    
+    def drain(self, worker):
+        """等待旧进程上的连接结束后停止旧进程，之后这些浏览器由同一编号的新进程按数据库中的会话值继续服务"""
+        deadline = time.time() + self.drain_seconds
+        while worker.connections > 0 and time.time() < deadline and not self.stopping.is_set():
+            time.sleep(1.0)
+        worker.terminate(self.grace_seconds)
+        self.remove(worker)
+        print(f"旧应用进程 pid={worker.process.pid} 已停止")
+    
+    def handle_signal(self, signum, frame):
+        """SIGTERM和SIGINT停止所有进程，SIGHUP触发滚动重启"""
+        if signum == getattr(signal, "SIGHUP", None):
+            self.restart_requested.set()
+        else:
+            self.stopping.set()
+    
+    def stop(self):
+        """把SIGTERM转发给所有应用进程并等待它们退出"""
+        self.stopping.set()
+        if self.listener:
+            self.listener.close()
+        with self.lock:
+            workers = list(self.workers)
+        for worker in workers:
+            if worker.alive():
+                worker.process.terminate()
+        for worker in workers:
+            worker.terminate(self.grace_seconds)
+        print("所有应用进程已停止")
+    
+    def run(self):
+        """启动所有进程和前端代理，并持续监管直到收到停止信号
+        
+        Returns:
+            bool: 是否有进程成功启动
+        """
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.handle_signal)
+        
+        for index in range(self.worker_count):
+            if self.spawn(index) is None:
+                self.schedule_restart(index)
+        if not self.ready_workers():
+            print("没有应用进程能够就绪")
+            self.stop()
+            return False
+        
+        proxy = threading.Thread(target=self.serve_proxy, name="proxy", daemon=True)
+        proxy.start()
+        print(f"智能求职助手已就绪: http://127.0.0.1:{self.public_port}（{len(self.ready_workers())} 个进程）")
+        try:
+            while not self.stopping.is_set():
+                if self.restart_requested.is_set():
+                    self.restart_requested.clear()
+                    self.rolling_restart()
+                self.check_workers()
+                self.stopping.wait(1.0)
+        finally:
+            self.stop()
+        return True
+
+# 测试代码
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    supervisor = Supervisor([sys.executable, "smart_job_assistant.py"], workers=workers)
+    sys.exit(0 if supervisor.run() else 1)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 结果表格分页
+工作和匹配结果在服务器端排序、筛选和分页，界面每次只收到一页、只含列表需要的列，
+职位描述等长文本在展开某一行时才单独获取，表格刷新的数据量与结果总数无关
+"""
+
+import json
+import math
+import pandas as pd
+from job_schema import DESCRIPTION_ID, job_description
+
+# 工作列表默认显示的列（按顺序，数据中没有的列会跳过）
+JOB_COLUMNS = ["TITLE", "COMPANY", "CITY", "STATE", "SITE", "JOB_TYPE",
+               "MIN_AMOUNT", "MAX_AMOUNT", "INTERVAL", "JOB_URL"]
+
+# 只在展开行时返回的长文本列（紧凑结构的数据中描述保存在描述库，只有描述ID）
+DETAIL_COLUMNS = ["DESCRIPTION", DESCRIPTION_ID]
+
+# 关键词筛选时搜索的列
+SEARCH_COLUMNS = ["TITLE", "COMPANY", "CITY", "STATE"]
+
+# 行标识列，展开行时用它获取详情
+ROW_ID = "ROW_ID"
+
+def default_columns(frame):
+    """获取数据的默认显示列：匹配分数等数值列在前，再加上工作列表的列
+    
+    Args:
+        frame: 工作或匹配结果DataFrame
+    
+    Returns:
+        list: 列名列表
+    """
+    score_columns = [column for column in frame.columns
+                     if "score" in str(column).lower() or "match" in str(column).lower()]
+    return score_columns + [column for column in JOB_COLUMNS if column in frame.columns and column not in score_columns]
+
+def truncate_cell(value, max_chars):
+    """截断过长的文本单元格"""
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars - 1] + "…"
+    return value
+
+class TableView:
+    """结果表格的服务器端视图，缓存排序和筛选结果，翻页时只取对应的行"""
+    
+    def __init__(self, frame, columns=None, page_size=25, max_cell_chars=120):
+        """初始化表格视图
+        
+        Args:
+            frame: 工作或匹配结果DataFrame
+            columns: 显示的列，默认为default_columns(frame)
+            page_size: 每页行数
+            max_cell_chars: 单元格最多显示的字符数
+        """
+        self.frame = frame
+        self.columns = [column for column in (columns or default_columns(frame)) if column in frame.columns]
+        self.page_size = page_size
+        self.max_cell_chars = max_cell_chars
+        self.orders = {}
+    
+    def order(self, sort_by=None, ascending=True, query=None):
+        """获取排序和筛选后的行位置，同样的条件只计算一次
+        
+        Args:
+            sort_by: 排序列
+            ascending: 是否升序
+            query: 关键词，只保留SEARCH_COLUMNS中包含该关键词的行
+        
+        Returns:
+            ndarray: 行位置数组
+        """
+        query = (query or "").strip().lower()
+        if sort_by not in self.frame.columns:
+            sort_by = None
+        key = (sort_by, bool(ascending), query)
+        if key in self.orders:
+            return self.orders[key]
+        
+        frame = self.frame
+        positions = pd.RangeIndex(len(frame)).to_numpy()
+        if query:
+            mask = pd.Series(False, index=frame.index)
+            for column in SEARCH_COLUMNS:
+                if column in frame.columns:
+                    mask |= frame[column].astype(str).str.lower().str.contains(query, regex=False, na=False)
+            positions = positions[mask.to_numpy()]
+        if sort_by:
+            values = frame[sort_by].iloc[positions]
+            positions = positions[values.reset_index(drop=True).sort_values(
+                ascending=ascending, na_position="last", kind="stable").index.to_numpy()]
+        
+        # 只缓存少量排序结果，避免频繁切换排序时占用过多内存
+        if len(self.orders) >= 8:
+            self.orders.pop(next(iter(self.orders)))
+        self.orders[key] = positions
+        return positions
+    
+    def page(self, page=1, sort_by=None, ascending=True, query=None, columns=None):
+        """获取一页数据
+        
+        Args:
+            page: 页码（从1开始）
+            sort_by: 排序列
+            ascending: 是否升序
+            query: 关键词
+            columns: 显示的列，默认为视图的列
+        
+        Returns:
+            dict: rows（只含显示列和ROW_ID的DataFrame）、page、pages、total
+        """
+        positions = self.order(sort_by, ascending, query)
+        total = len(positions)
+        pages = max(1, math.ceil(total / self.page_size))
+        page = min(max(1, int(page or 1)), pages)
+        start = (page - 1) * self.page_size
+        selected = positions[start:start + self.page_size]
+        
+        columns = [column for column in (columns or self.columns)
+                   if column in self.frame.columns and column not in DETAIL_COLUMNS]
+        rows = self.frame.iloc[selected][columns].copy()
+        for column in rows.columns:
+            if rows[column].dtype == object:
+                rows[column] = rows[column].map(lambda value: truncate_cell(value, self.max_cell_chars))
+        rows.insert(0, ROW_ID, self.frame.index[selected])
+        
+        return {
+            "rows": rows.reset_index(drop=True),
+            "page": page,
+            "pages": pages,
+            "total": total
+        }
+    
+    def detail(self, row_id):
+        """获取一行的完整数据（包括职位描述），展开行时调用
+        
+        Args:
+            row_id: 行标识（页面数据中的ROW_ID）
+        
+        Returns:
+            dict: 该行所有列的值，不存在时返回None
+        """
+        try:
+            row = self.frame.loc[row_id]
+        except KeyError:
+            return None
+        if isinstance(row, pd.DataFrame):
+            row = row.iloc[0]
+        detail = {}
+        for column, value in row.items():
+            if pd.api.types.is_scalar(value) and pd.isna(value):
+                value = None
+            detail[column] = value
+        if DESCRIPTION_ID in detail:
+            detail["DESCRIPTION"] = job_description(row) or None
+            del detail[DESCRIPTION_ID]
+        return detail
+    
+    def description(self, row_id):
+        """获取一行的职位描述
+        
+        Returns:
+            str: 职位描述，不存在时返回空字符串
+        """
+        detail = self.detail(row_id) or {}
+        for column in DETAIL_COLUMNS:
+            if detail.get(column):
+                return str(detail[column])
+        return ""
+
+def payload_size(page):
+    """估算一页数据发送到界面时的JSON大小（字节）"""
+    return len(page["rows"].to_json(orient="split", date_format="iso").encode("utf-8")) + \
+        len(json.dumps({key: value for key, value in page.items() if key != "rows"}))
+
+# 测试代码
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    
+    count = 50000
+    jobs = pd.DataFrame({
+        "TITLE": [f"Python Engineer {i}" if i % 3 else f"Data Scientist {i}" for i in range(count)],
+        "COMPANY": [f"Company {i % 500}" for i in range(count)],
+        "CITY": ["Shanghai", "Beijing", "Shenzhen", "Remote"] * (count // 4),
+        "SITE": ["linkedin", "indeed"] * (count // 2),
+        "MIN_AMOUNT": np.random.randint(50, 150, count) * 1000,
+        "JOB_URL": [f"https://example.com/jobs/{i}" for i in range(count)],
+        "DESCRIPTION": ["We are looking for an engineer. " * 100] * count
+    })
+    print(f"完整数据JSON大小: {len(jobs.to_json(orient='split')) / 1024 / 1024:.1f} MB")
+    
+    view = TableView(jobs)
+    start_time = time.perf_counter()
+    first = view.page(1, sort_by="MIN_AMOUNT", ascending=False, query="data")
+    print(f"排序筛选第一页: {(time.perf_counter() - start_time) * 1000:.0f} 毫秒，共 {first['total']} 条 {first['pages']} 页，"
+          f"数据 {payload_size(first) / 1024:.1f} KB")
+    start_time = time.perf_counter()
+    second = view.page(2, sort_by="MIN_AMOUNT", ascending=False, query="data")
+    print(f"翻到第二页: {(time.perf_counter() - start_time) * 1000:.1f} 毫秒")
+    print(second["rows"].head(3).to_string())
+    row_id = second["rows"].iloc[0][ROW_ID]
+    print(f"展开行 {row_id}: 描述 {len(view.description(row_id))} 个字符")
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智能求职助手 - 后台任务管理
+耗时操作（搜索、匹配、批量申请、状态跟踪）在后台线程中执行，界面提交后立即得到任务ID，
+再通过生成器持续获取进度和部分结果，也可以取消任务；每类任务有独立的并发上限，互不阻塞
+"""
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 任务状态
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+TASK_CANCELLED = "cancelled"
+
+FINISHED_STATES = {TASK_DONE, TASK_FAILED, TASK_CANCELLED}
+
+# 各类任务默认的并发上限，未列出的类型使用default
+DEFAULT_TASK_LIMITS = {
+    "search": 4,
+    "match": 4,
+    "apply": 1,
+    "status": 1,
+    "default": 2
+}
+
+class TaskCancelled(Exception):
+    """任务被取消"""
+    pass
+
+class Task:
+    """后台任务，任务函数通过它报告进度、追加部分结果和检查是否被取消"""
+    
+    def __init__(self, kind, name="", owner=None):
+        """初始化任务
+        
+        Args:
+            kind: 任务类型，如search、match、apply、status
+            name: 任务说明
+            owner: 提交任务的用户或会话标识
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.name = name or kind
+        self.owner = owner
+        self.status = TASK_PENDING
+        self.progress = 0.0
+        self.message = "等待执行"
+        self.partial_results = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.changed = threading.Condition()
+        self.version = 0
+    
+    def notify(self):
+        """通知等待中的读取方任务已更新"""
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+    
+    def report(self, progress=None, message=None, partial=None):
+        """报告进度
+        
+        Args:
+            progress: 进度（0-1）
+            message: 进度说明
+            partial: 新产生的部分结果
+        """
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial_results.append(partial)
+        self.notify()
+    
+    def cancelled(self):
+        """任务是否已被请求取消"""
+        return self.cancel_event.is_set()
+    
+    def check_cancelled(self):
+        """已被请求取消时抛出TaskCancelled，供任务函数在步骤之间调用"""
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+    
+    def wait_change(self, version, timeout):
+        """等待任务更新
+        
+        Args:
+            version: 上次读取时的版本号
+            timeout: 最长等待时间（秒）
+        
+        Returns:
+            int: 当前版本号
+        """
+        with self.changed:
+            if self.version == version and self.status not in FINISHED_STATES:
+                self.changed.wait(timeout)
+            return self.version
+    
+    def snapshot(self, partial_from=0):
+        """获取任务状态快照
+        
+        Args:
+            partial_from: 从第几个部分结果开始返回，用于增量获取
+        
+        Returns:
+            dict: 任务状态
+        """
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "owner": self.owner,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "partial_results": self.partial_results[partial_from:],
+            "partial_count": len(self.partial_results),
+            "result": self.result if self.status == TASK_DONE else None,
+            "error": self.error,
+            "elapsed": round((self.finished_at or time.time()) - (self.started_at or self.created_at), 3)
+        }
+
+class TaskManager:
+    """后台任务管理类"""
+    
+    def __init__(self, limits=None, retention_seconds=3600):
+        """初始化任务管理
+        
+        Args:
+            limits: 覆盖默认值的各类任务并发上限
+            retention_seconds: 已结束的任务保留多久（秒）
+        """
+        self.limits = dict(DEFAULT_TASK_LIMITS)
+        self.limits.update(limits or {})
+        self.retention_seconds = retention_seconds
+        self.executors = {}
+        self.tasks = {}
+        self.lock = threading.Lock()
+    
+    def executor(self, kind):
+        """获取任务类型对应的线程池，每类任务使用独立的线程池，慢任务不会占满其他任务的线程"""
+        key = kind if kind in self.limits else "default"
+        with self.lock:
+            if key not in self.executors:
+                self.executors[key] = ThreadPoolExecutor(max_workers=self.limits[key], thread_name_prefix=f"task-{key}")
+            return self.executors[key]
+    
+    def submit(self, kind, func, *args, name="", owner=None, **kwargs):
+        """提交后台任务
+        
+        Args:
+            kind: 任务类型
+            func: 任务函数，调用方式为func(*args, task=Task, **kwargs)
+            name: 任务说明
+            owner: 提交任务的用户或会话标识
+        
+        Returns:
+            str: 任务ID
+        """
+        self.prune()
+        task = Task(kind, name, owner)
+        with self.lock:
+            self.tasks[task.id] = task
+        self.executor(kind).submit(self.run_task, task, func, args, kwargs)
+        return task.id
+    
+    def run_task(self, task, func, args, kwargs):
+        """在线程池中执行任务"""
+        if task.cancelled():
+            self.finish(task, TASK_CANCELLED, message="任务已取消")
+            return
+        task.status = TASK_RUNNING
+        task.started_at = time.time()
+        task.report(message="正在执行")
+        try:
+            result = func(*args, task=task, **kwargs)
+        except TaskCancelled:
+            self.finish(task, TASK_CANCELLED, message="任务已取消")
+        except Exception as e:
+            self.finish(task, TASK_FAILED, message=f"任务失败: {e}", error=str(e))
+        else:
+            if task.cancelled():
+                self.finish(task, TASK_CANCELLED, result=result, message="任务已取消（保留已完成的部分）")
+            else:
+                self.finish(task, TASK_DONE, result=result, message="任务完成")
+    
+    def finish(self, task, status, result=None, message=None, error=None):
+        """结束任务并通知读取方"""
+        task.result = result
+        task.error = error
+        task.status = status
+        task.finished_at = time.time()
+        if status == TASK_DONE:
+            task.progress = 1.0
+        task.report(message=message)
+    
+    def get(self, task_id):
+        """获取任务
+        
+        Returns:
+            Task: 任务，不存在时返回None
+        """
+        with self.lock:
+            return self.tasks.get(task_id)
+    
+    def status(self, task_id):
+        """获取任务状态快照
+        
+        Returns:
+            dict: 任务状态，不存在时返回None
+        """
+        task = self.get(task_id)
+        return task.snapshot() if task else None
+    
+    def cancel(self, task_id):
+        """请求取消任务，任务函数在下一个检查点停止
+        
+        Returns:
+            bool: 任务是否存在且尚未结束
+        """
+        task = self.get(task_id)
+        if task is None or task.status in FINISHED_STATES:
+            return False
+        task.cancel_event.set()
+        task.report(message="正在取消")
+        return True
+    
+    def stream(self, task_id, interval=1.0, timeout=None):
+        """持续获取任务更新，适合作为Gradio生成器回调的数据来源
+        
+        每次任务有更新（或每隔interval秒）产生一次快照，快照只包含上次之后新增的部分结果，
+        任务结束后产生最后一次快照并停止
+        
+        Args:
+            task_id: 任务ID
+            interval: 没有更新时的最长等待时间（秒）
+            timeout: 最长跟踪时间（秒），默认为None（直到任务结束）
+        
+        Yields:
+            dict: 任务状态快照
+        """
+        task = self.get(task_id)
+        if task is None:
+            return
+        deadline = time.time() + timeout if timeout else None
+        version = -1
+        sent = 0
+        while True:
+            version = task.wait_change(version, interval)
+            snapshot = task.snapshot(sent)
+            sent = snapshot["partial_count"]
+            yield snapshot
+            if snapshot["status"] in FINISHED_STATES:
+                return
+            if deadline and time.time() >= deadline:
+                return
+    
+    def list(self, owner=None, kind=None):
+        """列出任务
+        
+        Args:
+            owner: 只列出该用户的任务
+            kind: 只列出该类型的任务
+        
+        Returns:
+            list: 任务状态快照列表（不含部分结果），按提交时间从新到旧排列
+        """
+        with self.lock:
+            tasks = list(self.tasks.values())
+        tasks = [task for task in tasks if (owner is None or task.owner == owner) and (kind is None or task.kind == kind)]
+        tasks.sort(key=lambda task: task.created_at, reverse=True)
+        snapshots = []
+        for task in tasks:
+            snapshot = task.snapshot(len(task.partial_results))
+            snapshot.pop("result")
+            snapshots.append(snapshot)
+        return snapshots
+    
+    def prune(self):
+        """删除结束超过保留时间的任务"""
+        cutoff = time.time() - self.retention_seconds
+        with self.lock:
+            for task_id in [task_id for task_id, task in self.tasks.items()
+                            if task.finished_at and task.finished_at < cutoff]:
+                del self.tasks[task_id]
+    
+    def shutdown(self, cancel=True):
+        """停止所有线程池
+        
+        Args:
+            cancel: 是否请求取消尚未结束的任务
+        """
+        if cancel:
+            with self.lock:
+                tasks = list(self.tasks.values())
+            for task in tasks:
+                if task.status not in FINISHED_STATES:
+                    task.cancel_event.set()
+        with self.lock:
+            executors = list(self.executors.values())
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+# 测试代码
+if __name__ == "__main__":
+    def slow_search(term, count, task):
+        """模拟逐步产生结果的搜索"""
+        for i in range(count):
+            task.check_cancelled()
+            time.sleep(0.2)
+            task.report(progress=(i + 1) / count, message=f"{term}: 已找到 {i + 1} 个", partial={"title": f"{term} {i}"})
+        return count
+    
+    manager = TaskManager()
+    start_time = time.perf_counter()
+    first = manager.submit("search", slow_search, "python", 5, owner="user1")
+    second = manager.submit("search", slow_search, "data", 10, owner="user2")
+    third = manager.submit("apply", slow_search, "apply", 20, owner="user1")
+    
+    for snapshot in manager.stream(first, interval=0.5):
+        print(f"[{snapshot['status']}] {snapshot['message']} 新结果 {len(snapshot['partial_results'])} 个")
+    print(f"第一个任务在 {time.perf_counter() - start_time:.2f} 秒后结束，没有等待其他用户的任务")
+    
+    manager.cancel(third)
+    time.sleep(0.5)
+    for snapshot in manager.list():
+        print(f"{snapshot['owner']} {snapshot['name']}: {snapshot['status']} {snapshot['message']}")
+    manager.shutdown()